@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+from benchmarks.benchmark_cleaning import GENERATORS
+from data_cleaning import DataCleaning
+from database_utils import diff_row_fingerprints, normalise_for_fingerprints, row_fingerprints, table_fingerprint
+from schema_registry import SchemaRegistry
+
+
+DIMENSIONS = {
+  "dim_users": "clean_user_data",
+  "dim_card_details": "clean_card_data",
+  "dim_store_details": "clean_store_data",
+  "dim_products": "clean_products_data",
+}
+
+
+def fingerprint_table(registry: SchemaRegistry, table_name: str, dataframe: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
+  """Fingerprints the rows of a dimension table and the table as a whole, as DatabaseConnector.load_dimension does"""
+  column_types = registry.column_types(table_name)
+  normalised = normalise_for_fingerprints(dataframe, column_types)
+  fingerprints = row_fingerprints(normalised, registry.primary_keys[table_name])
+  return fingerprints, table_fingerprint(normalised, fingerprints["row_hash"].to_numpy(), repr(column_types))
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Check that fingerprinting finds exactly the changed, added and removed rows of each dimension table, whether or not its dtypes are optimised, and time it.")
+  parser.add_argument("--rows", type=int, default=100_000)
+  parser.add_argument("--changed", type=int, default=10, help="Number of rows changed, added and removed before fingerprinting again")
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  cleaner = DataCleaning()
+  registry = SchemaRegistry()
+  rng = np.random.default_rng(args.seed)
+
+  print(f"{'table':<18} {'rows':>8} {'time (s)':>9} {'changed':>8} {'removed':>8}")
+  for table_name, method_name in DIMENSIONS.items():
+    key_columns = registry.primary_keys[table_name]
+    plain = getattr(cleaner, method_name)(GENERATORS[method_name](args.rows, args.seed))
+    plain = plain.drop_duplicates(key_columns).reset_index(drop=True)
+    dataframe = registry.optimise_dtypes(plain.copy(), table_name)
+
+    start_time = time.perf_counter()
+    stored, fingerprint = fingerprint_table(registry, table_name, dataframe)
+    seconds = time.perf_counter() - start_time
+
+    # The same rows in another order, or without optimised dtypes, are unchanged
+    assert fingerprint_table(registry, table_name, dataframe.sample(frac=1, random_state=args.seed))[1] == fingerprint
+    plain_fingerprints, plain_fingerprint = fingerprint_table(registry, table_name, plain)
+    assert plain_fingerprint == fingerprint and plain_fingerprints.equals(stored)
+
+    # Change the first rows' non-key values by swapping them with the next row's, add the last rows
+    # as new rows by dropping them from the stored fingerprints, and remove the rows before those
+    changed_rows = np.arange(args.changed)
+    added_rows = np.arange(len(dataframe) - args.changed, len(dataframe))
+    removed_rows = added_rows - args.changed
+    value_columns = [column for column in dataframe.columns if column not in key_columns]
+    modified = dataframe.copy()
+    modified.loc[changed_rows, value_columns] = dataframe.loc[changed_rows + args.changed, value_columns].to_numpy()
+    modified = modified.drop(index=removed_rows)
+    stored = stored.drop(index=added_rows)
+
+    fingerprints, modified_fingerprint = fingerprint_table(registry, table_name, modified)
+    changed, removed = diff_row_fingerprints(fingerprints, stored)
+    expected_changed = modified.index.isin(changed_rows) | modified.index.isin(added_rows)
+    assert (changed == expected_changed).all()
+    assert sorted(removed) == sorted(stored["key"][removed_rows])
+    assert modified_fingerprint != fingerprint
+
+    print(f"{table_name:<18} {len(dataframe):>8} {seconds:>9.3f} {int(changed.sum()):>8} {len(removed):>8}")
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+from benchmarks.data_generators import (
+  generate_users,
+  generate_card_details,
+  generate_store_details,
+  generate_products,
+  generate_orders_table,
+  generate_date_times,
+)
+from data_cleaning import DataCleaning
+
+
+GENERATORS: Dict[str, Callable[[int, int], pd.DataFrame]] = {
+  "clean_user_data": generate_users,
+  "clean_card_data": generate_card_details,
+  "clean_store_data": generate_store_details,
+  "clean_products_data": generate_products,
+  "clean_orders_table": generate_orders_table,
+  "clean_date_times_data": generate_date_times,
+}
+
+# clean_store_data scales quadratically with the number of rows, so unless it is asked for
+# with --methods it is only run up to this size
+DEFAULT_MAX_ROWS: Dict[str, int] = {
+  "clean_store_data": 10_000,
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "cleaning.json")
+
+
+def measure_method(method: Callable[[pd.DataFrame], pd.DataFrame], dataframe: pd.DataFrame, repeats: int) -> Dict[str, Any]:
+
+  """
+  Measures the throughput and peak memory of a cleaning method on a DataFrame.
+
+  Each method mutates its input, so it is given a fresh copy on every run. Timed runs are
+  made without tracing, and the peak memory is taken from one further run under tracemalloc.
+
+  Args:
+    method (Callable[[pd.DataFrame], pd.DataFrame]): DataCleaning method to measure.
+    dataframe (pd.DataFrame): Dirty input DataFrame.
+    repeats (int): Number of timed runs, the fastest of which is reported.
+
+  Returns:
+    Dict[str, Any]: Seconds, rows per second and peak traced bytes of the method.
+  """
+
+  timings = []
+  for _ in range(repeats):
+    copy = dataframe.copy()
+    start_time = time.perf_counter()
+    method(copy)
+    timings.append(time.perf_counter() - start_time)
+  seconds = min(timings)
+
+  copy = dataframe.copy()
+  tracemalloc.start()
+  method(copy)
+  _, peak_bytes = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return {"seconds": seconds, "rows_per_second": len(dataframe) / seconds, "peak_bytes": peak_bytes}
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, Dict[str, Any]]], baseline: Dict[str, Dict[str, Dict[str, Any]]], tolerance: float) -> bool:
+
+  """
+  Prints how each result compares to its baseline, and returns whether any has regressed.
+
+  A result has regressed if its time or peak memory is more than the tolerance above the baseline.
+  Results with no baseline are reported but never count as regressions.
+
+  Args:
+    results (Dict[str, Dict[str, Dict[str, Any]]]): Results by method name and row count.
+    baseline (Dict[str, Dict[str, Dict[str, Any]]]): Baseline results in the same shape.
+    tolerance (float): Allowed relative increase, e.g. 0.2 for 20%.
+
+  Returns:
+    bool: True if any result has regressed.
+  """
+
+  regressed = False
+  print(f"\n{'method':<22} {'rows':>10} {'time':>8} {'memory':>8}")
+  for method_name, by_rows in results.items():
+    for rows, result in by_rows.items():
+      expected = baseline.get(method_name, {}).get(rows)
+      if expected is None:
+        print(f"{method_name:<22} {rows:>10} {'no baseline':>17}")
+        continue
+      time_change = result["seconds"] / expected["seconds"] - 1
+      memory_change = result["peak_bytes"] / expected["peak_bytes"] - 1
+      flag = ""
+      if time_change > tolerance or memory_change > tolerance:
+        flag = "  REGRESSED"
+        regressed = True
+      print(f"{method_name:<22} {rows:>10} {time_change:>+8.0%} {memory_change:>+8.0%}{flag}")
+  return regressed
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Measure the throughput and peak memory of each DataCleaning method on synthetic dirty data.")
+  parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+  parser.add_argument("--methods", nargs="+", choices=list(GENERATORS), help="Methods to measure at every size (default: all, with clean_store_data only up to 10k rows)")
+  parser.add_argument("--repeats", type=int, default=3)
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file of baseline results")
+  parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file")
+  parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative increase over the baseline")
+  args = parser.parse_args()
+
+  cleaner = DataCleaning()
+  results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+  print(f"{'method':<22} {'rows':>10} {'time (s)':>10} {'rows/s':>12} {'peak (MB)':>10}")
+  for method_name in args.methods or list(GENERATORS):
+    for rows in args.rows:
+      if args.methods is None and rows > DEFAULT_MAX_ROWS.get(method_name, rows):
+        print(f"{method_name:<22} {rows:>10} {'skipped, pass --methods ' + method_name + ' to run':>34}")
+        continue
+      dataframe = GENERATORS[method_name](rows, args.seed)
+      result = measure_method(getattr(cleaner, method_name), dataframe, args.repeats)
+      results.setdefault(method_name, {})[str(rows)] = result
+      print(f"{method_name:<22} {rows:>10} {result['seconds']:>10.3f} {result['rows_per_second']:>12,.0f} {result['peak_bytes'] / 1024 ** 2:>10.1f}")
+      del dataframe
+
+  if args.save_baseline:
+    baseline = {}
+    if os.path.exists(args.baseline):
+      with open(args.baseline) as stream:
+        baseline = json.load(stream)
+    for method_name, by_rows in results.items():
+      baseline.setdefault(method_name, {}).update(by_rows)
+    os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+    with open(args.baseline, "w") as stream:
+      json.dump(baseline, stream, indent=2, sort_keys=True)
+    print(f"\nSaved baseline to {args.baseline}")
+  elif os.path.exists(args.baseline):
+    with open(args.baseline) as stream:
+      baseline = json.load(stream)
+    if compare_to_baseline(results, baseline, args.tolerance):
+      sys.exit(1)
@@ -0,0 +1,68 @@
+import argparse
+import time
+from datetime import datetime
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import DataCleaning, DATE_FORMATS
+
+
+def process_dates(date_str: str) -> Union[datetime, pd.NaT]:
+  """Per-row parser previously used by DataCleaning, kept here as the baseline"""
+  for format in DATE_FORMATS:
+    try:
+      return datetime.strptime(date_str, format)
+    except ValueError:
+      continue
+  return pd.NaT
+
+
+def generate_dates(rows: int, seed: int = 0) -> pd.Series:
+
+  """
+  Generates a Series of date strings in the mix of formats found in the source data.
+
+  Args:
+    rows (int): Number of dates to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.Series: Series of date strings, with a small share of junk values.
+  """
+
+  rng = np.random.default_rng(seed)
+  days = pd.Timestamp("1940-01-01") + pd.to_timedelta(rng.integers(0, 30000, rows), unit="D")
+  formats = np.array(DATE_FORMATS + ["junk"])
+  chosen = rng.choice(formats, size=rows, p=[0.05, 0.05, 0.05, 0.84, 0.01])
+
+  dates = pd.Series(days.strftime("%Y-%m-%d"), dtype=object)
+  for format in DATE_FORMATS[:-1]:
+    mask = chosen == format
+    dates[mask] = days[mask].strftime(format)
+  dates[chosen == "junk"] = "NULL"
+  return dates
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Compare per-row and vectorised date parsing.")
+  parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+  args = parser.parse_args()
+
+  cleaner = DataCleaning()
+
+  print(f"{'rows':>10} {'apply (s)':>10} {'vectorised (s)':>15} {'speedup':>8}")
+  for rows in args.rows:
+    dates = generate_dates(rows)
+
+    start_time = time.perf_counter()
+    expected = dates.apply(process_dates)
+    apply_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result = cleaner.parse_dates(dates)
+    vectorised_time = time.perf_counter() - start_time
+
+    pd.testing.assert_series_equal(result, expected)
+    print(f"{rows:>10} {apply_time:>10.2f} {vectorised_time:>15.2f} {apply_time / vectorised_time:>7.1f}x")
@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.mock_stores_api import MockStoresAPI
+from data_extraction import DataExtractor
+from http_cache import HTTPCache
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Measure the requests and bytes the HTTP cache saves on a stores API crawl, against a local mock API.")
+  parser.add_argument("--stores", type=int, default=451)
+  parser.add_argument("--changed", type=int, default=5, help="Number of stores changed before the last run")
+  parser.add_argument("--max-workers", type=int, default=10)
+  parser.add_argument("--no-validators", action="store_true", help="Serve no ETag or Last-Modified headers, and use the cache's ttl instead")
+  parser.add_argument("--ttl", type=float, default=3600)
+  args = parser.parse_args()
+
+  api = MockStoresAPI(args.stores, validators=not args.no_validators)
+  api.start()
+  api_creds = api.write_api_creds()
+  extractor = DataExtractor()
+
+  try:
+    with tempfile.TemporaryDirectory() as cache_dir:
+      ttl = args.ttl if args.no_validators else None
+      runs = []
+      for name in ["cold", "warm", f"{args.changed} changed"]:
+        if name.endswith("changed"):
+          api.change_stores(range(args.changed))
+        api.reset_counts()
+        http_cache = HTTPCache(cache_dir, ttl=ttl)
+        dataframe = extractor.retrieve_stores_data_concurrently(api_creds, max_workers=args.max_workers, http_cache=http_cache)
+        runs.append((name, dict(api.counts), dataframe))
+
+      # Within the ttl, cached stores are returned without asking the API, so only a
+      # revalidated crawl is expected to see the changed stores.
+      if not args.no_validators:
+        uncached = extractor.retrieve_stores_data_concurrently(api_creds, max_workers=args.max_workers)
+        pd.testing.assert_frame_equal(runs[-1][2], uncached)
+  finally:
+    api.stop()
+    os.remove(api_creds)
+
+  print(f"\n{'run':<12} {'requests':>9} {'200':>6} {'304':>6} {'bytes':>10}")
+  for name, counts, _ in runs:
+    print(f"{name:<12} {counts['requests']:>9} {counts.get('200', 0):>6} {counts.get('304', 0):>6} {counts['bytes']:>10,}")
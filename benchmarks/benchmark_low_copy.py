@@ -0,0 +1,54 @@
+import argparse
+import time
+import tracemalloc
+from typing import Tuple
+
+import pandas as pd
+
+from benchmarks.benchmark_cleaning import GENERATORS
+from data_cleaning import DataCleaning
+
+
+def run_traced(cleaner: DataCleaning, method_name: str, dataframe: pd.DataFrame) -> Tuple[pd.DataFrame, float, int]:
+
+  """
+  Runs a cleaning method on a copy of the DataFrame under tracemalloc.
+
+  Args:
+    cleaner (DataCleaning): Cleaner to run the method on.
+    method_name (str): Name of the DataCleaning method.
+    dataframe (pd.DataFrame): Dirty input DataFrame.
+
+  Returns:
+    Tuple[pd.DataFrame, float, int]: The cleaned DataFrame, the seconds taken and the peak traced bytes.
+  """
+
+  copy = dataframe.copy()
+  tracemalloc.start()
+  start_time = time.perf_counter()
+  result = getattr(cleaner, method_name)(copy)
+  seconds = time.perf_counter() - start_time
+  _, peak_bytes = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return result, seconds, peak_bytes
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Check that low-copy cleaning gives identical output, and compare its peak memory with the default mode.")
+  parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+  parser.add_argument("--methods", nargs="+", choices=list(GENERATORS), default=["clean_card_data"])
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  default_cleaner = DataCleaning()
+  low_copy_cleaner = DataCleaning(low_copy=True)
+
+  print(f"{'method':<22} {'rows':>10} {'default (MB)':>13} {'low copy (MB)':>14} {'saved':>7} {'default (s)':>12} {'low copy (s)':>13}")
+  for method_name in args.methods:
+    for rows in args.rows:
+      dataframe = GENERATORS[method_name](rows, args.seed)
+      expected, default_seconds, default_peak = run_traced(default_cleaner, method_name, dataframe)
+      result, low_copy_seconds, low_copy_peak = run_traced(low_copy_cleaner, method_name, dataframe)
+
+      pd.testing.assert_frame_equal(result, expected)
+      print(f"{method_name:<22} {rows:>10} {default_peak / 1024 ** 2:>13.1f} {low_copy_peak / 1024 ** 2:>14.1f} {1 - low_copy_peak / default_peak:>7.0%} {default_seconds:>12.2f} {low_copy_seconds:>13.2f}")
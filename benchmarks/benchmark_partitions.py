@@ -0,0 +1,37 @@
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.benchmark_cleaning import GENERATORS
+from data_cleaning import DataCleaning, PARTITIONABLE_METHODS
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Check that partitioned cleaning gives identical output, and compare its wall time with a single process.")
+  parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+  parser.add_argument("--methods", nargs="+", choices=PARTITIONABLE_METHODS, default=["clean_user_data"])
+  parser.add_argument("--partitions", type=int, nargs="+", default=[2, 4, 8])
+  parser.add_argument("--low-copy", action="store_true", help="Clean in DataCleaning's low-copy mode")
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  cleaner = DataCleaning(low_copy=args.low_copy)
+
+  print(f"{'method':<22} {'rows':>10} {'partitions':>10} {'time (s)':>10} {'speedup':>8}")
+  for method_name in args.methods:
+    for rows in args.rows:
+      dataframe = GENERATORS[method_name](rows, args.seed)
+
+      start_time = time.perf_counter()
+      expected = getattr(cleaner, method_name)(dataframe.copy()).reset_index(drop=True)
+      serial_seconds = time.perf_counter() - start_time
+      print(f"{method_name:<22} {rows:>10} {1:>10} {serial_seconds:>10.2f} {1:>8.2f}")
+
+      for partitions in args.partitions:
+        start_time = time.perf_counter()
+        result = cleaner.clean_in_partitions(method_name, dataframe, partitions)
+        seconds = time.perf_counter() - start_time
+
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{method_name:<22} {rows:>10} {partitions:>10} {seconds:>10.2f} {serial_seconds / seconds:>8.2f}")
@@ -0,0 +1,44 @@
+import argparse
+import os
+import time
+
+from benchmarks.mock_stores_api import MockStoresAPI
+from data_extraction import DataExtractor
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Crawl a rate-limited, partly failing mock stores API, and report how the request scheduler adapts.")
+  parser.add_argument("--stores", type=int, default=451)
+  parser.add_argument("--rate-limit", type=float, default=50, help="Requests per second the mock API allows")
+  parser.add_argument("--failing", type=int, nargs="*", default=[7, 99], help="Stores that always fail")
+  parser.add_argument("--max-workers", type=int, nargs="+", default=[1, 10, 20])
+  parser.add_argument("--max-retries", type=int, default=3)
+  args = parser.parse_args()
+
+  api = MockStoresAPI(args.stores, rate_limit=args.rate_limit, failing_stores=args.failing)
+  api.start()
+  api_creds = api.write_api_creds()
+  extractor = DataExtractor()
+
+  results = []
+  try:
+    for max_workers in args.max_workers:
+      api.reset_counts()
+      start_time = time.perf_counter()
+      if max_workers == 1:
+        dataframe = extractor.retrieve_stores_data(api_creds)
+      else:
+        dataframe = extractor.retrieve_stores_data_concurrently(api_creds, max_workers=max_workers, max_retries=args.max_retries)
+      seconds = time.perf_counter() - start_time
+
+      failed = [store_number for store_number, _ in extractor.failed_stores]
+      assert failed == sorted(args.failing), failed
+      assert len(dataframe) == args.stores - len(args.failing)
+      results.append((max_workers, seconds, dict(api.counts), len(dataframe)))
+  finally:
+    api.stop()
+    os.remove(api_creds)
+
+  print(f"\n{'workers':>7} {'time (s)':>9} {'requests':>9} {'429':>6} {'503':>6} {'stores':>7}")
+  for max_workers, seconds, counts, stores in results:
+    print(f"{max_workers:>7} {seconds:>9.2f} {counts['requests']:>9} {counts.get('429', 0):>6} {counts.get('503', 0):>6} {stores:>7}")
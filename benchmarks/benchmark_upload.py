@@ -0,0 +1,73 @@
+import argparse
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from database_utils import DatabaseConnector
+
+
+def generate_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a synthetic DataFrame shaped like the cleaned orders_table.
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic orders DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  return pd.DataFrame({
+    "date_uuid": [str(uuid.UUID(int=int(i))) for i in rng.integers(0, 2**63, rows)],
+    "user_uuid": [str(uuid.UUID(int=int(i))) for i in rng.integers(0, 2**63, rows)],
+    "card_number": rng.integers(10**15, 10**16, rows).astype(str),
+    "store_code": [f"WEB-{i:08x}" for i in rng.integers(0, 2**31, rows)],
+    "product_code": [f"A{i}-{j}X" for i, j in zip(rng.integers(0, 10, rows), rng.integers(1000, 9999, rows))],
+    "product_quantity": rng.integers(1, 14, rows),
+  })
+
+
+def time_upload(connection: DatabaseConnector, dataframe: pd.DataFrame, credentials: str, method: str, repeats: int) -> float:
+
+  """
+  Uploads the DataFrame several times using the given method and returns the fastest run.
+
+  Args:
+    connection (DatabaseConnector): Connector used for the upload.
+    dataframe (pd.DataFrame): DataFrame to upload.
+    credentials (str): Filepath to the YAML file containing local database credentials.
+    method (str): Load method passed to DatabaseConnector.upload_to_db.
+    repeats (int): Number of timed runs.
+
+  Returns:
+    float: Fastest run in seconds.
+  """
+
+  timings = []
+  for _ in range(repeats):
+    start_time = time.perf_counter()
+    connection.upload_to_db(dataframe, "benchmark_upload", credentials, method=method)
+    timings.append(time.perf_counter() - start_time)
+  return min(timings)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Compare to_sql and COPY load times against a local PostgreSQL database.")
+  parser.add_argument("--creds", default="./local_creds.yaml", help="YAML file containing local database credentials")
+  parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+  parser.add_argument("--repeats", type=int, default=3)
+  args = parser.parse_args()
+
+  connection = DatabaseConnector()
+
+  print(f"{'rows':>10} {'to_sql (s)':>12} {'copy (s)':>10} {'speedup':>8}")
+  for rows in args.rows:
+    dataframe = generate_orders(rows)
+    to_sql_time = time_upload(connection, dataframe, args.creds, "to_sql", args.repeats)
+    copy_time = time_upload(connection, dataframe, args.creds, "copy", args.repeats)
+    print(f"{rows:>10} {to_sql_time:>12.2f} {copy_time:>10.2f} {to_sql_time / copy_time:>7.1f}x")
@@ -0,0 +1,351 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaning import DATE_FORMATS
+
+
+HEX_DIGITS = np.array(list("0123456789abcdef"))
+
+ALPHANUMERIC = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"))
+
+
+def generate_uuids(rng: np.random.Generator, rows: int) -> np.ndarray:
+
+  """
+  Generates random UUID strings without building a Python UUID object per row.
+
+  Args:
+    rng (np.random.Generator): Random number generator.
+    rows (int): Number of UUIDs to generate.
+
+  Returns:
+    np.ndarray: Object array of UUID strings.
+  """
+
+  characters = HEX_DIGITS[rng.integers(0, 16, (rows, 32))]
+  groups = [characters[:, start:end] for start, end in [(0, 8), (8, 12), (12, 16), (16, 20), (20, 32)]]
+  dashes = np.full((rows, 1), "-")
+  joined = np.hstack([groups[0], dashes, groups[1], dashes, groups[2], dashes, groups[3], dashes, groups[4]])
+  return joined.view("<U36").ravel().astype(object)
+
+
+def generate_junk(rng: np.random.Generator, rows: int, length: int = 10) -> np.ndarray:
+
+  """
+  Generates random upper case alphanumeric strings, like the junk rows found in the source data.
+
+  Args:
+    rng (np.random.Generator): Random number generator.
+    rows (int): Number of strings to generate.
+    length (int): Length of each string.
+
+  Returns:
+    np.ndarray: Object array of junk strings.
+  """
+
+  characters = ALPHANUMERIC[rng.integers(0, len(ALPHANUMERIC), (rows, length))]
+  return characters.view(f"<U{length}").ravel().astype(object)
+
+
+def generate_date_strings(rng: np.random.Generator, rows: int, start: str, days: int) -> np.ndarray:
+
+  """
+  Generates date strings in the mix of formats found in the source data, mostly "%Y-%m-%d".
+
+  Args:
+    rng (np.random.Generator): Random number generator.
+    rows (int): Number of dates to generate.
+    start (str): Earliest date that can be generated.
+    days (int): Number of days after start that dates are spread over.
+
+  Returns:
+    np.ndarray: Object array of date strings.
+  """
+
+  dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+  chosen = rng.choice(len(DATE_FORMATS), size=rows, p=[0.02, 0.02, 0.02, 0.94])
+
+  strings = np.asarray(dates.strftime(DATE_FORMATS[-1]), dtype=object)
+  for number, format in enumerate(DATE_FORMATS[:-1]):
+    mask = chosen == number
+    strings[mask] = dates[mask].strftime(format)
+  return strings
+
+
+def defect_mask(rng: np.random.Generator, rows: int, rate: float) -> np.ndarray:
+  """Returns a boolean mask selecting roughly the given share of rows"""
+  return rng.random(rows) < rate
+
+
+def generate_users(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a dirty DataFrame shaped like the legacy_users table.
+
+  Rows are shuffled, and include "NULL" rows, junk rows with digits in "first_name",
+  "GGB" country codes, "@@" emails and dates in several formats.
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic legacy_users DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  first_names = np.array(["Sigfried", "Guy", "Harry", "Andreas", "Alexandra", "Sophie", "Oliver", "Emma"], dtype=object)
+  last_names = np.array(["Noack", "Allen", "Lewis", "Bluemel", "Smith", "Jones", "Taylor", "Brown"], dtype=object)
+  countries = np.array(["United Kingdom", "Germany", "United States"], dtype=object)
+  country_codes = np.array(["GB", "DE", "US"], dtype=object)
+
+  country = rng.integers(0, 3, rows)
+  first_name = first_names[rng.integers(0, len(first_names), rows)]
+  last_name = last_names[rng.integers(0, len(last_names), rows)]
+
+  df = pd.DataFrame({
+    "index": rng.permutation(rows),
+    "first_name": first_name,
+    "last_name": last_name,
+    "date_of_birth": generate_date_strings(rng, rows, "1940-01-01", 23000),
+    "company": np.array(["Heydrich Junitz KG", "Twiss and Sons", "Lewis LLC"], dtype=object)[rng.integers(0, 3, rows)],
+    "email_address": first_name + "." + last_name + "@example.com",
+    "address": np.array(["Zimmerstr. 1/0 59015 Gießen", "Studio 22a, Lynne terrace, McCarthymouth", "3 White pass, Hunterborough"], dtype=object)[rng.integers(0, 3, rows)],
+    "phone_number": np.char.add("+44(0)", rng.integers(10**9, 10**10, rows).astype(str)).astype(object),
+    "country": countries[country],
+    "country_code": country_codes[country],
+    "join_date": generate_date_strings(rng, rows, "1992-01-01", 11000),
+    "user_uuid": generate_uuids(rng, rows),
+  })
+
+  bad_emails = defect_mask(rng, rows, 0.05)
+  df.loc[bad_emails, "email_address"] = first_name[bad_emails] + "." + last_name[bad_emails] + "@@example.com"
+  df.loc[(country == 0) & defect_mask(rng, rows, 0.01), "country_code"] = "GGB"
+
+  junk = defect_mask(rng, rows, 0.001)
+  for column in df.columns.drop("index"):
+    df.loc[junk, column] = generate_junk(rng, junk.sum())
+  nulls = defect_mask(rng, rows, 0.001) & ~junk
+  df.loc[nulls, df.columns.drop("index")] = "NULL"
+  return df
+
+
+def generate_card_details(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a dirty DataFrame shaped like the tables extracted from the card details PDF.
+
+  Rows include repeated header rows from each page, "NULL" rows, junk rows, card numbers
+  prefixed with question marks, and card numbers merged with their expiry dates into one cell.
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic card details DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  providers = np.array(["VISA 16 digit", "Mastercard", "American Express", "JCB 16 digit", "Discover"], dtype=object)
+
+  df = pd.DataFrame({
+    "card_number": rng.integers(10**15, 10**16, rows).astype(str).astype(object),
+    "expiry_date": np.char.add(np.char.add(np.char.zfill(rng.integers(1, 13, rows).astype(str), 2), "/"), rng.integers(23, 33, rows).astype(str)).astype(object),
+    "card_provider": providers[rng.integers(0, len(providers), rows)],
+    "date_payment_confirmed": generate_date_strings(rng, rows, "1990-01-01", 12000),
+  })
+
+  question_marks = defect_mask(rng, rows, 0.005)
+  df.loc[question_marks, "card_number"] = "???" + df.loc[question_marks, "card_number"]
+
+  merged = defect_mask(rng, rows, 0.01) & ~question_marks
+  df.loc[merged, "card_number"] = df.loc[merged, "card_number"] + " " + df.loc[merged, "expiry_date"]
+  df.loc[merged, "expiry_date"] = np.nan
+
+  headers = rng.random(rows) < 1 / 50
+  df.loc[headers] = ["card_number", "expiry_date", "card_provider", "date_payment_confirmed"]
+
+  nulls = defect_mask(rng, rows, 0.001) & ~headers
+  df.loc[nulls] = np.nan
+
+  junk = defect_mask(rng, rows, 0.001) & ~headers & ~nulls
+  for column in df.columns:
+    df.loc[junk, column] = generate_junk(rng, junk.sum())
+  return df
+
+
+def generate_store_details(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a dirty DataFrame shaped like the store details returned by the API.
+
+  The first row is the web portal, with "N/A" coordinates. Rows include "NULL" rows, junk rows,
+  "eeEurope" and "eeAmerica" continents, letters in "staff_numbers" and coordinates with
+  trailing zeros removed.
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic store details DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  localities = np.array(["High Wycombe", "Aberdeen", "Lowell", "Frankfurt am Main", "Miami Beach"], dtype=object)
+  store_types = np.array(["Local", "Super Store", "Mall Kiosk", "Outlet"], dtype=object)
+  country_codes = np.array(["GB", "DE", "US"], dtype=object)
+
+  country = rng.integers(0, 3, rows)
+  coordinates = np.round(rng.uniform(-90, 90, (rows, 2)), rng.integers(1, 6)).astype(str).astype(object)
+
+  df = pd.DataFrame({
+    "index": np.arange(rows),
+    "address": np.array(["Flat 72W, Sally isle, East Deantown", "Heckerstraße 4/5, 50491 Säckingen"], dtype=object)[rng.integers(0, 2, rows)],
+    "longitude": coordinates[:, 0],
+    "lat": None,
+    "locality": localities[rng.integers(0, len(localities), rows)],
+    "store_code": np.char.add(np.char.add(np.array(["HI", "AB", "LO", "FR", "MI"])[rng.integers(0, 5, rows)], "-"), np.char.zfill(rng.integers(0, 10**8, rows).astype(str).astype("<U8"), 8)).astype(object),
+    "staff_numbers": rng.integers(5, 100, rows).astype(str).astype(object),
+    "opening_date": generate_date_strings(rng, rows, "1990-01-01", 12000),
+    "store_type": store_types[rng.integers(0, len(store_types), rows)],
+    "latitude": coordinates[:, 1],
+    "country_code": country_codes[country],
+    "continent": np.where(country == 2, "America", "Europe").astype(object),
+  })
+
+  typo = defect_mask(rng, rows, 0.02)
+  df.loc[typo, "continent"] = "ee" + df.loc[typo, "continent"]
+
+  bad_staff = defect_mask(rng, rows, 0.01)
+  df.loc[bad_staff, "staff_numbers"] = "J" + df.loc[bad_staff, "staff_numbers"]
+
+  junk = defect_mask(rng, rows, 0.002)
+  for column in df.columns.drop("index"):
+    df.loc[junk, column] = generate_junk(rng, junk.sum())
+  nulls = defect_mask(rng, rows, 0.002) & ~junk
+  df.loc[nulls, df.columns.drop("index")] = "NULL"
+
+  df.loc[0] = [0, "N/A", "N/A", None, "N/A", "WEB-1388012W", "325", "2010-06-12", "Web Portal", "N/A", "GB", "Europe"]
+  return df
+
+
+def generate_products(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a dirty DataFrame shaped like the products CSV in the S3 bucket.
+
+  Rows include null rows, junk rows, and weights in kg, g, ml and oz, multipacks such as
+  "12 x 100g", and weights with a trailing " .".
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic products DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  categories = np.array(["toys-and-games", "sports-and-leisure", "pets", "homeware", "health-and-beauty", "food-and-drink", "diy"], dtype=object)
+
+  unit = rng.choice(["kg", "g", "ml", "oz"], size=rows, p=[0.4, 0.45, 0.1, 0.05])
+  value = rng.integers(1, 1000, rows).astype(str).astype(object)
+  kilograms = unit == "kg"
+  value[kilograms] = np.round(rng.uniform(0.1, 20, kilograms.sum()), 2).astype(str)
+  weight = (value + unit).astype(object)
+
+  multipacks = defect_mask(rng, rows, 0.02)
+  weight[multipacks] = np.char.add(np.char.add(rng.integers(2, 16, multipacks.sum()).astype(str), " x "), np.char.add(rng.integers(1, 500, multipacks.sum()).astype(str), "g"))
+  trailing_dots = defect_mask(rng, rows, 0.001) & ~multipacks
+  weight[trailing_dots] = weight[trailing_dots] + " ."
+
+  df = pd.DataFrame({
+    "Unnamed: 0": np.arange(rows),
+    "product_name": np.array(["FurReal Dazzlin' Dimples My Dalmatian Dog", "Tiffany Blue Chain Necklace", "Sodastream Bottle"], dtype=object)[rng.integers(0, 3, rows)],
+    "product_price": np.char.add("£", np.char.mod("%.2f", np.round(rng.uniform(0.5, 500, rows), 2))).astype(object),
+    "weight": weight,
+    "category": categories[rng.integers(0, len(categories), rows)],
+    "EAN": rng.integers(10**12, 10**13, rows).astype(str).astype(object),
+    "date_added": (pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 8000, rows), unit="D")).strftime("%Y-%m-%d").astype(object),
+    "uuid": generate_uuids(rng, rows),
+    "removed": rng.choice(np.array(["Still_avaliable", "Removed"], dtype=object), size=rows, p=[0.9, 0.1]),
+    "product_code": np.char.add(np.char.add(np.array(["R7", "C2", "S7", "D8"])[rng.integers(0, 4, rows)], "-"), rng.integers(1000000, 9999999, rows).astype(str)).astype(object),
+  })
+
+  junk = defect_mask(rng, rows, 0.001)
+  for column in df.columns.drop("Unnamed: 0"):
+    df.loc[junk, column] = generate_junk(rng, junk.sum())
+  nulls = defect_mask(rng, rows, 0.001) & ~junk
+  df.loc[nulls, df.columns.drop("Unnamed: 0")] = np.nan
+  return df
+
+
+def generate_orders_table(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a DataFrame shaped like the orders_table in the remote database.
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic orders_table DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  first_name = np.full(rows, None, dtype=object)
+  first_name[defect_mask(rng, rows, 0.01)] = "Sigfried"
+
+  return pd.DataFrame({
+    "level_0": np.arange(rows),
+    "index": np.arange(rows),
+    "date_uuid": generate_uuids(rng, rows),
+    "first_name": first_name,
+    "last_name": first_name.copy(),
+    "user_uuid": generate_uuids(rng, rows),
+    "card_number": rng.integers(10**15, 10**16, rows),
+    "store_code": np.char.add("WEB-", np.char.zfill(rng.integers(0, 10**7, rows).astype(str).astype("<U8"), 8)).astype(object),
+    "product_code": np.char.add("R7-", rng.integers(1000000, 9999999, rows).astype(str)).astype(object),
+    "1": np.nan,
+    "product_quantity": rng.integers(1, 14, rows),
+  })
+
+
+def generate_date_times(rows: int, seed: int = 0) -> pd.DataFrame:
+
+  """
+  Generates a dirty DataFrame shaped like the date times JSON in the S3 bucket.
+
+  Rows include "NULL" rows and junk rows, both of which lack a valid "date_uuid".
+
+  Args:
+    rows (int): Number of rows to generate.
+    seed (int): Seed for the random number generator.
+
+  Returns:
+    pd.DataFrame: Synthetic date times DataFrame.
+  """
+
+  rng = np.random.default_rng(seed)
+  seconds = rng.integers(0, 86400, rows)
+  hours = seconds // 3600
+  time_period = np.select([hours < 6, hours < 12, hours < 18], ["Late_Hours", "Morning", "Midday"], default="Evening").astype(object)
+
+  df = pd.DataFrame({
+    "timestamp": pd.to_datetime(seconds, unit="s").strftime("%H:%M:%S").astype(object),
+    "month": rng.integers(1, 13, rows).astype(str).astype(object),
+    "year": rng.integers(1992, 2023, rows).astype(str).astype(object),
+    "day": rng.integers(1, 29, rows).astype(str).astype(object),
+    "time_period": time_period,
+    "date_uuid": generate_uuids(rng, rows),
+  })
+
+  junk = defect_mask(rng, rows, 0.001)
+  for column in df.columns:
+    df.loc[junk, column] = generate_junk(rng, junk.sum())
+  nulls = defect_mask(rng, rows, 0.001) & ~junk
+  df.loc[nulls] = "NULL"
+  return df
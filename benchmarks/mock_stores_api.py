@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+import yaml
+
+from benchmarks.data_generators import generate_store_details
+
+
+API_KEY = "mock-api-key"
+
+
+class MockStoresAPI():
+
+  """
+  MockStoresAPI class serves synthetic store records on localhost, in the shape of the stores API.
+
+  Store records come from generate_store_details. Each response carries an ETag and a
+  Last-Modified header, unless validators are turned off, and conditional requests for
+  unchanged stores are answered with 304 Not Modified. Requests and response bytes are counted.
+
+  If a rate_limit is given, requests beyond that many in any one second are answered with
+  429 Too Many Requests and a Retry-After header. Stores in failing_stores always answer
+  503 Service Unavailable.
+
+  Methods:
+    start() -> None
+      Starts serving on a free local port in a background thread.
+
+
+    stop() -> None
+      Stops the server.
+
+
+    change_stores(store_numbers) -> None
+      Modifies the given stores, so their validators no longer match.
+
+
+    write_api_creds() -> str
+      Writes a YAML credentials file pointing at the server, and returns its path.
+  """
+
+  def __init__(self, number_of_stores: int = 451, seed: int = 0, validators: bool = True, rate_limit: Optional[float] = None, retry_after: float = 1.0, failing_stores: Iterable[int] = ()) -> None:
+    self.validators = validators
+    self.rate_limit = rate_limit
+    self.retry_after = retry_after
+    self.failing_stores = set(failing_stores)
+    self._recent_requests: deque = deque()
+    self.stores = generate_store_details(number_of_stores, seed).astype(str).to_dict(orient="records")
+    self.versions = [0] * number_of_stores
+    self.counts: Dict[str, int] = {"requests": 0, "200": 0, "304": 0, "bytes": 0}
+    self._lock = threading.Lock()
+    self._server = None
+
+  @property
+  def base_url(self) -> str:
+    return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+  def reset_counts(self) -> None:
+    with self._lock:
+      self.counts = {key: 0 for key in self.counts}
+
+  def change_stores(self, store_numbers: Iterable[int]) -> None:
+    for store_number in store_numbers:
+      self.versions[store_number] += 1
+      self.stores[store_number]["staff_numbers"] = str(self.versions[store_number])
+
+  def _throttled(self) -> bool:
+    """Records a request, and returns whether it exceeds the rate limit over the last second"""
+    if self.rate_limit is None:
+      return False
+    with self._lock:
+      now = time.monotonic()
+      while self._recent_requests and now - self._recent_requests[0] >= 1.0:
+        self._recent_requests.popleft()
+      if len(self._recent_requests) >= self.rate_limit:
+        return True
+      self._recent_requests.append(now)
+      return False
+
+  def _handler(self) -> type:
+    api = self
+
+    class Handler(BaseHTTPRequestHandler):
+
+      def log_message(self, format: str, *args) -> None:
+        pass
+
+      def send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+          self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with api._lock:
+          api.counts["requests"] += 1
+          api.counts[str(status)] = api.counts.get(str(status), 0) + 1
+          api.counts["bytes"] += len(body)
+
+      def do_GET(self) -> None:
+        if self.headers.get("x-api-key") != API_KEY:
+          self.send(403, b'{"message": "Forbidden"}', {"Content-Type": "application/json"})
+          return
+
+        if api._throttled():
+          self.send(429, b'{"message": "Too Many Requests"}', {"Content-Type": "application/json", "Retry-After": str(api.retry_after)})
+          return
+
+        if self.path == "/number_stores":
+          body = json.dumps({"statusCode": 200, "number_stores": len(api.stores)}).encode("utf-8")
+          version = 0
+        elif self.path.startswith("/store_details/"):
+          store_number = int(self.path.rsplit("/", 1)[1])
+          if not 0 <= store_number < len(api.stores):
+            self.send(404, b'{"message": "Not Found"}', {"Content-Type": "application/json"})
+            return
+          if store_number in api.failing_stores:
+            self.send(503, b'{"message": "Service Unavailable"}', {"Content-Type": "application/json"})
+            return
+          body = json.dumps(api.stores[store_number]).encode("utf-8")
+          version = api.versions[store_number]
+        else:
+          self.send(404, b'{"message": "Not Found"}', {"Content-Type": "application/json"})
+          return
+
+        headers = {"Content-Type": "application/json"}
+        if api.validators:
+          etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+          headers["ETag"] = etag
+          headers["Last-Modified"] = formatdate(1_600_000_000 + version, usegmt=True)
+          if self.headers.get("If-None-Match") == etag:
+            self.send(304, b"", headers)
+            return
+        self.send(200, body, headers)
+
+    return Handler
+
+  def start(self) -> None:
+    self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+    threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+  def stop(self) -> None:
+    self._server.shutdown()
+    self._server.server_close()
+
+  def write_api_creds(self) -> str:
+    handle, path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(handle, "w") as stream:
+      yaml.safe_dump({
+        "x-api-key": API_KEY,
+        "num_of_stores": f"{self.base_url}/number_stores",
+        "store_path": f"{self.base_url}/store_details/{{}}",
+      }, stream)
+    return path
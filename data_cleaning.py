@@ -1,6 +1,39 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import Union
+import pyarrow as pa
+from instrumentation import PipelineMetrics
+from typing import Callable, List, Optional
+
+
+DATE_FORMATS = ["%Y %B %d", "%Y/%m/%d", "%B %Y %d", "%Y-%m-%d"]
+
+WEIGHT_PATTERN = r"^\s*(?:(?P<multiplier>\d+) x )?(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>kg|oz|ml|g)(?: \.)?$"
+
+# Cleaning methods whose steps only depend on the rows of each partition, once the input is
+# in the order the method would sort it into. clean_store_data is left out, as it overwrites
+# the coordinates of the first row of the whole table.
+PARTITIONABLE_METHODS = ["clean_user_data", "clean_card_data", "clean_products_data", "clean_orders_table", "clean_date_times_data"]
+
+
+def dataframe_to_ipc(dataframe: pd.DataFrame) -> bytes:
+  """Serialises a DataFrame to the Arrow IPC stream format"""
+  table = pa.Table.from_pandas(dataframe, preserve_index=False)
+  sink = pa.BufferOutputStream()
+  with pa.ipc.new_stream(sink, table.schema) as writer:
+    writer.write_table(table)
+  return sink.getvalue().to_pybytes()
+
+
+def ipc_to_dataframe(payload: bytes) -> pd.DataFrame:
+  """Deserialises a DataFrame from the Arrow IPC stream format"""
+  return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def _clean_partition(cleaner: "DataCleaning", method_name: str, payload: bytes) -> bytes:
+  """Cleans one Arrow IPC encoded partition in a worker process, returning the cleaned partition encoded the same way"""
+  return dataframe_to_ipc(getattr(cleaner, method_name)(ipc_to_dataframe(payload)))
 
 
 class DataCleaning():
@@ -31,7 +64,28 @@ class DataCleaning():
 
       clean_date_times_data(pandas_dataframe) -> pd.DataFrame
         Cleans the dim_date_times table.
+
+
+      parse_dates(series, formats) -> pd.Series
+        Parses date strings in any of several formats into datetimes.
+
+
+      apply_step(table_name, step, dataframe) -> pd.DataFrame
+        Applies a cleaning step to a DataFrame, recording its metrics if enabled.
+
+
+      clean_in_partitions(method_name, pandas_dataframe, partitions) -> pd.DataFrame
+        Runs a cleaning method over row partitions of a DataFrame in parallel processes.
+
+  If low_copy is set, each table's null and junk rows are found with one combined boolean mask,
+  and the rows and columns to keep are taken in a single copy. Fixes are then written in place
+  with masked assignments, rather than by dropping, re-indexing and updating the DataFrame in
+  several passes. The cleaned DataFrames are identical in either mode.
   """
+
+  def __init__(self, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False) -> None:
+    self.metrics = metrics
+    self.low_copy = low_copy
   
   def clean_user_data(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
 
@@ -50,6 +104,9 @@ class DataCleaning():
       pd.DataFrame: Cleaned DataFrame
     """
     
+    if self.low_copy:
+      return self._clean_user_data_low_copy(pandas_dataframe)
+
     df = pandas_dataframe
 
     def handle_index(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -59,43 +116,38 @@ class DataCleaning():
       sorted_df.drop(columns="index", inplace=True)
       return sorted_df
     
-    df = handle_index(df)
+    df = self.apply_step("dim_users", handle_index, df)
 
     def drop_null_and_junk_entries(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Drops rows containing "NULL" entries, and numeric characters in 'first_name' column, and resets index"""
       nulls_and_junk = dataframe.loc[(dataframe["user_uuid"] == "NULL") | (dataframe["first_name"].str.contains(r"\d"))]
-      filtered_df = df.drop(nulls_and_junk.index)
+      filtered_df = dataframe.drop(nulls_and_junk.index)
       filtered_df.reset_index(drop=True, inplace=True)
       return filtered_df
 
-    df = drop_null_and_junk_entries(df)
-
-    def process_dates(date_str: str) -> Union[datetime, pd.NaT]:
-      """Attempt to parse date strings into datetime objects, or NaT if no recognised format"""
-      formats = ["%Y %B %d", "%Y/%m/%d", "%B %Y %d", "%Y-%m-%d"]
-      for format in formats:
-        try:
-          return datetime.strptime(date_str, format)
-        except ValueError:
-          continue
-      return pd.NaT
-      
-    df["date_of_birth"] = df["date_of_birth"].apply(process_dates)
-    df["join_date"] = df["join_date"].apply(process_dates)
+    df = self.apply_step("dim_users", drop_null_and_junk_entries, df)
+
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "date_of_birth" and "join_date" columns into datetimes"""
+      dataframe["date_of_birth"] = self.parse_dates(dataframe["date_of_birth"])
+      dataframe["join_date"] = self.parse_dates(dataframe["join_date"])
+      return dataframe
+
+    df = self.apply_step("dim_users", handle_dates, df)
 
     def handle_country_code(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Corrects erronious entry "GGB" to "GB" in country_code column"""
       dataframe.loc[dataframe["country_code"] == "GGB", "country_code"] = "GB"
       return dataframe
 
-    df = handle_country_code(df)
+    df = self.apply_step("dim_users", handle_country_code, df)
 
     def handle_bad_emails(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Corrects @@ to @ in email_address column"""
       dataframe["email_address"] = dataframe["email_address"].str.replace("@@", "@")
       return dataframe
     
-    df = handle_bad_emails(df)
+    df = self.apply_step("dim_users", handle_bad_emails, df)
 
     return df
 
@@ -114,6 +166,9 @@ class DataCleaning():
     Returns:
       pd.DataFrame: Cleaned DataFrame
     """
+    if self.low_copy:
+      return self._clean_card_data_low_copy(pandas_dataframe)
+
     df = pandas_dataframe
 
     def drop_null_and_junk_values(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -123,7 +178,7 @@ class DataCleaning():
       dataframe = dataframe.reset_index(drop=True)
       return dataframe
     
-    df = drop_null_and_junk_values(df)
+    df = self.apply_step("dim_card_details", drop_null_and_junk_values, df)
 
     def handle_merged_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Handles rows where "card_number" and "expiry_date" columns are merged into one cell."""
@@ -133,19 +188,14 @@ class DataCleaning():
       dataframe.update(df_to_fix)
       return dataframe
     
-    df = handle_merged_columns(df)
+    df = self.apply_step("dim_card_details", handle_merged_columns, df)
 
-    def process_dates(date_str: str) -> Union[datetime, pd.NaT]:
-      """Attempt to parse date strings into datetime objects, or NaT if no recognised format"""
-      formats = ["%Y %B %d", "%Y/%m/%d", "%B %Y %d", "%Y-%m-%d"]
-      for format in formats:
-        try:
-          return datetime.strptime(date_str, format)
-        except ValueError:
-          continue
-      return pd.NaT
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "date_payment_confirmed" column into datetimes"""
+      dataframe["date_payment_confirmed"] = self.parse_dates(dataframe["date_payment_confirmed"])
+      return dataframe
 
-    df["date_payment_confirmed"] = df["date_payment_confirmed"].apply(process_dates)
+    df = self.apply_step("dim_card_details", handle_dates, df)
 
     def handle_card_number_clean(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Remove question marks from "card_number" column"""
@@ -156,7 +206,7 @@ class DataCleaning():
       dataframe.update(question_mark_card_numbers)
       return dataframe
     
-    df = handle_card_number_clean(df)
+    df = self.apply_step("dim_card_details", handle_card_number_clean, df)
 
     return df
   
@@ -176,6 +226,9 @@ class DataCleaning():
       pd.DataFrame: Cleaned DataFrame
     """
     
+    if self.low_copy:
+      return self._clean_store_data_low_copy(pandas_dataframe)
+
     df = pandas_dataframe
 
     def drop_useless_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -183,7 +236,7 @@ class DataCleaning():
       dataframe.drop(columns=["index", "lat"], inplace=True)
       return dataframe
     
-    df = drop_useless_columns(df)
+    df = self.apply_step("dim_store_details", drop_useless_columns, df)
 
     def clean_continents(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Fixes typographical errors in continent names"""
@@ -191,7 +244,7 @@ class DataCleaning():
       dataframe.loc[dataframe["continent"] == "eeAmerica", "continent"] = "America"
       return dataframe
     
-    df = clean_continents(df)
+    df = self.apply_step("dim_store_details", clean_continents, df)
 
     def drop_junk_and_null_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
       """ Drops rows comprised of null or junk values"""
@@ -200,19 +253,14 @@ class DataCleaning():
       dataframe.reset_index(drop=True, inplace= True)
       return dataframe
     
-    df = drop_junk_and_null_rows(df)
+    df = self.apply_step("dim_store_details", drop_junk_and_null_rows, df)
 
-    def process_dates(date_str: str) -> Union[datetime, pd.NaT]:
-      """Attempt to parse date strings into datetime objects, or NaT if no recognised format"""
-      formats = ["%Y %B %d", "%Y/%m/%d", "%B %Y %d", "%Y-%m-%d"]
-      for format in formats:
-        try:
-          return datetime.strptime(date_str, format)
-        except ValueError:
-          continue
-      return pd.NaT
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "opening_date" column into datetimes"""
+      dataframe["opening_date"] = self.parse_dates(dataframe["opening_date"])
+      return dataframe
 
-    df["opening_date"] = df["opening_date"].apply(process_dates)
+    df = self.apply_step("dim_store_details", handle_dates, df)
 
     def handle_staff_numbers(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Clean and convert "staff_numbers" column to numeric values"""
@@ -220,7 +268,7 @@ class DataCleaning():
       dataframe["staff_numbers"] = pd.to_numeric(dataframe["staff_numbers"], errors="coerce")
       return dataframe
     
-    df = handle_staff_numbers(df)
+    df = self.apply_step("dim_store_details", handle_staff_numbers, df)
 
     def correct_mislabeled_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Correct and reorder mislabelled columns"""
@@ -231,7 +279,7 @@ class DataCleaning():
       dataframe = dataframe[new_column_order]
       return dataframe
     
-    df = correct_mislabeled_columns(df)
+    df = self.apply_step("dim_store_details", correct_mislabeled_columns, df)
     
     def standardise_coordinates(coordinate: str) -> str:
       """Standardise coordinate values"""
@@ -243,8 +291,13 @@ class DataCleaning():
 
       return f"{split_coord_str[0]}.{split_coord_str[1]:0<5}"
 
-    df["latitude"] = df["latitude"].apply(standardise_coordinates)
-    df["longitude"] = df["longitude"].apply(standardise_coordinates)
+    def handle_coordinates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Applies standardise_coordinates to the "latitude" and "longitude" columns"""
+      dataframe["latitude"] = dataframe["latitude"].apply(standardise_coordinates)
+      dataframe["longitude"] = dataframe["longitude"].apply(standardise_coordinates)
+      return dataframe
+
+    df = self.apply_step("dim_store_details", handle_coordinates, df)
 
     return df
   
@@ -264,6 +317,9 @@ class DataCleaning():
       pd.DataFrame: Cleaned DataFrame
     """
     
+    if self.low_copy:
+      return self._clean_products_data_low_copy(pandas_dataframe)
+
     df = pandas_dataframe
 
     def handle_null_and_junk(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -274,68 +330,33 @@ class DataCleaning():
       dataframe.reset_index(drop=True, inplace=True)
       return dataframe
     
-    df = handle_null_and_junk(df)
+    df = self.apply_step("dim_products", handle_null_and_junk, df)
 
-    def convert_product_weights(weight: str) -> Union[float, None]:
+    def convert_product_weights(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Standardises all weights into their kilogram value, and converts to a float"""
-      if weight.endswith(" ."):
-        weight = weight.replace(" .", "")
-
-      def handle_multipacks(multi_value):
-        w1, w2 = multi_value.split(" x ")
-        multiplier_to_int = int(w1)
-        weight_to_int = float(w2.replace("g", ""))
-        grams_to_kilos = weight_to_int/1000
-        combined_weight = multiplier_to_int * grams_to_kilos
-        return round(combined_weight, 3)
-
-      def convert_oz_to_kg(oz_value):
-        format_and_split_weight = int(oz_value.replace("oz", ""))
-        convert_to_kg = round(format_and_split_weight * 0.02834952, 3)
-        return convert_to_kg
-        
-      def convert_ml_to_kg(ml_value):
-        format_and_split = int(ml_value.replace("ml", ""))
-        convert_to_kg = round(format_and_split/1000, 3)
-        return convert_to_kg
-      
-      def convert_g_to_kg(g_value):
-        format_and_split = float(g_value.replace("g", ""))
-        convert_to_kg = round(format_and_split/1000, 3)
-        return convert_to_kg
-      
-      def convert_kg(kg_value):
-        format_and_split = float(kg_value.replace("kg", ""))
-        return round(format_and_split, 3)
-
-      if "x" in weight:
-        return handle_multipacks(weight)
-      elif weight.endswith("kg"):
-        return convert_kg(weight)
-      elif weight.endswith("oz"):
-        return convert_oz_to_kg(weight)
-      elif weight.endswith("ml"):
-        return convert_ml_to_kg(weight)
-      elif weight.endswith("g"):
-        return convert_g_to_kg(weight)
-      else:
-        return None
-      
-    df["weight"] = df["weight"].apply(convert_product_weights)
+      dataframe["weight"] = self._kilograms(dataframe["weight"])
+      return dataframe
+
+    df = self.apply_step("dim_products", convert_product_weights, df)
 
     def rename_weight_column(dataframe: pd.DataFrame) -> pd.DataFrame:
       """Rename the weight column to weight_kg for clarity."""
       dataframe.rename(columns={"weight": "weight_kg"}, inplace=True)
       return dataframe
     
-    df = rename_weight_column(df)
+    df = self.apply_step("dim_products", rename_weight_column, df)
 
     def format_price(price: str) -> str:
       """Remove pound sign from price."""
       price = price.replace("£", "")
       return price
 
-    df["product_price"] = df["product_price"].apply(format_price)
+    def handle_prices(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Applies format_price to the "product_price" column"""
+      dataframe["product_price"] = dataframe["product_price"].apply(format_price)
+      return dataframe
+
+    df = self.apply_step("dim_products", handle_prices, df)
 
     return df
   
@@ -357,7 +378,7 @@ class DataCleaning():
       dataframe.drop(columns=["first_name", "last_name", "1", "level_0", "index"], inplace=True)
       return dataframe
     
-    df = drop_unneeded_columns(df)
+    df = self.apply_step("orders_table", drop_unneeded_columns, df)
 
     return df
   
@@ -372,6 +393,9 @@ class DataCleaning():
       pd.DataFrame: Cleaned DataFrame
     """
     
+    if self.low_copy:
+      return self._clean_date_times_data_low_copy(pandas_dataframe)
+
     df = pandas_dataframe
 
     def drop_nulls_and_junk(dataframe):
@@ -381,6 +405,321 @@ class DataCleaning():
       dataframe.reset_index(drop=True, inplace=True)
       return dataframe
 
-    df = drop_nulls_and_junk(df)
+    df = self.apply_step("dim_date_times", drop_nulls_and_junk, df)
+
+    def add_purchase_timestamps(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Combines the "year", "month", "day" and "timestamp" columns into a "purchase_ts" datetime column"""
+      dataframe["purchase_ts"] = self._purchase_timestamps(dataframe)
+      return dataframe
+
+    df = self.apply_step("dim_date_times", add_purchase_timestamps, df)
+
+    return df
+  
+  def parse_dates(self, series: pd.Series, formats: List[str] = DATE_FORMATS) -> pd.Series:
+    """
+    Parses a Series of date strings in any of several formats into datetimes, or NaT if no format matches.
+
+    Each distinct string is parsed once, and the results are mapped back onto the Series.
+    The formats are tried in order over the whole set of distinct strings, each format only
+    being applied to the strings that no earlier format could parse.
+
+    Args:
+      series (pd.Series): Series of date strings.
+      formats (List[str]): strptime formats to try, in order of precedence.
+
+    Returns:
+      pd.Series: Series of datetimes with the same index as the input.
+    """
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+
+    unparsed = uniques.index
+    for format in formats:
+      if unparsed.empty:
+        break
+      attempt = pd.to_datetime(uniques[unparsed], format=format, errors="coerce")
+      parsed[unparsed] = attempt
+      unparsed = unparsed[attempt.isna().to_numpy()]
+
+    dates = parsed.to_numpy().take(codes)
+    dates[codes == -1] = np.datetime64("NaT")
+    return pd.Series(dates, index=series.index, name=series.name)
+
+  def apply_step(self, table_name: str, step: Callable[[pd.DataFrame], pd.DataFrame], dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Applies a cleaning step to a DataFrame, recording its wall time, rows and memory if metrics are enabled.
+
+    Args:
+      table_name (str): Name of the table being cleaned.
+      step (Callable[[pd.DataFrame], pd.DataFrame]): Cleaning step to apply.
+      dataframe (pd.DataFrame): DataFrame passed into the step.
+
+    Returns:
+      pd.DataFrame: DataFrame returned by the step.
+    """
+
+    if self.metrics is None:
+      return step(dataframe)
+
+    with self.metrics.measure(step.__name__, table_name, rows_in=len(dataframe)) as record:
+      dataframe = step(dataframe)
+      record["rows_out"] = len(dataframe)
+    return dataframe
+
+  def clean_in_partitions(self, method_name: str, pandas_dataframe: pd.DataFrame, partitions: Optional[int] = None) -> pd.DataFrame:
+
+    """
+    Runs a cleaning method over row partitions of a DataFrame on a pool of processes.
+
+    The DataFrame is split into contiguous row partitions, which are sent to the workers and
+    back in the Arrow IPC format, and the cleaned partitions are concatenated in their original
+    order with a fresh index. dim_users is sorted by its 'index' column before it is split, so
+    that each partition's own sort leaves the whole table in the same order as a single run.
+    If metrics are enabled, each partition's cleaning steps are recorded by its worker.
+
+    Args:
+      method_name (str): Name of the cleaning method, one of PARTITIONABLE_METHODS.
+      pandas_dataframe (pd.DataFrame): Uncleaned DataFrame.
+      partitions (Optional[int]): Number of partitions and worker processes, or None for one per CPU.
+
+    Returns:
+      pd.DataFrame: Cleaned DataFrame
+    """
+
+    if method_name not in PARTITIONABLE_METHODS:
+      raise ValueError(f"{method_name} cannot be run in partitions")
+
+    df = pandas_dataframe
+    if method_name == "clean_user_data":
+      df = df.take(np.argsort(df["index"].to_numpy(), kind="stable"))
+
+    partitions = max(1, min(partitions or os.cpu_count() or 1, len(df)))
+    bounds = np.linspace(0, len(df), partitions + 1).astype(int)
+    payloads = [dataframe_to_ipc(df.iloc[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    with ProcessPoolExecutor(max_workers=partitions) as executor:
+      results = list(executor.map(_clean_partition, [self] * partitions, [method_name] * partitions, payloads))
+
+    return pd.concat([ipc_to_dataframe(result) for result in results], ignore_index=True)
+
+  def _kilograms(self, weights: pd.Series) -> np.ndarray:
+    """Converts weight strings, including multipacks such as "12 x 100g", to kilograms rounded to 3 places"""
+    parts = weights.str.extract(WEIGHT_PATTERN)
+    value = parts["value"].astype(float).to_numpy()
+    multiplier = parts["multiplier"].astype(float).to_numpy()
+    unit = parts["unit"]
+
+    kilograms = np.select(
+      [unit.isin(["g", "ml"]).to_numpy(), unit.eq("oz").to_numpy(), unit.eq("kg").to_numpy()],
+      [value / 1000, value * 0.02834952, value],
+      default=np.nan
+    )
+    kilograms = np.where(np.isnan(multiplier), kilograms, multiplier * kilograms)
+
+    # Round each distinct weight with Python's round, matching the previous per-row results exactly.
+    # Codes of -1 mark unparsed weights, and index the NaN appended to the end of the rounded values.
+    codes, uniques = pd.factorize(kilograms)
+    rounded = np.append([round(weight, 3) for weight in uniques.tolist()], np.nan)
+    return rounded[codes]
+
+  def _purchase_timestamps(self, dataframe: pd.DataFrame) -> pd.Series:
+    """Builds purchase datetimes from the date parts and time of day of each row, or NaT where they are invalid, parsing each distinct value once"""
+
+    def parse_distinct(series: pd.Series, parse: Callable[[pd.Series], pd.Series]) -> np.ndarray:
+      codes, uniques = pd.factorize(series, use_na_sentinel=False)
+      return parse(pd.Series(uniques, dtype=object)).to_numpy().take(codes)
+
+    to_number = lambda values: pd.to_numeric(values, errors="coerce")
+    dates = pd.to_datetime(pd.DataFrame({
+      "year": parse_distinct(dataframe["year"], to_number),
+      "month": parse_distinct(dataframe["month"], to_number),
+      "day": parse_distinct(dataframe["day"], to_number),
+    }, index=dataframe.index), errors="coerce")
+    times = parse_distinct(dataframe["timestamp"], lambda values: pd.to_timedelta(values, errors="coerce"))
+    return dates + times
+
+  def _pad_coordinate(self, coordinate: str) -> str:
+    """Pads the decimal part of a coordinate to five digits, as standardise_coordinates in clean_store_data does"""
+    if coordinate == "N/A":
+      return "0.00000"
+    whole, decimals = coordinate.split(".")[:2]
+    return f"{whole}.{decimals:0<5}"
+
+  def _select(self, dataframe: pd.DataFrame, mask: pd.Series, drop_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Returns the rows selected by the mask as one copy with a fresh index, removing any columns to drop without copying again"""
+    selected = dataframe.take(np.flatnonzero(mask.to_numpy()))
+    selected.index = pd.RangeIndex(len(selected))
+    for column in drop_columns or []:
+      del selected[column]
+    return selected
+
+  def _clean_user_data_low_copy(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Cleans and returns the dim_users DataFrame, as clean_user_data does, with a single row selection"""
+
+    df = pandas_dataframe
+
+    def select_valid_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Sorts by the 'index' column and drops "NULL" and junk rows and the 'index' column in one copy"""
+      order = np.argsort(dataframe["index"].to_numpy(), kind="stable")
+      valid = ((dataframe["user_uuid"] != "NULL") & ~dataframe["first_name"].str.contains(r"\d")).to_numpy()
+      selected = dataframe.take(order[valid[order]])
+      selected.index = pd.RangeIndex(len(selected))
+      del selected["index"]
+      return selected
+
+    df = self.apply_step("dim_users", select_valid_rows, df)
+
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "date_of_birth" and "join_date" columns into datetimes"""
+      dataframe["date_of_birth"] = self.parse_dates(dataframe["date_of_birth"])
+      dataframe["join_date"] = self.parse_dates(dataframe["join_date"])
+      return dataframe
+
+    df = self.apply_step("dim_users", handle_dates, df)
+
+    def fix_values(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Corrects "GGB" country codes and "@@" in email addresses, writing only the affected rows"""
+      dataframe.loc[dataframe["country_code"] == "GGB", "country_code"] = "GB"
+      bad_emails = dataframe["email_address"].str.contains("@@", regex=False)
+      dataframe.loc[bad_emails, "email_address"] = dataframe.loc[bad_emails, "email_address"].str.replace("@@", "@", regex=False)
+      return dataframe
+
+    df = self.apply_step("dim_users", fix_values, df)
+
+    return df
+
+  def _clean_card_data_low_copy(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Cleans and returns the dim_card_details DataFrame, as clean_card_data does, with a single row selection"""
+
+    df = pandas_dataframe
+
+    def select_valid_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Drops rows with null values in three or more columns, and junk rows, in one copy"""
+      valid = (dataframe.isnull().sum(axis=1) < 3) & ~dataframe["card_number"].str.match(r"[a-zA-Z]", na=False)
+      return self._select(dataframe, valid)
+
+    df = self.apply_step("dim_card_details", select_valid_rows, df)
+
+    def handle_merged_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Splits merged "card_number" and "expiry_date" cells, writing only the affected rows"""
+      merged = dataframe["card_number"].str.contains("/", regex=False) & dataframe["expiry_date"].isnull()
+      split = dataframe.loc[merged, "card_number"].str.split(" ", expand=True)
+      if len(split):
+        dataframe.loc[merged, "card_number"] = split[0]
+        dataframe.loc[merged, "expiry_date"] = split[1]
+      return dataframe
+
+    df = self.apply_step("dim_card_details", handle_merged_columns, df)
+
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "date_payment_confirmed" column into datetimes"""
+      dataframe["date_payment_confirmed"] = self.parse_dates(dataframe["date_payment_confirmed"])
+      return dataframe
+
+    df = self.apply_step("dim_card_details", handle_dates, df)
+
+    def handle_card_number_clean(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Removes question marks from "card_number", writing only the non-numeric rows"""
+      non_numeric = ~dataframe["card_number"].str.match(r"^\d+$")
+      dataframe.loc[non_numeric, "card_number"] = dataframe.loc[non_numeric, "card_number"].str.replace(r"\?+", "", regex=True)
+      return dataframe
+
+    df = self.apply_step("dim_card_details", handle_card_number_clean, df)
+
+    return df
+
+  def _clean_store_data_low_copy(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Cleans and returns the dim_store_details DataFrame, as clean_store_data does, with a single row selection"""
+
+    df = pandas_dataframe
+
+    def select_valid_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Drops null and junk rows and unneeded columns, and swaps the mislabelled coordinates, in one copy"""
+      valid = dataframe["continent"].isin(["Europe", "America", "eeEurope", "eeAmerica"])
+      selected = self._select(dataframe, valid, drop_columns=["index", "lat"])
+      selected.rename(columns={"latitude": "longitude", "longitude": "latitude"}, inplace=True)
+      selected.insert(2, "longitude", selected.pop("longitude"))
+      return selected
+
+    df = self.apply_step("dim_store_details", select_valid_rows, df)
+
+    def clean_continents(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Fixes typographical errors in continent names"""
+      typos = dataframe["continent"].str.startswith("ee")
+      dataframe.loc[typos, "continent"] = dataframe.loc[typos, "continent"].str[2:]
+      return dataframe
+
+    df = self.apply_step("dim_store_details", clean_continents, df)
+
+    def handle_dates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Parses the "opening_date" column into datetimes"""
+      dataframe["opening_date"] = self.parse_dates(dataframe["opening_date"])
+      return dataframe
+
+    df = self.apply_step("dim_store_details", handle_dates, df)
 
-    return df
\ No newline at end of file
+    def handle_staff_numbers(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Clean and convert "staff_numbers" column to numeric values"""
+      dataframe["staff_numbers"] = pd.to_numeric(dataframe["staff_numbers"].str.replace(r"[^0-9]", "", regex=True), errors="coerce")
+      return dataframe
+
+    df = self.apply_step("dim_store_details", handle_staff_numbers, df)
+
+    def handle_coordinates(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Pads the decimal part of each coordinate to five digits, and sets the web portal's coordinates"""
+      for column in ["latitude", "longitude"]:
+        dataframe[column] = [self._pad_coordinate(coordinate) for coordinate in dataframe[column]]
+      dataframe.loc[0, "latitude"] = "N/A"
+      dataframe.loc[0, "longitude"] = "0.00000"
+      return dataframe
+
+    df = self.apply_step("dim_store_details", handle_coordinates, df)
+
+    return df
+
+  def _clean_products_data_low_copy(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Cleans and returns the dim_products DataFrame, as clean_products_data does, with a single row selection"""
+
+    df = pandas_dataframe
+
+    def select_valid_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Drops null and junk rows and the "Unnamed: 0" column in one copy"""
+      valid = ~dataframe["category"].str.contains(r"\d", regex=True, na=True).astype(bool)
+      return self._select(dataframe, valid, drop_columns=["Unnamed: 0"])
+
+    df = self.apply_step("dim_products", select_valid_rows, df)
+
+    def handle_weights_and_prices(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Standardises weights into kilograms in "weight_kg", and removes the pound sign from prices"""
+      dataframe["weight"] = self._kilograms(dataframe["weight"])
+      dataframe.rename(columns={"weight": "weight_kg"}, inplace=True)
+      dataframe["product_price"] = dataframe["product_price"].str.replace("£", "", regex=False)
+      return dataframe
+
+    df = self.apply_step("dim_products", handle_weights_and_prices, df)
+
+    return df
+
+  def _clean_date_times_data_low_copy(self, pandas_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Cleans and returns the dim_date_times DataFrame, as clean_date_times_data does, with a single row selection"""
+
+    df = pandas_dataframe
+
+    def select_valid_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Drops rows without a valid "date_uuid" in one copy"""
+      valid = dataframe["date_uuid"].str.match(r"^\w{8}-\w{4}-\w{4}-\w{4}-\w{12}$", na=False)
+      return self._select(dataframe, valid)
+
+    df = self.apply_step("dim_date_times", select_valid_rows, df)
+
+    def add_purchase_timestamps(dataframe: pd.DataFrame) -> pd.DataFrame:
+      """Combines the "year", "month", "day" and "timestamp" columns into a "purchase_ts" datetime column"""
+      dataframe["purchase_ts"] = self._purchase_timestamps(dataframe)
+      return dataframe
+
+    df = self.apply_step("dim_date_times", add_purchase_timestamps, df)
+
+    return df
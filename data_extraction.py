@@ -1,13 +1,42 @@
 from database_utils import DatabaseConnector
+from extraction_cache import ExtractionCache
+from http_cache import HTTPCache
+from request_scheduler import RequestScheduler, TokenBucket
 import pandas as pd
 import tabula
+from pypdf import PdfReader
 import yaml
 import time
 import requests
 import boto3
-from io import StringIO
-from sqlalchemy import Engine
-from typing import Dict, Any
+from boto3.s3.transfer import TransferConfig
+import hashlib
+import tempfile
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
+from sqlalchemy import Engine, MetaData, Table, select
+from typing import Dict, Any, List, Tuple, Optional, Iterator
+
+
+def read_pdf_pages(pdf_file: str, pages: str, options: Dict[str, Any]) -> pd.DataFrame:
+
+  """
+  Extracts a range of pages from a local PDF file, keeping every row as string data.
+
+  Defined at module level so it can be run in worker processes.
+
+  Args:
+    pdf_file (str): Filepath to the local PDF file.
+    pages (str): Page range to extract, e.g. "1-10".
+    options (Dict[str, Any]): Keyword arguments passed to tabula.read_pdf.
+
+  Returns:
+    pd.DataFrame: DataFrame with one row per table row, including any header rows.
+  """
+
+  dfs = tabula.read_pdf(pdf_file, pages=pages, pandas_options={"header": None, "dtype": str}, **options)
+  return dfs[0] if dfs else pd.DataFrame()
 
 
 class DataExtractor():
@@ -19,22 +48,37 @@ class DataExtractor():
     read_rds_table(engine: Engine) -> pd.DataFrame:
       Reads a table from an AWS relational database and returns it as a pandas DataFrame.
 
+
+    read_rds_table_in_chunks(engine: Engine, table_name: str, chunksize: int) -> Iterator[pd.DataFrame]:
+      Streams a table from an AWS relational database as a sequence of pandas DataFrames.
+
       
-    retrieve_pdf_data(pdf_path: str) -> pd.DataFrame:
+    retrieve_pdf_data(pdf_path: str, cache: ExtractionCache, workers: int) -> pd.DataFrame:
       Extracts data from a PDF file and returns it as a pandas DataFrame.
 
     
-    list_number_of_stores(api_credentials: str) -> int:
+    list_number_of_stores(api_credentials: str, http_cache: HTTPCache, scheduler: RequestScheduler, timeout: float) -> int:
       Retrieves the number of stores via an API call and returns it as an int.
 
     
-    retrieve_stores_data(api_credentials: str) -> pd.DataFrame:
+    retrieve_stores_data(api_credentials: str, http_cache: HTTPCache, scheduler: RequestScheduler, timeout: float) -> pd.DataFrame:
       Retrieves store data via an API call and returns it as a pandas DataFrame.
 
 
+    retrieve_stores_data_concurrently(api_credentials: str, max_workers: int, http_cache: HTTPCache, scheduler: RequestScheduler, timeout: float) -> pd.DataFrame:
+      Retrieves store data via concurrent API calls and returns it as a pandas DataFrame.
+
+
     extract_from_s3(s3_path: str) -> pd.DataFrame:
       Extracts data from an S3 bucket and returns it as a pandas DataFrame.
+
+
+    stream_from_s3(s3_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+      Streams data from an S3 bucket as a sequence of pandas DataFrames.
   """
+
+  def __init__(self) -> None:
+    self.failed_stores: List[Tuple[int, str]] = []
   
   
   def read_rds_table(self, engine: Engine, table_name: str) -> pd.DataFrame:
@@ -49,18 +93,133 @@ class DataExtractor():
     Returns:
       pd.DataFrame: DataFrame containing the table data.
     """
-    engine.connect()
-    df = pd.read_sql_table(table_name, engine)
+    with engine.connect() as connection:
+      df = pd.read_sql_table(table_name, connection)
     return df
+
+
+  def read_rds_table_in_chunks(self, engine: Engine, table_name: str, chunksize: int = 50000, order_by: Optional[str] = None, newer_than: Optional[Tuple[str, Any]] = None) -> Iterator[pd.DataFrame]:
+
+    """
+    Streams a table from an AWS RDS database as DataFrames of at most `chunksize` rows.
+
+    Rows are fetched through a server-side cursor, so only one chunk is held in memory at a time.
+
+    Args:
+      engine (Engine): SQLAlchemy engine instance connected to the database.
+      table_name (str): The name of the table to read from the database.
+      chunksize (int): Maximum number of rows in each DataFrame.
+      order_by (Optional[str]): Column to order the rows by, for cleaning steps that depend on row order.
+      newer_than (Optional[Tuple[str, Any]]): A (column, value) pair. If given, only rows where the
+        column is greater than the value are read.
+
+    Yields:
+      pd.DataFrame: DataFrame containing the next chunk of table data.
+    """
+
+    table = Table(table_name, MetaData(), autoload_with=engine)
+    query = select(table)
+    if newer_than is not None:
+      column, value = newer_than
+      query = query.where(table.c[column] > value)
+    if order_by is not None:
+      query = query.order_by(table.c[order_by])
+
+    with engine.connect().execution_options(stream_results=True) as connection:
+      for chunk in pd.read_sql(query, connection, chunksize=chunksize):
+        yield chunk
   
 
-  def retrieve_pdf_data(self, pdf_path: str) -> pd.DataFrame:
+  def _download_pdf(self, link: str) -> Tuple[str, str]:
+
+    """
+    Downloads a PDF to a temporary file.
+
+    Args:
+      link (str): URL of the PDF.
+
+    Returns:
+      Tuple[str, str]: Filepath of the temporary file, and SHA-256 digest of its content.
+    """
+
+    r = requests.get(link)
+    r.raise_for_status()
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as file:
+      file.write(r.content)
+    return file.name, hashlib.sha256(r.content).hexdigest()
+
+
+  def _count_pdf_pages(self, pdf_file: str) -> int:
+
+    """
+    Counts the pages of a PDF file by reading its page tree with pypdf.
+
+    The page tree is found through the cross-reference table or stream, so pages stored inside
+    compressed object streams are counted too. If the file cannot be parsed, the failure is
+    printed and 0 is returned, so the document is read in a single call instead.
+
+    Args:
+      pdf_file (str): Filepath to the local PDF file.
+
+    Returns:
+      int: Number of pages, or 0 if they could not be counted.
+    """
+
+    try:
+      return len(PdfReader(pdf_file).pages)
+    except Exception as e:
+      print(f"Couldn't count the pages of {pdf_file}, so it will be read without sharding:\n{e}")
+      return 0
+
+
+  def _read_pdf_in_shards(self, pdf_file: str, page_count: int, workers: int, options: Dict[str, Any]) -> pd.DataFrame:
+
+    """
+    Extracts a local PDF by splitting its pages into shards read in parallel worker processes.
+
+    Shards are read without headers and concatenated in page order, after which the first row
+    becomes the header. Every column is read as strings, as retrieve_pdf_data does when it reads
+    the whole document in one call, so both give the same frame.
+
+    Args:
+      pdf_file (str): Filepath to the local PDF file.
+      page_count (int): Number of pages in the PDF.
+      workers (int): Number of worker processes, and of shards.
+      options (Dict[str, Any]): Keyword arguments passed to tabula.read_pdf, other than pages.
+
+    Returns:
+      pd.DataFrame: DataFrame containing the PDF data.
+    """
+
+    shard_size = -(-page_count // workers)
+    shards = [f"{first}-{min(first + shard_size - 1, page_count)}" for first in range(1, page_count + 1, shard_size)]
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+      frames = list(executor.map(read_pdf_pages, [pdf_file] * len(shards), shards, [options] * len(shards)))
+
+    combined = pd.concat(frames, ignore_index=True)
+    dataframe = combined.iloc[1:].reset_index(drop=True)
+    dataframe.columns = combined.iloc[0].tolist()
+    return dataframe
+
+
+  def retrieve_pdf_data(self, pdf_path: str, cache: Optional[ExtractionCache] = None, workers: int = 1) -> pd.DataFrame:
 
     """
     Extracts data from a PDF file and returns it as a pandas DataFrame.
 
+    If a cache is given, the PDF's ETag is requested, or the PDF is downloaded and hashed if the
+    server sends no ETag. The cached DataFrame is returned if this content has been extracted
+    with the same options before; otherwise the PDF is extracted and the result is cached.
+
+    If more than one worker is requested, the PDF is downloaded once and its pages are split
+    into shards that are extracted in parallel processes. Either way every column is read as
+    strings, so the cached frame does not depend on how many workers extracted it.
+
     Args:
       pdf_path (str): Filepath to the YAML file containing the link to the PDF.
+      cache (Optional[ExtractionCache]): Cache of previous extractions.
+      workers (int): Number of worker processes used to extract the PDF.
 
     Returns:
       pd.DataFrame: DataFrame containing the PDF data.
@@ -70,37 +229,87 @@ class DataExtractor():
       config = yaml.safe_load(stream)
     link = config["LINK"]
 
-    print("Beginning PDF read.\nOperation takes approx. 130s")
-    start_time = time.time()
-    dfs = tabula.read_pdf(link, pages="all", stream=True, multiple_tables=False)
-    end_time = time.time()
-    elapsed_time = end_time - start_time
-    dataframe = dfs[0]
-    print(f"Retrieved data in {elapsed_time:.2f} seconds")
+    options = {"stream": True, "multiple_tables": False}
+    local_copy = None
+
+    try:
+      if cache is not None:
+        r = requests.head(link, allow_redirects=True, timeout=30)
+        r.raise_for_status()
+        etag = r.headers.get("ETag")
+        if etag:
+          source_id = f"{link}#{etag}"
+        else:
+          local_copy, source_id = self._download_pdf(link)
+
+        key = cache.make_key(source_id, {"pages": "all", "dtype": "str", **options})
+        dataframe = cache.get(key)
+        if dataframe is not None:
+          print("Retrieved PDF data from cache")
+          return dataframe
+
+      print("Beginning PDF read.\nOperation takes approx. 130s")
+      start_time = time.time()
+
+      page_count = 0
+      if workers > 1:
+        if local_copy is None:
+          local_copy, _ = self._download_pdf(link)
+        page_count = self._count_pdf_pages(local_copy)
+
+      if page_count > 1:
+        dataframe = self._read_pdf_in_shards(local_copy, page_count, min(workers, page_count), options)
+      else:
+        dfs = tabula.read_pdf(local_copy or link, pages="all", pandas_options={"dtype": str}, **options)
+        dataframe = dfs[0]
+
+      end_time = time.time()
+      elapsed_time = end_time - start_time
+      print(f"Retrieved data in {elapsed_time:.2f} seconds")
+    finally:
+      if local_copy:
+        os.remove(local_copy)
+
+    if cache is not None:
+      cache.put(key, dataframe)
     return dataframe
   
 
-  def list_number_of_stores(self, api_creds: str) -> int:
+  def list_number_of_stores(self, api_creds: str, http_cache: Optional[HTTPCache] = None, scheduler: Optional[RequestScheduler] = None, timeout: float = 30) -> int:
 
     """
     Retrieves the number of stores via an API call.
 
     Args:
       api_creds (str): Filepath to the YAML file containing API credentials.
+      http_cache (Optional[HTTPCache]): Cache of previous API responses, or None to always download.
+      scheduler (Optional[RequestScheduler]): Scheduler to send the request through, with rate limiting and retries.
+        The scheduler's own HTTP cache is then used in place of http_cache.
+      timeout (float): Seconds to wait for the API to connect or send data before the request fails.
 
     Returns:
-      int: Number of stores.
+      int: Number of stores, or None if the request failed.
     """
 
     with open (api_creds, "r") as stream:
       creds = yaml.safe_load(stream)
-    
-    try:
-      r = requests.get(creds["num_of_stores"], headers={"x-api-key": creds["x-api-key"]})
-      r.raise_for_status()
-    except requests.RequestException as e:
-      print(f"Error: {e}")
-      return
+    headers = {"x-api-key": creds["x-api-key"]}
+
+    if scheduler is not None:
+      r = scheduler.fetch(creds["num_of_stores"], headers=headers, key="number_stores", timeout=timeout)
+      if r is None:
+        print(f"Error: {scheduler.dead_letters[-1][1]}")
+        return
+    else:
+      try:
+        if http_cache is not None:
+          r = http_cache.get(creds["num_of_stores"], headers=headers, timeout=timeout)
+        else:
+          r = requests.get(creds["num_of_stores"], headers=headers, timeout=timeout)
+        r.raise_for_status()
+      except requests.RequestException as e:
+        print(f"Error: {e}")
+        return
 
     number = r.json()["number_stores"]
     print(f"Data to be pulled from {number} stores")
@@ -108,55 +317,189 @@ class DataExtractor():
     return number
   
 
-  def retrieve_stores_data(self, api_creds: str) -> pd.DataFrame:
+  def retrieve_stores_data(self, api_creds: str, http_cache: Optional[HTTPCache] = None, scheduler: Optional[RequestScheduler] = None, timeout: float = 30) -> pd.DataFrame:
     """
     Retrieves stores data from an API and returns it as a DataFrame.
 
+    Stores are fetched one at a time through a RequestScheduler, which retries failed requests
+    with jittered backoff. Stores that still fail are recorded in `failed_stores` as
+    (store_number, error) tuples, and the remaining stores are returned in store order.
+    If an HTTP cache is given, stores that are unchanged since they were cached are not downloaded again.
+
     Args:
       api_creds (str): Filepath to the YAML file containing the API credentials.
+      http_cache (Optional[HTTPCache]): Cache of previous API responses, or None to always download.
+      scheduler (Optional[RequestScheduler]): Scheduler to send the requests through, or None for a default one.
+      timeout (float): Seconds to wait for the API to connect or send data before a request attempt fails.
     
     Returns:
       pd.DataFrame: DataFrame containing the stores data.
     """
 
+    if scheduler is None:
+      scheduler = RequestScheduler(TokenBucket(rate=20.0, capacity=1.0, increase=10.0), http_cache=http_cache)
+
+    print("Beginning API read\nOperation takes approx. 50 seconds.")
+    with requests.Session() as session:
+      return self._retrieve_stores(api_creds, scheduler, session, max_workers=1, timeout=timeout)
+  
+
+  def _fetch_store(self, scheduler: RequestScheduler, session: requests.Session, store_number: int, url: str, headers: Dict[str, str], timeout: float = 30) -> Optional[Dict[str, Any]]:
+
+    """
+    Fetches a single store record through the scheduler.
+
+    Args:
+      scheduler (RequestScheduler): Scheduler that rate limits and retries the request.
+      session (requests.Session): Shared session used to keep connections alive.
+      store_number (int): Number of the store, recorded in the scheduler's dead letters if it fails.
+      url (str): URL of the store endpoint.
+      headers (Dict[str, str]): Headers sent with the request.
+      timeout (float): Seconds to wait for the API to connect or send data before an attempt fails.
+
+    Returns:
+      Optional[Dict[str, Any]]: The store data, or None if the store was dead-lettered.
+    """
+
+    r = scheduler.fetch(url, headers=headers, session=session, key=store_number, timeout=timeout)
+    if r is None:
+      return None
+    try:
+      return r.json()
+    except ValueError as e:
+      scheduler.dead_letter(store_number, f"Invalid JSON: {e}")
+      return None
+
+
+  def _retrieve_stores(self, api_creds: str, scheduler: RequestScheduler, session: requests.Session, max_workers: int, timeout: float = 30) -> pd.DataFrame:
+    """Fetches every store through the scheduler on a pool of threads, recording the stores that fail in `failed_stores`"""
+
     with open (api_creds, "r") as stream:
       creds = yaml.safe_load(stream)
-    print("Beginning API read\nOperation takes approx. 50 seconds.")
     store_path = creds["store_path"]
+    headers = {"x-api-key": creds["x-api-key"]}
 
-    total_stores = self.list_number_of_stores(api_creds)
-
-    all_stores_data = []
+    total_stores = self.list_number_of_stores(api_creds, scheduler=scheduler, timeout=timeout)
+    if total_stores is None:
+      raise RuntimeError("Could not retrieve the number of stores from the API")
 
     start_time = time.time()
-    for store_number in range(total_stores):
-      url = store_path.format(store_number)
+    dead_letters_before = len(scheduler.dead_letters)
 
-      try:
-        r = requests.get(url, headers={"x-api-key": creds["x-api-key"]})
-        r.raise_for_status()
-        store_data = r.json()
-        all_stores_data.append(store_data)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+      results = list(executor.map(
+        lambda store_number: self._fetch_store(scheduler, session, store_number, store_path.format(store_number), headers, timeout),
+        range(total_stores)
+      ))
+
+    self.failed_stores = sorted(scheduler.dead_letters[dead_letters_before:])
+    all_stores_data = [store_data for store_data in results if store_data is not None]
 
-      except requests.RequestException as e:
-        print(f"Error: {e}")
-        return
-      
     end_time = time.time()
     execution_time = end_time - start_time
     print(f"Retrieved data in {execution_time:.2f} seconds")
+    print(f"Request rate settled at {scheduler.bucket.rate:.1f}/s after {scheduler.throttled} throttled requests and {scheduler.retries} retries")
+    if scheduler.http_cache is not None:
+      http_cache = scheduler.http_cache
+      print(f"HTTP cache: {http_cache.hits} fresh, {http_cache.revalidated} not modified, {http_cache.misses} downloaded")
+
+    if self.failed_stores:
+      print(f"Failed to retrieve {len(self.failed_stores)} of {total_stores} stores:")
+      for store_number, error in self.failed_stores:
+        print(f"  Store {store_number}: {error}")
 
     dataframe = pd.DataFrame.from_dict(all_stores_data)
     return dataframe
+
+
+  def retrieve_stores_data_concurrently(self, api_creds: str, max_workers: int = 10, max_retries: int = 3, backoff: float = 0.5, http_cache: Optional[HTTPCache] = None, scheduler: Optional[RequestScheduler] = None, timeout: float = 30) -> pd.DataFrame:
+
+    """
+    Retrieves stores data from an API using a pool of worker threads and returns it as a DataFrame.
+
+    Requests share a single keep-alive session, and are sent through a RequestScheduler whose
+    token bucket starts at two requests per second per worker and adapts to the API: the rate
+    rises while requests succeed, and falls when the API answers 429 Too Many Requests, whose
+    Retry-After is honoured. Each store is retried with jittered exponential backoff before being
+    given up on. Stores that still fail are recorded in `failed_stores` as (store_number, error)
+    tuples, and the remaining stores are returned in store order.
+    If an HTTP cache is given, stores that are unchanged since they were cached are not downloaded again.
+
+    Args:
+      api_creds (str): Filepath to the YAML file containing the API credentials.
+      max_workers (int): Maximum number of concurrent requests.
+      max_retries (int): Number of retries per store after the first failed attempt.
+      backoff (float): Upper bound in seconds of the delay before the first retry of a store.
+      http_cache (Optional[HTTPCache]): Cache of previous API responses, or None to always download.
+      scheduler (Optional[RequestScheduler]): Scheduler to send the requests through, in place of the
+        one built from max_workers, max_retries, backoff and http_cache.
+      timeout (float): Seconds to wait for the API to connect or send data before a request attempt fails.
+
+    Returns:
+      pd.DataFrame: DataFrame containing the stores data.
+    """
+
+    if scheduler is None:
+      bucket = TokenBucket(rate=2.0 * max_workers, capacity=max_workers, increase=max_workers)
+      scheduler = RequestScheduler(bucket, max_retries=max_retries, backoff=backoff, http_cache=http_cache)
+
+    print(f"Beginning API read with {max_workers} workers")
+    with requests.Session() as session:
+      adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+      session.mount("https://", adapter)
+      session.mount("http://", adapter)
+      return self._retrieve_stores(api_creds, scheduler, session, max_workers, timeout)
   
 
-  def extract_from_s3(self, s3_path: str) -> pd.DataFrame:
+  def _open_s3_object(self, path: str, multipart_threshold: int, max_concurrency: int, multipart_chunksize: int = 8 * 1024 ** 2) -> Any:
+
+    """
+    Opens an object in an S3 bucket as a readable file-like object, without decoding it into memory.
+
+    Objects smaller than multipart_threshold are read directly from the response body stream.
+    Larger objects are downloaded to a temporary file using parallel ranged GETs of
+    multipart_chunksize bytes each, so even an object just over the threshold is split into
+    enough parts to download concurrently.
+
+    Args:
+      path (str): s3:// path of the object.
+      multipart_threshold (int): Size in bytes from which the object is downloaded in parallel parts.
+      max_concurrency (int): Maximum number of parts downloaded at the same time.
+      multipart_chunksize (int): Size in bytes of each part.
+
+    Returns:
+      Any: A readable binary file-like object. The caller is responsible for closing it.
+    """
+
+    split_path = path.split("/")
+    bucket = split_path[-2]
+    object_name = split_path[-1]
+
+    s3 = boto3.client("s3")
+    size = s3.head_object(Bucket=bucket, Key=object_name)["ContentLength"]
+
+    if size < multipart_threshold:
+      return s3.get_object(Bucket=bucket, Key=object_name)["Body"]
+
+    config = TransferConfig(multipart_threshold=multipart_threshold, multipart_chunksize=multipart_chunksize, max_concurrency=max_concurrency)
+    file = tempfile.TemporaryFile()
+    s3.download_fileobj(bucket, object_name, file, Config=config)
+    file.seek(0)
+    return file
+
+
+  def extract_from_s3(self, s3_path: str, multipart_threshold: int = 64 * 1024 ** 2, max_concurrency: int = 10) -> pd.DataFrame:
 
     """
     Extracts data from an S3 bucket and returns it as a DataFrame.
 
+    Objects at s3:// paths are parsed straight from the download stream, rather than being
+    read and decoded into memory first.
+
     Args:
       s3_path (str): Filepath to the YAML file containing the S3 path information.
+      multipart_threshold (int): Size in bytes from which s3:// objects are downloaded in parallel parts.
+      max_concurrency (int): Maximum number of parts downloaded at the same time.
 
     Returns:
       pd.DataFrame: DataFrame containing the extracted data.
@@ -178,16 +521,10 @@ class DataExtractor():
 
     elif content["PATH"].startswith("s3://"):
       path = content["PATH"]
-      split_path = path.split("/")
-      bucket = split_path[-2]
-      object_name = split_path[-1]
-
-      s3 = boto3.client("s3")
       
       try:
-        s3_object = s3.get_object(Bucket=bucket, Key=object_name)
-        s3_data = s3_object["Body"].read().decode("utf-8")
-        df = pd.read_csv(StringIO(s3_data))
+        with self._open_s3_object(path, multipart_threshold, max_concurrency) as file:
+          df = pd.read_csv(file)
         print("Successfully extracted bucket data")
         return df
       except Exception as e:
@@ -197,6 +534,40 @@ class DataExtractor():
       raise ValueError("Invalid path")
 
 
+  def stream_from_s3(self, s3_path: str, chunksize: int = 100000, multipart_threshold: int = 64 * 1024 ** 2, max_concurrency: int = 10) -> Iterator[pd.DataFrame]:
+
+    """
+    Streams data from an S3 bucket as DataFrames of at most `chunksize` rows.
+
+    CSV objects at s3:// paths are parsed from the download stream one chunk at a time, so
+    only one chunk is held in memory. JSON documents at https:// paths cannot be split
+    without parsing them whole, so they are yielded as a single DataFrame.
+
+    Args:
+      s3_path (str): Filepath to the YAML file containing the S3 path information.
+      chunksize (int): Maximum number of rows in each DataFrame.
+      multipart_threshold (int): Size in bytes from which s3:// objects are downloaded in parallel parts.
+      max_concurrency (int): Maximum number of parts downloaded at the same time.
+
+    Yields:
+      pd.DataFrame: DataFrame containing the next chunk of data.
+    """
+
+    with open(s3_path, "r") as stream:
+      content = yaml.safe_load(stream)
+    path = content["PATH"]
+
+    if path.startswith("https://"):
+      yield pd.read_json(path)
+
+    elif path.startswith("s3://"):
+      with self._open_s3_object(path, multipart_threshold, max_concurrency) as file:
+        for chunk in pd.read_csv(file, chunksize=chunksize):
+          yield chunk
+
+    else:
+      raise ValueError("Invalid path")
+
 
 if __name__ == "__main__":
   path = "./pdf_link.yaml"
@@ -206,4 +577,5 @@ if __name__ == "__main__":
 
   # extractor.retrieve_pdf_data(path)
   # extractor.retrieve_stores_data(api_creds)
+  # extractor.retrieve_stores_data_concurrently(api_creds, max_workers=10)
   # extractor.extract_from_s3("./s3_path2.yaml")
\ No newline at end of file
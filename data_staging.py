@@ -0,0 +1,133 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from extraction_cache import prepare_for_parquet
+from schema_registry import UUID_DTYPE
+from typing import Callable
+
+
+class DataStager():
+
+  """
+  DataStager class keeps the output of each pipeline stage on disk as partitioned Parquet files.
+
+  Each source's output for a stage is written to <staging_dir>/<source>/<stage>/ as a set of
+  part files of at most rows_per_file rows, all sharing one explicit Arrow schema. Staged data
+  is read back with memory mapping, so a later stage can be re-run without repeating the ones
+  before it.
+
+  Methods:
+    write(dataframe, source, stage) -> None
+      Writes a DataFrame as the staged output of a source's stage.
+
+
+    read(source, stage) -> pd.DataFrame
+      Reads the staged output of a source's stage.
+
+
+    exists(source, stage) -> bool
+      Checks whether a source's stage has staged output.
+
+
+    stage(source, stage, produce, reuse) -> pd.DataFrame
+      Returns the staged output of a stage if reusing it, or produces and stages it.
+  """
+
+  def __init__(self, staging_dir: str = "./staging", rows_per_file: int = 1_000_000) -> None:
+    self.staging_dir = staging_dir
+    self.rows_per_file = rows_per_file
+
+  def _path(self, source: str, stage: str) -> str:
+    return os.path.join(self.staging_dir, source, stage)
+
+  def exists(self, source: str, stage: str) -> bool:
+
+    """
+    Checks whether a source's stage has staged output.
+
+    Args:
+      source (str): Name of the source, e.g. "dim_users".
+      stage (str): Name of the stage, e.g. "raw" or "cleaned".
+
+    Returns:
+      bool: True if the stage has been written.
+    """
+
+    return os.path.isdir(self._path(source, stage))
+
+  def write(self, dataframe: pd.DataFrame, source: str, stage: str) -> None:
+
+    """
+    Writes a DataFrame as the staged output of a source's stage, replacing any previous output.
+
+    The part files are written to a temporary directory that is renamed into place once
+    complete, so an interrupted write never leaves a partial stage behind.
+
+    Args:
+      dataframe (pd.DataFrame): DataFrame to stage.
+      source (str): Name of the source, e.g. "dim_users".
+      stage (str): Name of the stage, e.g. "raw" or "cleaned".
+
+    Returns:
+      None
+    """
+
+    path = self._path(source, stage)
+    temporary_path = f"{path}.tmp"
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    os.makedirs(temporary_path)
+
+    prepared = prepare_for_parquet(dataframe).reset_index(drop=True)
+    schema = pa.Schema.from_pandas(prepared, preserve_index=False)
+
+    for part_number, first_row in enumerate(range(0, max(len(prepared), 1), self.rows_per_file)):
+      part = prepared.iloc[first_row:first_row + self.rows_per_file]
+      table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+      pq.write_table(table, os.path.join(temporary_path, f"part-{part_number:05d}.parquet"))
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(temporary_path, path)
+
+  def read(self, source: str, stage: str) -> pd.DataFrame:
+
+    """
+    Reads the staged output of a source's stage, memory mapping each part file.
+
+    Args:
+      source (str): Name of the source, e.g. "dim_users".
+      stage (str): Name of the stage, e.g. "raw" or "cleaned".
+
+    Returns:
+      pd.DataFrame: The staged DataFrame, with parts in their original order.
+    """
+
+    path = self._path(source, stage)
+    parts = sorted(name for name in os.listdir(path) if name.endswith(".parquet"))
+    tables = [pq.read_table(os.path.join(path, name), memory_map=True) for name in parts]
+    # pandas cannot rebuild binary UUID columns from the stored metadata, so they are mapped explicitly
+    return pa.concat_tables(tables).to_pandas(types_mapper=lambda arrow_type: UUID_DTYPE if arrow_type == UUID_DTYPE.pyarrow_dtype else None)
+
+  def stage(self, source: str, stage: str, produce: Callable[[], pd.DataFrame], reuse: bool = False) -> pd.DataFrame:
+
+    """
+    Returns the staged output of a stage if reusing it, otherwise produces the output and stages it.
+
+    Args:
+      source (str): Name of the source, e.g. "dim_users".
+      stage (str): Name of the stage, e.g. "raw" or "cleaned".
+      produce (Callable[[], pd.DataFrame]): Function that runs the stage and returns its output.
+      reuse (bool): Whether to reuse the staged output, if there is any.
+
+    Returns:
+      pd.DataFrame: Output of the stage.
+    """
+
+    if reuse and self.exists(source, stage):
+      print(f"Reusing staged {stage} data for {source}")
+      return self.read(source, stage)
+
+    dataframe = produce()
+    self.write(dataframe, source, stage)
+    return dataframe
@@ -1,8 +1,208 @@
+import argparse
+import glob
+import hashlib
+import io
+import os
+import re
+import threading
+import time
 import yaml
-from sqlalchemy import create_engine, MetaData, Engine
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, inspect, MetaData, Engine, text
+from sqlalchemy.pool import QueuePool
+import numpy as np
 import pandas as pd
+from schema_registry import SchemaRegistry, UUID_DTYPE, binary_to_uuids, decode_uuid_columns
+
+from typing import Any, Callable, Dict, Union, List, Optional, Tuple
+
+
+class TimedQueuePool(QueuePool):
+
+  """
+  QueuePool that records how many connections have been checked out, and how long callers waited for them.
+
+  The wait includes the time taken to open a new connection when the pool has none idle.
+  """
+
+  def __init__(self, *args, **kwargs) -> None:
+    super().__init__(*args, **kwargs)
+    self.stats_lock = threading.Lock()
+    self.checkouts = 0
+    self.total_wait = 0.0
+    self.max_wait = 0.0
+
+  def _do_get(self):
+    start_time = time.perf_counter()
+    try:
+      return super()._do_get()
+    finally:
+      wait = time.perf_counter() - start_time
+      with self.stats_lock:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class DataFrameCSVStream(io.RawIOBase):
+
+  """
+  Read-only file-like object that encodes a DataFrame as CSV lazily, one chunk of rows at a time.
+
+  Used as the source for psycopg2's copy_expert so that only a single chunk of CSV text
+  is held in memory at any point, rather than the whole table. Binary UUID columns are
+  formatted back into strings a chunk at a time.
+  """
+
+  def __init__(self, dataframe: pd.DataFrame, chunksize: int = 10000) -> None:
+    self.dataframe = dataframe
+    self.chunksize = chunksize
+    self.position = 0
+    self.buffer = b""
+    self.offset = 0
+
+  def readable(self) -> bool:
+    return True
+
+  def _encode_next_chunk(self) -> bytes:
+    """Encodes the next chunk of rows as CSV bytes, or returns empty bytes when exhausted"""
+    if self.position >= len(self.dataframe):
+      return b""
+    chunk = decode_uuid_columns(self.dataframe.iloc[self.position:self.position + self.chunksize])
+    self.position += self.chunksize
+    return chunk.to_csv(header=False, index=False).encode("utf-8")
+
+  def read(self, size: int = -1) -> bytes:
+    if self.offset >= len(self.buffer):
+      self.buffer = self._encode_next_chunk()
+      self.offset = 0
+    if size < 0:
+      size = len(self.buffer) - self.offset
+    data = self.buffer[self.offset:self.offset + size]
+    self.offset += len(data)
+    return data
+
+
+def normalise_for_fingerprints(dataframe: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+
+  """
+  Returns a DataFrame's values in a form that does not depend on the dtypes they are held in, so they can be fingerprinted.
+
+  - UUID columns become lowercase strings, as PostgreSQL returns UUIDs as text, whether they
+    are held as strings in any case or as 16-byte binary values.
+  - DOUBLE PRECISION columns become strings, with every value that parses as a number written
+    the way Python writes that float, so "51.12340" and 51.1234 give the same string.
+  - Categorical columns become their values, and other numeric columns nullable Float64.
+
+  A table therefore fingerprints the same whether or not SchemaRegistry.optimise_dtypes was run on it.
+
+  Args:
+    dataframe (pd.DataFrame): The cleaned DataFrame, which is not modified.
+    column_types (Dict[str, str]): SQL type declared for each column, from SchemaRegistry.column_types.
+
+  Returns:
+    pd.DataFrame: A shallow copy of the DataFrame, with its columns normalised.
+  """
+
+  normalised = dataframe.copy(deep=False)
+  for column in normalised.columns:
+    series = normalised[column]
+    base_type = column_types.get(column, "").split("(")[0].strip()
+
+    if series.dtype == UUID_DTYPE:
+      series = binary_to_uuids(series)
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+      series = series.astype(object)
+
+    if base_type == "UUID" and series.dtype == object:
+      normalised[column] = series.str.lower()
+    elif base_type == "DOUBLE PRECISION" and not pd.api.types.is_bool_dtype(series):
+      numbers = pd.to_numeric(series, errors="coerce")
+      normalised[column] = numbers.astype(str).where(numbers.notna(), series.astype(object))
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+      normalised[column] = series.astype("Float64")
+    else:
+      normalised[column] = series
+  return normalised
+
+
+def normalise_keys(keys: pd.Series, key_columns: List[str], column_types: Dict[str, str]) -> pd.Series:
+  """Lowercases the parts of keys, from row_fingerprints, that belong to UUID columns, as normalise_for_fingerprints does"""
+  uuid_parts = [position for position, column in enumerate(key_columns) if column_types.get(column, "").split("(")[0].strip() == "UUID"]
+  if not uuid_parts or keys.empty:
+    return keys
+  if len(key_columns) == 1:
+    return keys.str.lower()
+  parts = keys.str.split("|", expand=True)
+  for position in uuid_parts:
+    parts[position] = parts[position].str.lower()
+  return parts.agg("|".join, axis=1)
+
+
+def row_fingerprints(dataframe: pd.DataFrame, key_columns: List[str]) -> pd.DataFrame:
+
+  """
+  Fingerprints each row of a DataFrame with a 64-bit hash of its values, computed with pd.util.hash_pandas_object.
+
+  The hashes depend only on the values, not on the index, the row order or the order of a
+  categorical's categories, so the same data hashes the same on every run. Pass a DataFrame
+  from normalise_for_fingerprints for the hashes not to depend on its dtypes either.
+
+  Args:
+    dataframe (pd.DataFrame): The DataFrame to fingerprint.
+    key_columns (List[str]): Columns that identify a row.
+
+  Returns:
+    pd.DataFrame: A "key" column holding each row's key as text, with the values of several key columns
+      joined by "|", and a "row_hash" column holding each row's hash as a signed 64-bit integer.
+  """
+
+  keys = decode_uuid_columns(dataframe[key_columns]).astype(str)
+  key = keys.iloc[:, 0] if len(key_columns) == 1 else keys.agg("|".join, axis=1)
+  row_hash = pd.util.hash_pandas_object(dataframe, index=False).to_numpy().view(np.int64)
+  return pd.DataFrame({"key": key.to_numpy(), "row_hash": row_hash})
+
+
+def diff_row_fingerprints(fingerprints: pd.DataFrame, stored: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+
+  """
+  Compares a table's row fingerprints with those recorded when it was last loaded.
+
+  Args:
+    fingerprints (pd.DataFrame): The current fingerprints, from row_fingerprints. Their keys must be unique.
+    stored (pd.DataFrame): The recorded fingerprints, with the same "key" and "row_hash" columns. Must not be empty.
+
+  Returns:
+    Tuple[np.ndarray, List[str]]: A mask of the current rows whose key is new or whose hash has changed,
+      and the keys recorded before that are no longer present.
+  """
+
+  positions = pd.Index(stored["key"]).get_indexer(fingerprints["key"])
+  changed = (positions == -1) | (stored["row_hash"].to_numpy()[positions] != fingerprints["row_hash"].to_numpy())
+  removed = stored["key"][~stored["key"].isin(fingerprints["key"])].tolist()
+  return changed, removed
+
+
+def table_fingerprint(dataframe: pd.DataFrame, row_hashes: np.ndarray, schema: str = "") -> str:
+
+  """
+  Fingerprints a whole table from its column names, dtypes and row hashes, independently of the row order.
+
+  Args:
+    dataframe (pd.DataFrame): The DataFrame the row hashes were computed from.
+    row_hashes (np.ndarray): Hash of each row, as returned by row_fingerprints.
+    schema (str): Any other description of the table, such as its declared column types, that should change the fingerprint.
+
+  Returns:
+    str: Hex digest identifying the table's contents.
+  """
+
+  digest = hashlib.sha256()
+  digest.update(repr([(column, str(dtype)) for column, dtype in dataframe.dtypes.items()]).encode("utf-8"))
+  digest.update(schema.encode("utf-8"))
+  digest.update(np.sort(row_hashes).tobytes())
+  return digest.hexdigest()
 
-from typing import Dict, Union, List
 
 class DatabaseConnector():
 
@@ -14,18 +214,65 @@ class DatabaseConnector():
       Reads and returns database credentials from a YAML file.
 
     
-    init_db_engine(database_credentials):
-      Initialises a SQLAlchemy engine using provided credentials.
+    init_db_engine(database_credentials, pool_size, max_overflow, pool_pre_ping):
+      Returns the shared SQLAlchemy engine for the provided credentials, creating it on first use.
+
+
+    pool_statistics():
+      Returns connection pool checkout and wait statistics for each shared engine.
+
+
+    dispose_engines():
+      Closes the connection pools of all shared engines.
 
 
     list_db_tables(database_credentials):
       Verifies a connection to a database by returning all tables contained.
 
       
-    upload_to_db(dataframe, table_name, database_credentials):
+    upload_to_db(dataframe, table_name, database_credentials, method, chunksize, if_exists):
       Uploads a pandas dataframe to a database table.
+
+
+    copy_to_db(dataframe, table_name, engine, chunksize):
+      Bulk loads a pandas dataframe into an existing PostgreSQL table using COPY.
+
+
+    upsert_to_db(dataframe, table_name, credentials, key_columns, chunksize, key_index):
+      Inserts new rows and updates existing rows of a database table, matched on key columns.
+
+
+    load_dimension(dataframe, table_name, credentials, registry, method):
+      Loads a dimension table, skipping it if unchanged and otherwise writing only its changed rows.
+
+
+    read_row_fingerprints(table_name, credentials):
+      Reads the fingerprints recorded for a table by the last load_dimension.
+
+
+    write_row_fingerprints(table_name, fingerprint, fingerprints, credentials):
+      Records the fingerprints of a table loaded by load_dimension.
+
+
+    clear_table_fingerprint(table_name, credentials):
+      Removes a table's recorded fingerprint, so its next load_dimension reloads it in full.
+
+
+    read_high_water_mark(source_table, credentials):
+      Reads the high-water mark recorded for a source table by the last incremental sync.
+
+
+    write_high_water_mark(source_table, high_water_mark, credentials):
+      Records the high-water mark reached by an incremental sync of a source table.
+
+
+    run_sql_file(sql_path, credentials):
+      Executes the statements in a SQL file against a database.
   """
 
+  engines: Dict[str, Engine] = {}
+  engines_lock = threading.Lock()
+
 
   def read_db_creds(self, credentials: str) -> Dict[str, Union[str, int]]:
     
@@ -43,27 +290,84 @@ class DatabaseConnector():
       data = yaml.safe_load(stream)
     return data
   
-  def init_db_engine(self, credentials:str) -> Engine:
+  def init_db_engine(self, credentials: str, pool_size: int = 5, max_overflow: int = 10, pool_pre_ping: bool = True) -> Engine:
 
     """
-    Initialises a SQLAlchemy engine using supplied credentials.
+    Returns the SQLAlchemy engine for the supplied credentials, creating it on first use.
+
+    Engines are kept in a registry shared by all DatabaseConnector instances and keyed by the
+    credentials file, so every caller using the same credentials shares one connection pool.
+    The pool options only take effect when the engine is first created.
 
     Args:
       credentials (str): Filepath to the YAML file containing credentials.
+      pool_size (int): Number of connections kept open in the pool.
+      max_overflow (int): Number of connections that may be opened beyond pool_size under load.
+      pool_pre_ping (bool): Whether to test connections for liveness when they are checked out.
 
     Returns:
       Engine: SQLAlchemy engine instance connected to the database.
     """
-    creds = self.read_db_creds(credentials)
 
-    HOST = creds["HOST"]
-    PASSWORD = creds["PASSWORD"]
-    USER = creds["USER"]
-    DATABASE = creds["DATABASE"]
-    PORT = creds["PORT"]
+    key = os.path.abspath(credentials)
+    with self.engines_lock:
+      if key not in self.engines:
+        creds = self.read_db_creds(credentials)
+
+        HOST = creds["HOST"]
+        PASSWORD = creds["PASSWORD"]
+        USER = creds["USER"]
+        DATABASE = creds["DATABASE"]
+        PORT = creds["PORT"]
+
+        self.engines[key] = create_engine(
+          f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE}",
+          poolclass=TimedQueuePool,
+          pool_size=pool_size,
+          max_overflow=max_overflow,
+          pool_pre_ping=pool_pre_ping
+        )
+      return self.engines[key]
 
-    engine = create_engine(f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE}")
-    return engine
+  def pool_statistics(self) -> Dict[str, Dict[str, Union[int, float]]]:
+
+    """
+    Returns connection pool statistics for each shared engine, for sizing pools under parallel load.
+
+    Returns:
+      Dict[str, Dict[str, Union[int, float]]]: Mapping of credentials file to its pool's size,
+        checked out connections, overflow, total checkouts, and total, mean and max checkout wait in seconds.
+    """
+
+    statistics = {}
+    with self.engines_lock:
+      for key, engine in self.engines.items():
+        pool = engine.pool
+        with pool.stats_lock:
+          statistics[key] = {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": pool.checkouts,
+            "total_wait": pool.total_wait,
+            "mean_wait": pool.total_wait / pool.checkouts if pool.checkouts else 0.0,
+            "max_wait": pool.max_wait,
+          }
+    return statistics
+
+  def dispose_engines(self) -> None:
+
+    """
+    Closes the connection pools of all shared engines and removes them from the registry.
+
+    Returns:
+      None
+    """
+
+    with self.engines_lock:
+      for engine in self.engines.values():
+        engine.dispose()
+      self.engines.clear()
   
   def list_db_tables(self, credentials: str) -> List[str]:
 
@@ -77,35 +381,705 @@ class DatabaseConnector():
       List[str]: List of table names in the database.
     """
     engine = self.init_db_engine(credentials)
-    engine.execution_options(isolation_level="AUTOCOMMIT").connect()
     metadata = MetaData()
-    metadata.reflect(engine)
+    with engine.connect() as connection:
+      metadata.reflect(connection)
     print("Tables in this database:")
     
     for table in metadata.tables.keys():
       print(table)
     return list(metadata.tables.keys())
   
-  def upload_to_db(self, dataframe: pd.DataFrame, table_name: str, credentials: str) -> None:
+  def upload_to_db(self, dataframe: pd.DataFrame, table_name: str, credentials: str, method: str = "to_sql", chunksize: int = 10000, if_exists: str = "replace", registry: Optional[SchemaRegistry] = None) -> None:
 
     """
     Uploads a pandas DataFrame to a local database table.
 
+    Two load methods are available:
+    - "to_sql": pandas' default INSERT path.
+    - "copy": creates the table from the DataFrame's schema, then streams the rows through
+      PostgreSQL's COPY FROM STDIN, which avoids a round trip per batch of rows.
+
+    Columns holding UUIDs as 16-byte binary values are loaded as UUID strings.
+
+    If a schema registry is given, the DataFrame is first conformed to the table's final
+    schema, and when replacing, the table is created with its final column types and primary
+    key before the rows are loaded, so the cast and primary key scripts do not need to be run.
+
+    Replacing a table removes any fingerprint recorded for it by load_dimension, so a later
+    load_dimension reloads it in full rather than comparing against stale fingerprints.
+
     Args:
       dataframe (pd.DataFrame): The DataFrame to be uploaded.
       table_name (str): The name of the table to upload data as.
       credentials (str): Filepath to the YAML file containing local database credentials.
+      method (str): Load method, either "to_sql" or "copy".
+      chunksize (int): Number of rows encoded per chunk when using the "copy" method.
+      if_exists (str): Behaviour when the table already exists, either "replace" or "append".
+      registry (Optional[SchemaRegistry]): Registry used to create the table with its final schema, or None.
 
     Returns:
       None
     """
 
     engine = self.init_db_engine(credentials)
-    dataframe.to_sql(table_name, engine, if_exists="replace", index=False)
 
-    
+    # The table's contents no longer match any fingerprint recorded by load_dimension
+    if if_exists == "replace":
+      self.clear_table_fingerprint(table_name, credentials)
+
+    if registry is not None:
+      dataframe = registry.conform(dataframe, table_name)
+      if if_exists == "replace":
+        with engine.begin() as connection:
+          connection.execute(text(f'DROP TABLE IF EXISTS "{table_name}" CASCADE'))
+          connection.execute(text(registry.create_table_statement(table_name, dataframe)))
+        if_exists = "append"
+
+    if method == "to_sql":
+      decode_uuid_columns(dataframe).to_sql(table_name, engine, if_exists=if_exists, index=False)
+    elif method == "copy":
+      decode_uuid_columns(dataframe.head(0)).to_sql(table_name, engine, if_exists=if_exists, index=False)
+      self.copy_to_db(dataframe, table_name, engine, chunksize)
+    else:
+      raise ValueError(f"Invalid load method: {method}")
+
+  def copy_to_db(self, dataframe: pd.DataFrame, table_name: str, engine: Engine, chunksize: int = 10000) -> None:
+
+    """
+    Bulk loads a pandas DataFrame into an existing table using COPY FROM STDIN.
+
+    Rows are encoded to CSV lazily, a chunk at a time, and streamed to the server.
+
+    Args:
+      dataframe (pd.DataFrame): The DataFrame to be loaded.
+      table_name (str): The name of the existing table to load into.
+      engine (Engine): SQLAlchemy engine connected to a PostgreSQL database.
+      chunksize (int): Number of rows encoded per chunk.
+
+    Returns:
+      None
+    """
+
+    connection = engine.raw_connection()
+    try:
+      with connection.cursor() as cursor:
+        cursor.copy_expert(self._copy_statement(dataframe, table_name), DataFrameCSVStream(dataframe, chunksize))
+      connection.commit()
+    finally:
+      connection.close()
+
+  def _copy_statement(self, dataframe: pd.DataFrame, table_name: str) -> str:
+    """Builds a COPY FROM STDIN statement for the columns of the DataFrame"""
+    columns = ", ".join(f'"{column}"' for column in dataframe.columns)
+    return f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT CSV)'
+
+  def upsert_to_db(self, dataframe: pd.DataFrame, table_name: str, credentials: str, key_columns: List[str], chunksize: int = 10000, key_index: bool = True) -> None:
+
+    """
+    Inserts new rows into a local database table and updates rows whose key already exists.
+
+    The DataFrame is copied into a temporary staging table shaped like the target, then merged
+    into the target with INSERT ... ON CONFLICT DO UPDATE in the same transaction. The target
+    table is created if it does not exist, and unless key_index is False, a unique index on the
+    key columns is created if one is not already present, as ON CONFLICT requires it.
+
+    Args:
+      dataframe (pd.DataFrame): The DataFrame to be merged into the table.
+      table_name (str): The name of the target table.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+      key_columns (List[str]): Columns that identify a row.
+      chunksize (int): Number of rows encoded per chunk when copying into the staging table.
+      key_index (bool): Whether to create the unique index on the key columns. Pass False when they are already the table's primary key.
+
+    Returns:
+      None
+    """
+
+    engine = self.init_db_engine(credentials)
+    decode_uuid_columns(dataframe.head(0)).to_sql(table_name, engine, if_exists="append", index=False)
+
+    staging_table = f"{table_name}_staging"
+    keys = ", ".join(f'"{column}"' for column in key_columns)
+    columns = ", ".join(f'"{column}"' for column in dataframe.columns)
+    updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in dataframe.columns if column not in key_columns)
+    on_conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+
+    connection = engine.raw_connection()
+    try:
+      with connection.cursor() as cursor:
+        if key_index:
+          cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{table_name}_upsert_key" ON "{table_name}" ({keys})')
+        cursor.execute(f'CREATE TEMPORARY TABLE "{staging_table}" (LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP')
+        cursor.copy_expert(self._copy_statement(dataframe, staging_table), DataFrameCSVStream(dataframe, chunksize))
+        cursor.execute(f'INSERT INTO "{table_name}" ({columns}) SELECT {columns} FROM "{staging_table}" ON CONFLICT ({keys}) {on_conflict}')
+      connection.commit()
+    finally:
+      connection.close()
+
+  def load_dimension(self, dataframe: pd.DataFrame, table_name: str, credentials: str, registry: SchemaRegistry, method: str = "to_sql") -> int:
+
+    """
+    Loads a cleaned dimension table, writing only the rows that changed since it was last loaded.
+
+    Every row is fingerprinted by row_fingerprints, and the table as a whole by table_fingerprint,
+    with the fingerprints of the last load kept in the local row_fingerprints and
+    table_fingerprints tables. Both are taken over the values from normalise_for_fingerprints,
+    so turning dtype optimisation on or off does not change them, and UUID keys are compared in
+    lowercase, as PostgreSQL writes them. If the table's fingerprint is unchanged, nothing is written.
+    Otherwise, rows whose key is new or whose hash differs are conformed and upserted on the
+    table's primary key, overwriting the old values, and rows whose key has disappeared are
+    deleted. The table is loaded in full by upload_to_db instead if it does not exist, if it has
+    no recorded fingerprint, or if its keys are not unique.
+
+    The recorded fingerprint is removed before the table is changed, and written again once it
+    has been, so a load that fails part way leads to a full reload next time.
+
+    Args:
+      dataframe (pd.DataFrame): The cleaned DataFrame, before it is conformed by the registry.
+      table_name (str): The name of the table.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+      registry (SchemaRegistry): Registry holding the table's primary key, used to conform and create the table.
+      method (str): Load method passed to upload_to_db for a full load, either "to_sql" or "copy".
+
+    Returns:
+      int: Number of rows written or deleted.
+    """
+
+    key_columns = registry.primary_keys[table_name]
+    column_types = registry.column_types(table_name)
+    normalised = normalise_for_fingerprints(dataframe, column_types)
+    fingerprints = row_fingerprints(normalised, key_columns)
+    fingerprint = table_fingerprint(normalised, fingerprints["row_hash"].to_numpy(), repr(column_types))
+
+    engine = self.init_db_engine(credentials)
+    stored_fingerprint, stored = self.read_row_fingerprints(table_name, credentials)
+    stored["key"] = normalise_keys(stored["key"], key_columns, column_types)
+    full_load = not inspect(engine).has_table(table_name) or stored_fingerprint is None or len(stored) == 0 or fingerprints["key"].duplicated().any()
+
+    if not full_load and stored_fingerprint == fingerprint:
+      print(f"{table_name}: unchanged, load skipped")
+      return 0
+
+    self.clear_table_fingerprint(table_name, credentials)
+
+    if full_load:
+      self.upload_to_db(dataframe, table_name, credentials, method=method, registry=registry)
+      written = len(dataframe)
+      print(f"{table_name}: loaded {written} rows")
+    else:
+      changed, removed = diff_row_fingerprints(fingerprints, stored)
+      if changed.any():
+        self.upsert_to_db(registry.conform(dataframe[changed], table_name), table_name, credentials, key_columns, key_index=False)
+      if removed:
+        key_text = " || '|' || ".join(f'"{column}"::text' for column in key_columns)
+        with engine.begin() as connection:
+          connection.execute(text(f'DELETE FROM "{table_name}" WHERE {key_text} = ANY(:keys)'), {"keys": removed})
+      written = int(changed.sum()) + len(removed)
+      print(f"{table_name}: upserted {int(changed.sum())} changed rows and deleted {len(removed)} removed rows")
+
+    self.write_row_fingerprints(table_name, fingerprint, fingerprints, credentials)
+    return written
+
+  def _create_fingerprint_tables(self, connection: Any) -> None:
+    """Creates the tables holding the fingerprints recorded by load_dimension, if they do not exist"""
+    connection.execute(text(
+      "CREATE TABLE IF NOT EXISTS table_fingerprints ("
+      "table_name TEXT PRIMARY KEY, "
+      "fingerprint TEXT NOT NULL, "
+      "row_count BIGINT NOT NULL, "
+      "loaded_at TIMESTAMP NOT NULL DEFAULT now())"
+    ))
+    connection.execute(text(
+      "CREATE TABLE IF NOT EXISTS row_fingerprints ("
+      "table_name TEXT NOT NULL, "
+      "key TEXT NOT NULL, "
+      "row_hash BIGINT NOT NULL, "
+      "PRIMARY KEY (table_name, key))"
+    ))
+
+  def read_row_fingerprints(self, table_name: str, credentials: str) -> Tuple[Optional[str], pd.DataFrame]:
+
+    """
+    Reads the fingerprints recorded for a table by the last load_dimension.
+
+    Args:
+      table_name (str): The name of the table.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+
+    Returns:
+      Tuple[Optional[str], pd.DataFrame]: The table's fingerprint, or None if none is recorded, and the
+        "key" and "row_hash" of each of its rows.
+    """
+
+    engine = self.init_db_engine(credentials)
+    with engine.begin() as connection:
+      self._create_fingerprint_tables(connection)
+      fingerprint = connection.execute(
+        text("SELECT fingerprint FROM table_fingerprints WHERE table_name = :table_name"),
+        {"table_name": table_name}
+      ).scalar()
+      rows = connection.execute(
+        text("SELECT key, row_hash FROM row_fingerprints WHERE table_name = :table_name"),
+        {"table_name": table_name}
+      ).all()
+    return fingerprint, pd.DataFrame(rows, columns=["key", "row_hash"]).astype({"key": object, "row_hash": np.int64})
+
+  def write_row_fingerprints(self, table_name: str, fingerprint: str, fingerprints: pd.DataFrame, credentials: str) -> None:
+
+    """
+    Records the fingerprints of a table loaded by load_dimension, replacing those recorded before.
+
+    Args:
+      table_name (str): The name of the table.
+      fingerprint (str): The table's fingerprint, from table_fingerprint.
+      fingerprints (pd.DataFrame): The "key" and "row_hash" of each row, from row_fingerprints.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+
+    Returns:
+      None
+    """
+
+    engine = self.init_db_engine(credentials)
+    with engine.begin() as connection:
+      self._create_fingerprint_tables(connection)
+      connection.execute(text("DELETE FROM row_fingerprints WHERE table_name = :table_name"), {"table_name": table_name})
+      fingerprints.assign(table_name=table_name).to_sql("row_fingerprints", connection, if_exists="append", index=False, method="multi", chunksize=10000)
+      connection.execute(
+        text(
+          "INSERT INTO table_fingerprints (table_name, fingerprint, row_count) VALUES (:table_name, :fingerprint, :row_count) "
+          "ON CONFLICT (table_name) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, row_count = EXCLUDED.row_count, loaded_at = now()"
+        ),
+        {"table_name": table_name, "fingerprint": fingerprint, "row_count": len(fingerprints)}
+      )
+
+  def clear_table_fingerprint(self, table_name: str, credentials: str) -> None:
+
+    """
+    Removes the fingerprint recorded for a table, so its next load_dimension reloads it in full.
+
+    Does nothing if no fingerprint has ever been recorded in the database.
+
+    Args:
+      table_name (str): The name of the table.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+
+    Returns:
+      None
+    """
+
+    engine = self.init_db_engine(credentials)
+    if not inspect(engine).has_table("table_fingerprints"):
+      return
+    with engine.begin() as connection:
+      connection.execute(text("DELETE FROM table_fingerprints WHERE table_name = :table_name"), {"table_name": table_name})
+
+  def read_high_water_mark(self, source_table: str, credentials: str) -> Optional[int]:
+
+    """
+    Reads the high-water mark recorded for a source table by the last incremental sync.
+
+    Args:
+      source_table (str): The name of the source table.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+
+    Returns:
+      Optional[int]: The recorded high-water mark, or None if the table has never been synced.
+    """
+
+    engine = self.init_db_engine(credentials)
+    with engine.begin() as connection:
+      connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS sync_state ("
+        "source_table TEXT PRIMARY KEY, "
+        "high_water_mark BIGINT NOT NULL, "
+        "synced_at TIMESTAMP NOT NULL DEFAULT now())"
+      ))
+      result = connection.execute(
+        text("SELECT high_water_mark FROM sync_state WHERE source_table = :source_table"),
+        {"source_table": source_table}
+      )
+      return result.scalar()
+
+  def write_high_water_mark(self, source_table: str, high_water_mark: int, credentials: str) -> None:
+
+    """
+    Records the high-water mark reached by an incremental sync of a source table.
+
+    Args:
+      source_table (str): The name of the source table.
+      high_water_mark (int): The highest watermark value that has been loaded.
+      credentials (str): Filepath to the YAML file containing local database credentials.
+
+    Returns:
+      None
+    """
+
+    engine = self.init_db_engine(credentials)
+    with engine.begin() as connection:
+      connection.execute(
+        text(
+          "INSERT INTO sync_state (source_table, high_water_mark) VALUES (:source_table, :high_water_mark) "
+          "ON CONFLICT (source_table) DO UPDATE SET high_water_mark = EXCLUDED.high_water_mark, synced_at = now()"
+        ),
+        {"source_table": source_table, "high_water_mark": int(high_water_mark)}
+      )
+
+  def run_sql_file(self, sql_path: str, credentials: str) -> None:
+
+    """
+    Executes the statements in a SQL file against a database in a single transaction.
+
+    Args:
+      sql_path (str): Filepath to the SQL file.
+      credentials (str): Filepath to the YAML file containing database credentials.
+
+    Returns:
+      None
+    """
+
+    with open(sql_path, "r") as stream:
+      sql = stream.read()
+
+    engine = self.init_db_engine(credentials)
+    connection = engine.raw_connection()
+    try:
+      with connection.cursor() as cursor:
+        cursor.execute(sql)
+      connection.commit()
+    finally:
+      connection.close()
+
+
+POST_LOAD_STAGES = [
+  ("casts", sorted(glob.glob("./sql_queries/cast_column_types/*.sql"))),
+  ("primary_keys", ["./sql_queries/set_primary_keys/set_primary_keys.sql"]),
+  ("foreign_keys", ["./sql_queries/set_foreign_keys/set_foreign_keys.sql"]),
+  ("indexes", ["./sql_queries/set_indexes/set_indexes.sql"]),
+  ("materialized_views", [f"./sql_queries/materialized_views/{view}.sql" for view in ["sales_by_store", "sales_by_month", "time_between_purchases"]]),
+]
+
+STATEMENT_TABLE_PATTERNS = [
+  re.compile(r'^ALTER TABLE (?:ONLY )?"?(\w+)"?', re.IGNORECASE),
+  re.compile(r'^UPDATE "?(\w+)"?', re.IGNORECASE),
+  re.compile(r'^CLUSTER (?:VERBOSE )?"?(\w+)"?', re.IGNORECASE),
+  re.compile(r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s.*?\sON\s+(?:ONLY\s+)?"?(\w+)"?', re.IGNORECASE | re.DOTALL),
+  re.compile(r'^(?:CREATE|DROP|REFRESH) MATERIALIZED VIEW (?:IF (?:NOT )?EXISTS )?"?(\w+)"?', re.IGNORECASE),
+]
+
+EXPLAINABLE_PATTERN = re.compile(r"^(?:SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+def split_sql_statements(sql: str) -> List[str]:
+
+  """
+  Splits a SQL script into its statements, ignoring semicolons inside quotes and comments.
+
+  Args:
+    sql (str): Text of the SQL script.
+
+  Returns:
+    List[str]: The non-empty statements, without their terminating semicolons.
+  """
+
+  statements = []
+  current = []
+  quote = None
+  position = 0
+  while position < len(sql):
+    character = sql[position]
+    if quote is not None:
+      if character == quote:
+        quote = None
+    elif character in ("'", '"'):
+      quote = character
+    elif sql.startswith("--", position):
+      end = sql.find("\n", position)
+      position = len(sql) if end == -1 else end
+      continue
+    elif character == ";":
+      statements.append("".join(current).strip())
+      current = []
+      position += 1
+      continue
+    current.append(character)
+    position += 1
+  statements.append("".join(current).strip())
+  return [statement for statement in statements if statement]
+
+
+def statement_table(statement: str) -> Optional[str]:
+  """Returns the table or materialized view a statement changes, or None if it changes none"""
+  for pattern in STATEMENT_TABLE_PATTERNS:
+    match = pattern.match(statement)
+    if match:
+      return match.group(1)
+  return None
+
+
+def check_orphan_keys(engine: Engine, registry: SchemaRegistry, table_name: str = "orders_table", sample_size: int = 5) -> Dict[str, int]:
+
+  """
+  Counts the rows of a table whose foreign keys match no referenced row, in a single scan of the table.
+
+  The count and a sample of the orphan values of every foreign key are printed.
+
+  Args:
+    engine (Engine): Engine connected to the database.
+    registry (SchemaRegistry): Registry holding the table's foreign keys.
+    table_name (str): Name of the table.
+    sample_size (int): Number of distinct orphan values printed for each foreign key.
+
+  Returns:
+    Dict[str, int]: Number of orphan rows, keyed by constraint name.
+
+  Raises:
+    ValueError: If any foreign key has orphan rows.
+  """
+
+  constraints = [constraint for constraint, _, _, _ in registry.foreign_keys.get(table_name, [])]
+  if not constraints:
+    return {}
+
+  with engine.connect() as connection:
+    row = connection.exec_driver_sql(registry.orphan_keys_query(table_name, sample_size)).mappings().one()
+
+  orphans = {constraint: row[f"{constraint}_orphans"] for constraint in constraints}
+  for constraint in constraints:
+    sample = ", ".join(row[f"{constraint}_sample"] or [])
+    print(f"{table_name}.{constraint}: {orphans[constraint]} orphan rows" + (f" (e.g. {sample})" if sample else ""))
+
+  failing = {constraint: count for constraint, count in orphans.items() if count}
+  if failing:
+    raise ValueError(f"{table_name} has rows with no matching referenced row for {', '.join(failing)}")
+  return orphans
+
+
+class SQLScriptRunner():
+
+  """
+  SQLScriptRunner class runs stages of SQL scripts, running the statements for different tables in parallel.
+
+  Each stage's scripts are split into statements, which are grouped by the table they change.
+  The groups of a stage run at the same time, each in its own transaction on a separate pooled
+  connection, while the statements within a group run in script order. A stage only starts once
+  every group of the previous stage has committed, so casts finish before primary keys are set,
+  and primary keys before foreign keys. Statements that change no table, such as queries, each
+  form their own group.
+
+  The duration of every statement is recorded. SELECT and DML statements are run through
+  EXPLAIN (ANALYZE, BUFFERS), which executes them once and returns their plan, timings and
+  buffer usage, and the plan is recorded alongside the duration. DDL cannot be explained, so
+  only its duration is recorded.
+
+  Methods:
+    add_stage(name, sql_paths):
+      Adds a stage of SQL scripts, run after every stage added before it.
+
+
+    add_statement_stage(name, statements):
+      Adds a stage of SQL statements, run after every stage added before it.
+
+
+    add_check(name, check):
+      Adds a function, run with the runner's engine after every stage added before it.
+
+
+    add_foreign_key_stages(registry, table_names):
+      Adds an orphan key check, then stages adding the foreign keys NOT VALID and validating them.
+
+
+    run():
+      Runs every stage in order, returning a record of each statement.
+
+
+    report(limit):
+      Prints the slowest statements.
+  """
+
+  def __init__(self, credentials: str, max_workers: int = 4, explain: bool = True) -> None:
+    self.credentials = credentials
+    self.max_workers = max_workers
+    self.explain = explain
+    self.stages: List[Tuple[str, Union[Dict[str, List[str]], Callable[[Engine], Any]]]] = []
+    self.records: List[Dict[str, Any]] = []
+    self._lock = threading.Lock()
+
+  def add_stage(self, name: str, sql_paths: List[str]) -> None:
+
+    """
+    Adds a stage of SQL scripts, to be run after every stage added before it.
+
+    Args:
+      name (str): Name of the stage, used in the timing report.
+      sql_paths (List[str]): Filepaths of the stage's SQL scripts.
+
+    Returns:
+      None
+    """
+
+    scripts = []
+    for sql_path in sql_paths:
+      with open(sql_path, "r") as stream:
+        scripts.append((os.path.basename(sql_path), split_sql_statements(stream.read())))
+    self.stages.append((name, self._group_statements(scripts)))
+
+  def add_statement_stage(self, name: str, statements: List[str]) -> None:
+
+    """
+    Adds a stage of SQL statements, to be run after every stage added before it.
+
+    Args:
+      name (str): Name of the stage, used in the timing report.
+      statements (List[str]): The stage's statements, in the order they are run within each table.
+
+    Returns:
+      None
+    """
+
+    self.stages.append((name, self._group_statements([(name, statements)])))
+
+  def add_check(self, name: str, check: Callable[[Engine], Any]) -> None:
+
+    """
+    Adds a check, run on its own after every stage added before it.
+
+    If the check raises, no later stage is run.
+
+    Args:
+      name (str): Name of the check, used in the timing report.
+      check (Callable[[Engine], Any]): Function called with the runner's engine.
+
+    Returns:
+      None
+    """
+
+    self.stages.append((name, check))
+
+  def add_foreign_key_stages(self, registry: SchemaRegistry, table_names: Optional[List[str]] = None) -> None:
+
+    """
+    Adds the stages that set the registry's foreign keys with deferred validation.
+
+    The rows of each table are first checked for orphan keys by check_orphan_keys, in a single
+    scan, so a missing dimension row fails the stage with a report of the orphans before any key
+    is added. The keys are then added NOT VALID, which only takes brief locks and does not scan
+    the table, and finally validated. Validating a key scans the table without blocking reads or
+    writes to it, but its lock conflicts with the validation of other keys on the same table, so
+    the keys of one table are validated in turn, while those of different tables run in parallel.
+
+    Args:
+      registry (SchemaRegistry): Registry holding the foreign keys, parsed from set_foreign_keys.sql.
+      table_names (Optional[List[str]]): Tables whose foreign keys are set, or None for every table with foreign keys.
+
+    Returns:
+      None
+    """
+
+    table_names = list(registry.foreign_keys) if table_names is None else table_names
+    self.add_check("orphan_keys", lambda engine: [check_orphan_keys(engine, registry, table_name) for table_name in table_names])
+    self.add_statement_stage("foreign_keys_not_valid", [statement for table_name in table_names for statement in registry.foreign_key_statements(table_name, not_valid=True)])
+    self.add_statement_stage("validate_foreign_keys", [statement for table_name in table_names for statement in registry.validate_foreign_key_statements(table_name)])
+
+  def _group_statements(self, scripts: List[Tuple[str, List[str]]]) -> Dict[str, List[str]]:
+    """Returns the statements of each named script grouped by the table they change, in script order"""
+    groups: Dict[str, List[str]] = {}
+    for script_name, statements in scripts:
+      for number, statement in enumerate(statements):
+        table = statement_table(statement) or f"{script_name}#{number + 1}"
+        groups.setdefault(table, []).append(statement)
+    return groups
+
+  def _run_group(self, engine: Engine, stage: str, table: str, statements: List[str]) -> None:
+    """Runs one group's statements in order, in a single transaction, recording each one"""
+    with engine.begin() as connection:
+      for statement in statements:
+        explained = self.explain and EXPLAINABLE_PATTERN.match(statement) is not None
+        start_time = time.perf_counter()
+        result = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}" if explained else statement)
+        plan = "\n".join(row[0] for row in result.fetchall()) if explained else None
+        seconds = time.perf_counter() - start_time
+        with self._lock:
+          self.records.append({"stage": stage, "table": table, "statement": " ".join(statement.split()), "seconds": seconds, "plan": plan})
+
+  def run(self) -> List[Dict[str, Any]]:
+
+    """
+    Runs every stage and check in order, running the groups of statements within a stage in parallel.
+
+    If a check raises, its exception is passed on and no later stage runs. If any group of a
+    stage fails, its transaction is rolled back, the other groups of the stage are allowed to
+    finish, and a RuntimeError is raised before the next stage starts.
+
+    Returns:
+      List[Dict[str, Any]]: A record of each statement's stage, table, text, seconds and plan.
+    """
+
+    engine = DatabaseConnector().init_db_engine(self.credentials)
+
+    for stage, groups in self.stages:
+      start_time = time.perf_counter()
+      if callable(groups):
+        try:
+          groups(engine)
+        finally:
+          seconds = time.perf_counter() - start_time
+          self.records.append({"stage": stage, "table": None, "statement": stage, "seconds": seconds, "plan": None})
+          print(f"Check {stage}: {seconds:.2f} seconds")
+        continue
+
+      with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        futures = {table: executor.submit(self._run_group, engine, stage, table, statements) for table, statements in groups.items()}
+      failures = {table: future.exception() for table, future in futures.items() if future.exception() is not None}
+      print(f"Stage {stage}: {len(groups)} tables in {time.perf_counter() - start_time:.2f} seconds")
+      if failures:
+        details = "; ".join(f"{table}: {error}" for table, error in failures.items())
+        raise RuntimeError(f"Stage {stage} failed for {len(failures)} of {len(groups)} tables: {details}")
+
+    return self.records
+
+  def report(self, limit: int = 10) -> None:
+
+    """
+    Prints the slowest statements run so far, with the plans of any that were explained.
+
+    Args:
+      limit (int): Number of statements to print.
+
+    Returns:
+      None
+    """
+
+    print(f"{'stage':<20} {'table':<24} {'seconds':>8}  statement")
+    for record in sorted(self.records, key=lambda record: record["seconds"], reverse=True)[:limit]:
+      print(f"{record['stage']:<20} {record['table'] or '':<24} {record['seconds']:>8.3f}  {record['statement'][:80]}")
+      if record["plan"] is not None:
+        for line in record["plan"].splitlines():
+          print(f"{'':<55}{line}")
+
 
 if __name__ == "__main__":
-  cred_path = "./db_creds.yaml"
-  connection = DatabaseConnector()
-  connection.list_db_tables(cred_path)
\ No newline at end of file
+  parser = argparse.ArgumentParser(description="List a database's tables, or run and time the post-load SQL scripts against it.")
+  parser.add_argument("--credentials", default="./db_creds.yaml")
+  parser.add_argument("--run-scripts", action="store_true", help="Run the post-load SQL stages")
+  parser.add_argument("--skip", nargs="*", default=[], choices=[name for name, _ in POST_LOAD_STAGES], help="Post-load stages not to run")
+  parser.add_argument("--immediate-foreign-keys", action="store_true", help="Add the foreign keys with set_foreign_keys.sql, validating each as it is added, instead of checking for orphans first and validating them afterwards")
+  parser.add_argument("--profile-queries", action="store_true", help="Run the data_interrogation queries through EXPLAIN (ANALYZE, BUFFERS)")
+  parser.add_argument("--max-workers", type=int, default=4)
+  args = parser.parse_args()
+
+  if not args.run_scripts and not args.profile_queries:
+    connection = DatabaseConnector()
+    connection.list_db_tables(args.credentials)
+  else:
+    runner = SQLScriptRunner(args.credentials, max_workers=args.max_workers)
+    if args.run_scripts:
+      for name, sql_paths in POST_LOAD_STAGES:
+        if name == "foreign_keys" and not args.immediate_foreign_keys and name not in args.skip:
+          runner.add_foreign_key_stages(SchemaRegistry())
+        elif name not in args.skip:
+          runner.add_stage(name, sql_paths)
+    if args.profile_queries:
+      runner.add_stage("data_interrogation", sorted(glob.glob("./sql_queries/data_interrogation/*/*.sql")))
+    runner.run()
+    runner.report(limit=20)
\ No newline at end of file
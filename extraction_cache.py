@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import json
+import os
+import pandas as pd
+from typing import Any, Dict, Optional
+
+
+def prepare_for_parquet(dataframe: pd.DataFrame) -> pd.DataFrame:
+
+  """
+  Returns a copy of the DataFrame that can be written to Parquet.
+
+  Object columns are converted so that every non-null value is a string, as Parquet columns
+  must have a single type. Extracted source data is text, so this does not change its values.
+
+  Args:
+    dataframe (pd.DataFrame): DataFrame to prepare.
+
+  Returns:
+    pd.DataFrame: DataFrame with consistently typed object columns.
+  """
+
+  prepared = dataframe.copy()
+  for column in prepared.columns[prepared.dtypes == object]:
+    values = prepared[column]
+    prepared[column] = values.where(values.isna(), values.astype(str))
+  return prepared
+
+
+class ExtractionCache():
+
+  """
+  ExtractionCache class stores extracted DataFrames on disk as Parquet files, keyed by source content.
+
+  Keys are built from an identifier of the source's content, such as a hash or ETag, and the
+  options used to extract it, so a changed source or changed options never return a stale entry.
+  When the cache grows beyond max_bytes, the least recently used entries are evicted.
+
+  Methods:
+    make_key(source_id, options) -> str
+      Builds a cache key from a source content identifier and extraction options.
+
+
+    get(key) -> Optional[pd.DataFrame]
+      Returns the cached DataFrame for a key, or None on a miss.
+
+
+    put(key, dataframe) -> None
+      Stores a DataFrame under a key and evicts old entries if the cache is too large.
+
+
+    evict() -> None
+      Removes least recently used entries until the cache fits within max_bytes.
+
+
+    clear() -> int
+      Removes every entry from the cache.
+  """
+
+  def __init__(self, cache_dir: str = "./.extraction_cache", max_bytes: int = 500 * 1024 ** 2) -> None:
+    self.cache_dir = cache_dir
+    self.max_bytes = max_bytes
+    os.makedirs(self.cache_dir, exist_ok=True)
+
+  def _path(self, key: str) -> str:
+    return os.path.join(self.cache_dir, f"{key}.parquet")
+
+  def make_key(self, source_id: str, options: Dict[str, Any]) -> str:
+
+    """
+    Builds a cache key from a source content identifier and the extraction options.
+
+    Args:
+      source_id (str): Identifier of the source's content, such as a SHA-256 digest or ETag.
+      options (Dict[str, Any]): Options used to extract the DataFrame from the source.
+
+    Returns:
+      str: Hex digest identifying the cache entry.
+    """
+
+    payload = json.dumps({"source": source_id, "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+  def get(self, key: str) -> Optional[pd.DataFrame]:
+
+    """
+    Returns the cached DataFrame for a key, or None if there is no entry.
+
+    Args:
+      key (str): Cache key built by make_key.
+
+    Returns:
+      Optional[pd.DataFrame]: The cached DataFrame, or None on a miss.
+    """
+
+    path = self._path(key)
+    if not os.path.exists(path):
+      return None
+    os.utime(path)
+    return pd.read_parquet(path)
+
+  def put(self, key: str, dataframe: pd.DataFrame) -> None:
+
+    """
+    Stores a DataFrame under a key, then evicts old entries if the cache is too large.
+
+    Args:
+      key (str): Cache key built by make_key.
+      dataframe (pd.DataFrame): DataFrame to store.
+
+    Returns:
+      None
+    """
+
+    path = self._path(key)
+    temporary_path = f"{path}.tmp"
+    prepare_for_parquet(dataframe).to_parquet(temporary_path, index=False)
+    os.replace(temporary_path, path)
+    self.evict()
+
+  def evict(self) -> None:
+
+    """
+    Removes the least recently used entries until the cache fits within max_bytes.
+
+    Returns:
+      None
+    """
+
+    entries = []
+    for name in os.listdir(self.cache_dir):
+      if name.endswith(".parquet"):
+        stat = os.stat(os.path.join(self.cache_dir, name))
+        entries.append((stat.st_mtime, stat.st_size, name))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+      if total_bytes <= self.max_bytes:
+        break
+      os.remove(os.path.join(self.cache_dir, name))
+      total_bytes -= size
+
+  def clear(self) -> int:
+
+    """
+    Removes every entry from the cache.
+
+    Returns:
+      int: Number of entries removed.
+    """
+
+    removed = 0
+    for name in os.listdir(self.cache_dir):
+      if name.endswith(".parquet") or name.endswith(".parquet.tmp"):
+        os.remove(os.path.join(self.cache_dir, name))
+        removed += 1
+    return removed
+
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Manage the on-disk extraction cache.")
+  parser.add_argument("command", choices=["clear"], help="clear: remove every cached extraction")
+  parser.add_argument("--cache-dir", default="./.extraction_cache")
+  args = parser.parse_args()
+
+  cache = ExtractionCache(args.cache_dir)
+  if args.command == "clear":
+    print(f"Removed {cache.clear()} cached extractions from {args.cache_dir}")
@@ -0,0 +1,155 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from typing import Any, Dict, Optional
+
+
+class HTTPCache():
+
+  """
+  HTTPCache class stores HTTP GET responses on disk, keyed by URL, and revalidates them with conditional requests.
+
+  Each entry holds a response's body, headers and validators (ETag and Last-Modified). When a
+  cached URL is requested again, If-None-Match and If-Modified-Since headers are sent, and on a
+  304 Not Modified the cached body is returned, so only changed resources are downloaded. For
+  servers that send no validators, a ttl can be given: entries younger than the ttl are returned
+  without any request, and older entries without validators are downloaded again.
+
+  Methods:
+    get(url, headers, session, timeout) -> requests.Response
+      Returns the response for a URL, from the cache where it is still valid.
+
+
+    clear() -> int
+      Removes every entry from the cache.
+  """
+
+  def __init__(self, cache_dir: str = "./.http_cache", ttl: Optional[float] = None) -> None:
+    self.cache_dir = cache_dir
+    self.ttl = ttl
+    self.hits = 0
+    self.revalidated = 0
+    self.misses = 0
+    self._lock = threading.Lock()
+    os.makedirs(self.cache_dir, exist_ok=True)
+
+  def _path(self, url: str) -> str:
+    return os.path.join(self.cache_dir, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+  def _count(self, counter: str) -> None:
+    with self._lock:
+      setattr(self, counter, getattr(self, counter) + 1)
+
+  def _load(self, url: str) -> Optional[Dict[str, Any]]:
+    """Returns the cache entry for a URL, or None if there is no readable entry"""
+    try:
+      with open(self._path(url), "r") as stream:
+        return json.load(stream)
+    except (OSError, ValueError):
+      return None
+
+  def _store(self, url: str, entry: Dict[str, Any]) -> None:
+    """Writes a cache entry for a URL, replacing any previous entry atomically"""
+    path = self._path(url)
+    temporary_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "w") as stream:
+      json.dump(entry, stream)
+    os.replace(temporary_path, path)
+
+  def _response(self, url: str, entry: Dict[str, Any]) -> requests.Response:
+    """Builds a 200 response from a cache entry"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = entry["encoding"]
+    response._content = base64.b64decode(entry["body"])
+    return response
+
+  def get(self, url: str, headers: Optional[Dict[str, str]] = None, session: Optional[requests.Session] = None, timeout: float = 30) -> requests.Response:
+
+    """
+    Returns the response for a GET request to a URL, using the cache where it is still valid.
+
+    Successful responses are cached if they carry an ETag or Last-Modified header, or if a ttl
+    is set. Error responses are returned as they are and never cached, so callers can still
+    check them with raise_for_status.
+
+    Args:
+      url (str): URL to request.
+      headers (Optional[Dict[str, str]]): Headers sent with the request.
+      session (Optional[requests.Session]): Session to send the request with, or None to use a new connection.
+      timeout (float): Seconds to wait for the server to connect or send data before raising requests.Timeout.
+
+    Returns:
+      requests.Response: The server's response, or a 200 response built from the cache.
+    """
+
+    entry = self._load(url)
+    if entry is not None and self.ttl is not None and time.time() - entry["stored_at"] < self.ttl:
+      self._count("hits")
+      return self._response(url, entry)
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+      if entry.get("etag"):
+        request_headers["If-None-Match"] = entry["etag"]
+      if entry.get("last_modified"):
+        request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+      self._count("revalidated")
+      entry["stored_at"] = time.time()
+      self._store(url, entry)
+      return self._response(url, entry)
+
+    self._count("misses")
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 200 and (etag or last_modified or self.ttl is not None):
+      self._store(url, {
+        "url": url,
+        "headers": dict(response.headers),
+        "encoding": response.encoding,
+        "body": base64.b64encode(response.content).decode("ascii"),
+        "etag": etag,
+        "last_modified": last_modified,
+        "stored_at": time.time(),
+      })
+    return response
+
+  def clear(self) -> int:
+
+    """
+    Removes every entry from the cache.
+
+    Returns:
+      int: Number of entries removed.
+    """
+
+    removed = 0
+    for name in os.listdir(self.cache_dir):
+      if name.endswith(".json") or name.endswith(".tmp"):
+        os.remove(os.path.join(self.cache_dir, name))
+        removed += 1
+    return removed
+
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Manage the on-disk HTTP response cache.")
+  parser.add_argument("command", choices=["clear"], help="clear: remove every cached response")
+  parser.add_argument("--cache-dir", default="./.http_cache")
+  args = parser.parse_args()
+
+  cache = HTTPCache(args.cache_dir)
+  if args.command == "clear":
+    print(f"Removed {cache.clear()} cached responses from {args.cache_dir}")
@@ -0,0 +1,209 @@
+import json
+import resource
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class PipelineMetrics():
+
+  """
+  PipelineMetrics class records the wall time, row counts and memory use of each pipeline stage.
+
+  Each measured stage produces a record with its wall time, rows in and out, and the change in
+  peak RSS. If trace_memory is set, the peak Python allocation during the stage is also recorded
+  using tracemalloc, at the cost of slowing the stage down. Tracing is started once, when the
+  metrics are created or unpickled in a worker process, and runs until stop_tracing is called.
+  Both memory figures cover the whole process, so stages running at the same time in different
+  threads, and stages nested inside each other, are counted together.
+
+  Records are tagged with the run_id of the metrics that made them, and appended to a JSON lines
+  file, if one is given. They can be exported in the Prometheus text format.
+
+  Methods:
+    measure(stage, table, rows_in) -> Iterator[Dict[str, Any]]
+      Context manager that measures a stage and records the result.
+
+
+    to_prometheus() -> str
+      Returns the recorded metrics in the Prometheus text exposition format.
+
+
+    write_prometheus(path) -> None
+      Writes the recorded metrics to a file in the Prometheus text exposition format.
+
+
+    load_records() -> None
+      Replaces the recorded metrics with those of this run in the JSON lines file.
+
+
+    stop_tracing() -> None
+      Stops tracemalloc, if these metrics started it.
+  """
+
+  def __init__(self, output_path: Optional[str] = None, trace_memory: bool = False) -> None:
+    self.output_path = output_path
+    self.trace_memory = trace_memory
+    self.run_id = uuid.uuid4().hex
+    self.records: List[Dict[str, Any]] = []
+    self.lock = threading.Lock()
+    self._open_records: List[Dict[str, Any]] = []
+    self._started_tracing = False
+    self._start_tracing()
+
+  def __getstate__(self) -> Dict[str, Any]:
+    # Locks cannot be pickled, so a fresh one is created when sent to a worker process,
+    # which also traces its own allocations
+    state = self.__dict__.copy()
+    del state["lock"]
+    state["_open_records"] = []
+    state["_started_tracing"] = False
+    return state
+
+  def __setstate__(self, state: Dict[str, Any]) -> None:
+    self.__dict__.update(state)
+    self.lock = threading.Lock()
+    self._start_tracing()
+
+  def _start_tracing(self) -> None:
+    if self.trace_memory and not tracemalloc.is_tracing():
+      tracemalloc.start()
+      self._started_tracing = True
+
+  def stop_tracing(self) -> None:
+    """Stops tracemalloc if these metrics started it. Call only once no stage is being measured"""
+    if self._started_tracing:
+      tracemalloc.stop()
+      self._started_tracing = False
+
+  def _fold_traced_peak(self) -> int:
+    """Adds the traced peak since the last fold to every open stage and resets it, returning the current traced size. Call with the lock held"""
+    current, peak = tracemalloc.get_traced_memory()
+    for record in self._open_records:
+      record["_traced_peak"] = max(record["_traced_peak"], peak)
+    tracemalloc.reset_peak()
+    return current
+
+  @contextmanager
+  def measure(self, stage: str, table: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+
+    """
+    Measures the stage run inside the context and records the result.
+
+    The record is yielded so that the stage can set "rows_out" once it knows it.
+
+    Args:
+      stage (str): Name of the stage, e.g. "extract", "load" or a cleaning step.
+      table (str): Name of the table the stage works on.
+      rows_in (Optional[int]): Number of rows passed into the stage.
+
+    Yields:
+      Dict[str, Any]: The record for this stage.
+    """
+
+    record = {"stage": stage, "table": table, "rows_in": rows_in, "rows_out": None, "run_id": self.run_id}
+
+    # The traced peak is global, so it is only reset after being folded into every open stage
+    tracing = self.trace_memory and tracemalloc.is_tracing()
+    if tracing:
+      with self.lock:
+        traced_start = self._fold_traced_peak()
+        record["_traced_peak"] = traced_start
+        self._open_records.append(record)
+
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    try:
+      yield record
+    finally:
+      record["wall_time_s"] = time.perf_counter() - start_time
+      # ru_maxrss is reported in kilobytes on Linux
+      record["peak_rss_delta_bytes"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_start) * 1024
+      if tracing:
+        with self.lock:
+          self._fold_traced_peak()
+          self._open_records.remove(record)
+        record["traced_peak_bytes"] = record.pop("_traced_peak") - traced_start
+      record["timestamp"] = time.time()
+      self._record(record)
+
+  def _record(self, record: Dict[str, Any]) -> None:
+    """Stores a record, and appends it to the JSON lines file if one was given"""
+    with self.lock:
+      self.records.append(record)
+      if self.output_path is not None:
+        with open(self.output_path, "a") as stream:
+          stream.write(json.dumps(record) + "\n")
+
+  def to_prometheus(self) -> str:
+
+    """
+    Returns the recorded metrics in the Prometheus text exposition format.
+
+    When a stage has been measured more than once, the latest record is exported.
+
+    Returns:
+      str: Metrics text, one gauge per measured value.
+    """
+
+    gauges = {
+      "wall_time_s": ("mrdc_stage_wall_time_seconds", "Wall time of the pipeline stage in seconds."),
+      "rows_in": ("mrdc_stage_rows_in", "Rows passed into the pipeline stage."),
+      "rows_out": ("mrdc_stage_rows_out", "Rows returned by the pipeline stage."),
+      "peak_rss_delta_bytes": ("mrdc_stage_peak_rss_delta_bytes", "Increase in peak resident set size during the stage."),
+      "traced_peak_bytes": ("mrdc_stage_traced_peak_bytes", "Peak Python allocation during the stage, from tracemalloc."),
+    }
+
+    with self.lock:
+      latest = {(record["table"], record["stage"]): record for record in self.records}
+
+    lines = []
+    for field, (name, description) in gauges.items():
+      samples = [
+        f'{name}{{table="{table}",stage="{stage}"}} {record[field]}'
+        for (table, stage), record in latest.items()
+        if record.get(field) is not None
+      ]
+      if samples:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+  def write_prometheus(self, path: str) -> None:
+
+    """
+    Writes the recorded metrics to a file in the Prometheus text exposition format.
+
+    The file can be collected by the node exporter's textfile collector.
+
+    Args:
+      path (str): Filepath to write the metrics to.
+
+    Returns:
+      None
+    """
+
+    with open(path, "w") as stream:
+      stream.write(self.to_prometheus())
+
+  def load_records(self) -> None:
+
+    """
+    Replaces the recorded metrics with those of this run in the JSON lines file.
+
+    Stages run in worker processes record into their own copy of the metrics, so their records
+    only reach the parent process through the file. The file is appended to by every run, so
+    records with another run_id are skipped.
+
+    Returns:
+      None
+    """
+
+    with self.lock:
+      with open(self.output_path) as stream:
+        records = [json.loads(line) for line in stream if line.strip()]
+      self.records = [record for record in records if record.get("run_id") == self.run_id]
@@ -1,10 +1,89 @@
-from database_utils import DatabaseConnector
+from database_utils import DatabaseConnector, SQLScriptRunner, POST_LOAD_STAGES
 from data_extraction import DataExtractor
 from data_cleaning import DataCleaning
+from pipeline_orchestrator import PipelineOrchestrator
+from extraction_cache import ExtractionCache
+from http_cache import HTTPCache
+from data_staging import DataStager
+from instrumentation import PipelineMetrics
+from schema_registry import SchemaRegistry
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+import pandas as pd
+
+
+def measure(metrics: Optional[PipelineMetrics], stage: str, table: str, rows_in: Optional[int] = None) -> ContextManager[Dict[str, Any]]:
+  """
+  Returns a context manager that measures a stage with the given metrics, or does nothing if metrics is None.
+
+  Args:
+    metrics (Optional[PipelineMetrics]): Metrics to record the stage in, or None to disable instrumentation.
+    stage (str): Name of the stage, e.g. "extract" or "load".
+    table (str): Name of the table the stage works on.
+    rows_in (Optional[int]): Number of rows passed into the stage.
 
+  Returns:
+    ContextManager[Dict[str, Any]]: Context manager yielding the stage's record.
+  """
+  if metrics is None:
+    return nullcontext({})
+  return metrics.measure(stage, table, rows_in=rows_in)
 
 
-def process_users(remote_creds: str, local_creds: str) -> None:
+def extract_and_clean(source: str, extract: Callable[[], pd.DataFrame], clean: Callable[[pd.DataFrame], pd.DataFrame], staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, registry: Optional[SchemaRegistry] = None) -> pd.DataFrame:
+  """
+  Runs the extract and clean stages for a source, optionally staging the output of each.
+
+  If a staging directory is given, the raw and cleaned DataFrames are written to it as
+  Parquet by a DataStager. Setting resume_from to "raw" reuses the staged raw data and
+  re-runs the cleaning, while "cleaned" reuses the staged cleaned data, so only the load
+  is re-run. Stages with no staged output are run as normal. If a schema registry is given,
+  the cleaned DataFrame's dtypes are optimised as part of the clean stage. If metrics are
+  given, the extract and clean stages are measured whenever they are run.
+
+  Args:
+    source (str): Name of the source, used to locate its staged data.
+    extract (Callable[[], pd.DataFrame]): Function that extracts the raw DataFrame.
+    clean (Callable[[pd.DataFrame], pd.DataFrame]): Function that cleans the raw DataFrame.
+    staging_dir (Optional[str]): Directory for staged data, or None to disable staging.
+    resume_from (Optional[str]): None, "raw" or "cleaned".
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned DataFrame's dtypes, or None.
+
+  Returns:
+    pd.DataFrame: The cleaned DataFrame.
+  """
+  def measured_extract() -> pd.DataFrame:
+    with measure(metrics, "extract", source) as record:
+      dataframe = extract()
+      record["rows_out"] = len(dataframe)
+    return dataframe
+
+  def measured_clean(dataframe: pd.DataFrame) -> pd.DataFrame:
+    with measure(metrics, "clean", source, rows_in=len(dataframe)) as record:
+      dataframe = clean(dataframe)
+      record["rows_out"] = len(dataframe)
+    if registry is not None:
+      with measure(metrics, "optimise_dtypes", source, rows_in=len(dataframe)) as record:
+        dataframe = registry.optimise_dtypes(dataframe, source)
+        record["rows_out"] = len(dataframe)
+    return dataframe
+
+  if staging_dir is None:
+    return measured_clean(measured_extract())
+
+  stager = DataStager(staging_dir)
+
+  def extract_stage() -> pd.DataFrame:
+    return stager.stage(source, "raw", measured_extract, reuse=resume_from is not None)
+
+  def clean_stage() -> pd.DataFrame:
+    return measured_clean(extract_stage())
+
+  return stager.stage(source, "cleaned", clean_stage, reuse=resume_from == "cleaned")
+
+
+def process_users(remote_creds: str, local_creds: str, load_method: str = "to_sql", stream_chunksize: Optional[int] = None, staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None, clean_partitions: Optional[int] = None, detect_changes: bool = False) -> None:
   """
   Governs the extraction, cleaning and uploading of the dim_users dataframe to the PSQL database.
 
@@ -17,25 +96,61 @@ def process_users(remote_creds: str, local_creds: str) -> None:
   and applies cleaning steps to it, before returning the cleaned dataframe.
 
   The cleaned dataframe is then uploaded to the local database using user-supplied
-  credentials.
+  credentials. If a stream_chunksize is given, the table is instead streamed from the
+  remote database in chunks, and each chunk is cleaned and uploaded in turn, so memory
+  use is bounded by the chunk size rather than the size of the table. A streamed table is
+  measured as a single "stream" stage, alongside the steps of each chunk's cleaning.
 
   Args:
     remote_creds (str): Path to the YAML file containing the remote database credentials.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    stream_chunksize (Optional[int]): Number of rows per streamed chunk, or None to read the whole table at once.
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
+    clean_partitions (Optional[int]): Number of processes to clean a table read at once with, using DataCleaning.clean_in_partitions, or None to clean it in this process.
+    detect_changes (bool): Whether to load the table with DatabaseConnector.load_dimension, which skips it if it is unchanged and
+      otherwise writes only its changed rows. Requires a schema, and does not apply to a streamed table.
   """
   connection = DatabaseConnector()
   remote_engine = connection.init_db_engine(remote_creds)
   
   extractor = DataExtractor()
-  legacy_users_df = extractor.read_rds_table(remote_engine, "legacy_users")
-  
-  cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_user_data(legacy_users_df)
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
+
+  if stream_chunksize is not None:
+    with measure(metrics, "stream", "dim_users") as record:
+      record["rows_out"] = 0
+      chunks = extractor.read_rds_table_in_chunks(remote_engine, "legacy_users", chunksize=stream_chunksize, order_by="index")
+      for chunk_number, chunk in enumerate(chunks):
+        cleaned_chunk = cleaner.clean_user_data(chunk)
+        if registry is not None:
+          cleaned_chunk = registry.optimise_dtypes(cleaned_chunk, "dim_users")
+        if_exists = "replace" if chunk_number == 0 else "append"
+        connection.upload_to_db(cleaned_chunk, "dim_users", local_creds, method=load_method, if_exists=if_exists, registry=schema)
+        record["rows_out"] += len(cleaned_chunk)
+    return
+
+  clean = cleaner.clean_user_data
+  if clean_partitions is not None:
+    clean = lambda dataframe: cleaner.clean_in_partitions("clean_user_data", dataframe, clean_partitions)
+
+  cleaned_df = extract_and_clean("dim_users", lambda: extractor.read_rds_table(remote_engine, "legacy_users"), clean, staging_dir, resume_from, metrics, registry)
   
-  connection.upload_to_db(cleaned_df, "dim_users", local_creds)
+  with measure(metrics, "load", "dim_users", rows_in=len(cleaned_df)) as record:
+    if detect_changes and schema is not None:
+      record["rows_out"] = connection.load_dimension(cleaned_df, "dim_users", local_creds, schema, method=load_method)
+    else:
+      connection.upload_to_db(cleaned_df, "dim_users", local_creds, method=load_method, registry=schema)
+      record["rows_out"] = len(cleaned_df)
 
 
-def process_dim_card_details(pdf_path: str, local_creds: str) -> None:
+def process_dim_card_details(pdf_path: str, local_creds: str, load_method: str = "to_sql", cache_dir: Optional[str] = None, pdf_workers: int = 1, staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None, detect_changes: bool = False) -> None:
   """
   Governs the extraction, cleaning and uploading of the dim_card_details dataframe to the PSQL database.
 
@@ -52,19 +167,36 @@ def process_dim_card_details(pdf_path: str, local_creds: str) -> None:
   Args:
     pdf_path (str): Path to the YAML file containing the PDF link.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    cache_dir (Optional[str]): Directory of the PDF extraction cache, or None to always extract the PDF.
+    pdf_workers (int): Number of worker processes used to extract the PDF's pages in parallel.
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
+    detect_changes (bool): Whether to load the table with DatabaseConnector.load_dimension, which skips it if it is unchanged and
+      otherwise writes only its changed rows. Requires a schema, and does not apply to a streamed table.
   """
   connection = DatabaseConnector()
 
   extractor = DataExtractor()
-  dim_card_details_df = extractor.retrieve_pdf_data(pdf_path)
-  
-  cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_card_data(dim_card_details_df)
+  cache = ExtractionCache(cache_dir) if cache_dir is not None else None
 
-  connection.upload_to_db(cleaned_df, "dim_card_details", local_creds)
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
+  cleaned_df = extract_and_clean("dim_card_details", lambda: extractor.retrieve_pdf_data(pdf_path, cache=cache, workers=pdf_workers), cleaner.clean_card_data, staging_dir, resume_from, metrics, registry)
 
+  with measure(metrics, "load", "dim_card_details", rows_in=len(cleaned_df)) as record:
+    if detect_changes and schema is not None:
+      record["rows_out"] = connection.load_dimension(cleaned_df, "dim_card_details", local_creds, schema, method=load_method)
+    else:
+      connection.upload_to_db(cleaned_df, "dim_card_details", local_creds, method=load_method, registry=schema)
+      record["rows_out"] = len(cleaned_df)
 
-def process_store_data(api_creds: str, local_creds: str) -> None:
+
+def process_store_data(api_creds: str, local_creds: str, max_workers: int = 1, load_method: str = "to_sql", staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None, detect_changes: bool = False, http_cache_dir: Optional[str] = None, http_cache_ttl: Optional[float] = None) -> None:
   """
   Governs the extraction, cleaning and uploading of the dim_store_details dataframe to the PSQL database.
 
@@ -81,19 +213,42 @@ def process_store_data(api_creds: str, local_creds: str) -> None:
   Args:
     api_creds (str): Path to the YAML file containing the credentials for the API.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    max_workers (int): Number of concurrent API requests. A value of 1 fetches stores sequentially.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
+    detect_changes (bool): Whether to load the table with DatabaseConnector.load_dimension, which skips it if it is unchanged and
+      otherwise writes only its changed rows. Requires a schema, and does not apply to a streamed table.
+    http_cache_dir (Optional[str]): Directory of the API response cache, or None to always download every store.
+    http_cache_ttl (Optional[float]): Seconds a cached response is used for without asking the API, or None to always revalidate.
   """
   connection = DatabaseConnector()
 
   extractor = DataExtractor()
-  store_details_df = extractor.retrieve_stores_data(api_creds)
+  http_cache = HTTPCache(http_cache_dir, ttl=http_cache_ttl) if http_cache_dir is not None else None
 
-  cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_store_data(store_details_df)
+  def extract() -> pd.DataFrame:
+    if max_workers > 1:
+      return extractor.retrieve_stores_data_concurrently(api_creds, max_workers=max_workers, http_cache=http_cache)
+    return extractor.retrieve_stores_data(api_creds, http_cache=http_cache)
+
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
+  cleaned_df = extract_and_clean("dim_store_details", extract, cleaner.clean_store_data, staging_dir, resume_from, metrics, registry)
 
-  connection.upload_to_db(cleaned_df, "dim_store_details", local_creds)
+  with measure(metrics, "load", "dim_store_details", rows_in=len(cleaned_df)) as record:
+    if detect_changes and schema is not None:
+      record["rows_out"] = connection.load_dimension(cleaned_df, "dim_store_details", local_creds, schema, method=load_method)
+    else:
+      connection.upload_to_db(cleaned_df, "dim_store_details", local_creds, method=load_method, registry=schema)
+      record["rows_out"] = len(cleaned_df)
 
 
-def process_products_data(s3_path: str, local_creds: str) -> None:
+def process_products_data(s3_path: str, local_creds: str, load_method: str = "to_sql", stream_chunksize: Optional[int] = None, staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None, detect_changes: bool = False) -> None:
   """
   Governs the extraction, cleaning and uploading of the dim_products dataframe to the PSQL database.
 
@@ -105,24 +260,54 @@ def process_products_data(s3_path: str, local_creds: str) -> None:
   and applies cleaning steps to it, before returning the cleaned dataframe.
 
   The cleaned dataframe is then uploaded to the local database using user-supplied
-  credentials.
+  credentials. If a stream_chunksize is given, the object is instead parsed from the S3
+  download stream in chunks, and each chunk is cleaned and uploaded in turn. A streamed
+  table is measured as a single "stream" stage, alongside the steps of each chunk's cleaning.
 
   Args:
     s3_path (str): Path to the YAML file containing the link to the S3 bucket.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    stream_chunksize (Optional[int]): Number of rows per streamed chunk, or None to read the whole object at once.
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
+    detect_changes (bool): Whether to load the table with DatabaseConnector.load_dimension, which skips it if it is unchanged and
+      otherwise writes only its changed rows. Requires a schema, and does not apply to a streamed table.
   """
   connection = DatabaseConnector()
 
   extractor = DataExtractor()
-  product_details_df = extractor.extract_from_s3(s3_path)
-  
-  cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_products_data(product_details_df)
-
-  connection.upload_to_db(cleaned_df, "dim_products", local_creds)
-
-
-def process_orders_table(remote_creds: str, local_creds: str) -> None:
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
+
+  if stream_chunksize is not None:
+    with measure(metrics, "stream", "dim_products") as record:
+      record["rows_out"] = 0
+      chunks = extractor.stream_from_s3(s3_path, chunksize=stream_chunksize)
+      for chunk_number, chunk in enumerate(chunks):
+        cleaned_chunk = cleaner.clean_products_data(chunk)
+        if registry is not None:
+          cleaned_chunk = registry.optimise_dtypes(cleaned_chunk, "dim_products")
+        if_exists = "replace" if chunk_number == 0 else "append"
+        connection.upload_to_db(cleaned_chunk, "dim_products", local_creds, method=load_method, if_exists=if_exists, registry=schema)
+        record["rows_out"] += len(cleaned_chunk)
+    return
+
+  cleaned_df = extract_and_clean("dim_products", lambda: extractor.extract_from_s3(s3_path), cleaner.clean_products_data, staging_dir, resume_from, metrics, registry)
+
+  with measure(metrics, "load", "dim_products", rows_in=len(cleaned_df)) as record:
+    if detect_changes and schema is not None:
+      record["rows_out"] = connection.load_dimension(cleaned_df, "dim_products", local_creds, schema, method=load_method)
+    else:
+      connection.upload_to_db(cleaned_df, "dim_products", local_creds, method=load_method, registry=schema)
+      record["rows_out"] = len(cleaned_df)
+
+
+def process_orders_table(remote_creds: str, local_creds: str, load_method: str = "to_sql", stream_chunksize: Optional[int] = None, staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None, clean_partitions: Optional[int] = None) -> None:
   """
   Governs the extraction, cleaning and uploading of the orders_table dataframe to the PSQL database.
 
@@ -135,25 +320,98 @@ def process_orders_table(remote_creds: str, local_creds: str) -> None:
   and applies cleaning steps to it, before returning the cleaned dataframe.
 
   The cleaned dataframe is then uploaded to the local database using user-supplied
-  credentials.
+  credentials. If a stream_chunksize is given, the table is instead streamed from the
+  remote database in chunks, and each chunk is cleaned and uploaded in turn, so memory
+  use is bounded by the chunk size rather than the size of the table. A streamed table is
+  measured as a single "stream" stage, alongside the steps of each chunk's cleaning.
 
   Args:
     remote_creds (str): Path to the YAML file containing the remote database credentials.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    stream_chunksize (Optional[int]): Number of rows per streamed chunk, or None to read the whole table at once.
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
+    clean_partitions (Optional[int]): Number of processes to clean a table read at once with, using DataCleaning.clean_in_partitions, or None to clean it in this process.
   """
   connection = DatabaseConnector()
   remote_engine = connection.init_db_engine(remote_creds)
 
   extractor = DataExtractor()
-  orders_df = extractor.read_rds_table(remote_engine, "orders_table")
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
 
+  if stream_chunksize is not None:
+    with measure(metrics, "stream", "orders_table") as record:
+      record["rows_out"] = 0
+      chunks = extractor.read_rds_table_in_chunks(remote_engine, "orders_table", chunksize=stream_chunksize)
+      for chunk_number, chunk in enumerate(chunks):
+        cleaned_chunk = cleaner.clean_orders_table(chunk)
+        if registry is not None:
+          cleaned_chunk = registry.optimise_dtypes(cleaned_chunk, "orders_table")
+        if_exists = "replace" if chunk_number == 0 else "append"
+        connection.upload_to_db(cleaned_chunk, "orders_table", local_creds, method=load_method, if_exists=if_exists, registry=schema)
+        record["rows_out"] += len(cleaned_chunk)
+    return
+
+  clean = cleaner.clean_orders_table
+  if clean_partitions is not None:
+    clean = lambda dataframe: cleaner.clean_in_partitions("clean_orders_table", dataframe, clean_partitions)
+
+  cleaned_df = extract_and_clean("orders_table", lambda: extractor.read_rds_table(remote_engine, "orders_table"), clean, staging_dir, resume_from, metrics, registry)
+
+  with measure(metrics, "load", "orders_table", rows_in=len(cleaned_df)) as record:
+    connection.upload_to_db(cleaned_df, "orders_table", local_creds, method=load_method, registry=schema)
+    record["rows_out"] = len(cleaned_df)
+
+
+def sync_orders_table(remote_creds: str, local_creds: str, stream_chunksize: int = 100000) -> None:
+  """
+  Incrementally syncs the orders_table from the AWS RDS database into the local PSQL database.
+
+  Rather than replacing the whole table, only rows whose "level_0" value is greater than the
+  high-water mark recorded by the previous sync are read. These rows are streamed in chunks,
+  cleaned, and upserted into the local orders_table on "date_uuid". After each chunk has been
+  committed, the high-water mark is advanced, so an interrupted sync resumes where it stopped.
+
+  The first sync, with no recorded high-water mark, loads the whole table. Rows that are
+  modified in place on the remote database without a new "level_0" are not picked up.
+  If any rows were synced, the summary materialized views are refreshed.
+
+  Args:
+    remote_creds (str): Path to the YAML file containing the remote database credentials.
+    local_creds (str): Path to the YAML file containing the local database credentials.
+    stream_chunksize (int): Number of rows per streamed chunk.
+  """
+  connection = DatabaseConnector()
+  remote_engine = connection.init_db_engine(remote_creds)
+
+  high_water_mark = connection.read_high_water_mark("orders_table", local_creds)
+  newer_than = None if high_water_mark is None else ("level_0", high_water_mark)
+
+  extractor = DataExtractor()
   cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_orders_table(orders_df)
 
-  connection.upload_to_db(cleaned_df, "orders_table", local_creds)
+  chunks = extractor.read_rds_table_in_chunks(remote_engine, "orders_table", chunksize=stream_chunksize, order_by="level_0", newer_than=newer_than)
+  synced_rows = 0
+  for chunk in chunks:
+    chunk_high_water_mark = chunk["level_0"].max()
+    cleaned_chunk = cleaner.clean_orders_table(chunk)
+    connection.upsert_to_db(cleaned_chunk, "orders_table", local_creds, key_columns=["date_uuid"])
+    connection.write_high_water_mark("orders_table", chunk_high_water_mark, local_creds)
+    synced_rows += len(cleaned_chunk)
 
+  print(f"Synced {synced_rows} new rows into orders_table")
 
-def process_date_times(s3_path: str, local_creds: str) -> None:
+  if synced_rows:
+    connection.run_sql_file("./sql_queries/materialized_views/refresh_materialized_views.sql", local_creds)
+
+
+def process_date_times(s3_path: str, local_creds: str, load_method: str = "to_sql", staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics: Optional[PipelineMetrics] = None, low_copy: bool = False, registry: Optional[SchemaRegistry] = None, schema: Optional[SchemaRegistry] = None) -> None:
   """
   Governs the extraction, cleaning and uploading of the dim_date_times dataframe to the PSQL database.
 
@@ -170,36 +428,177 @@ def process_date_times(s3_path: str, local_creds: str) -> None:
   Args:
     s3_path (str): Path to the YAML file containing the link to the S3 bucket.
     local_creds (str): Path to the YAML file containing the local database credentials.
+    load_method (str): Load method passed to DatabaseConnector.upload_to_db, either "to_sql" or "copy".
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics (Optional[PipelineMetrics]): Metrics to record the stages in, or None to disable instrumentation.
+    low_copy (bool): Whether to clean the table in DataCleaning's low-copy mode.
+    registry (Optional[SchemaRegistry]): Registry used to optimise the cleaned table's dtypes before loading, or None.
+    schema (Optional[SchemaRegistry]): Registry used to conform the table and create it with its final column types and primary key
+      before loading, or None to load it with pandas' types.
   """
   connection = DatabaseConnector()
 
   extractor = DataExtractor()
-  date_times_df = extractor.extract_from_s3(s3_path)
 
-  cleaner = DataCleaning()
-  cleaned_df = cleaner.clean_date_times_data(date_times_df)
+  cleaner = DataCleaning(metrics=metrics, low_copy=low_copy)
+  cleaned_df = extract_and_clean("dim_date_times", lambda: extractor.extract_from_s3(s3_path), cleaner.clean_date_times_data, staging_dir, resume_from, metrics, registry)
 
-  connection.upload_to_db(cleaned_df, "dim_date_times", local_creds)
+  with measure(metrics, "load", "dim_date_times", rows_in=len(cleaned_df)) as record:
+    connection.upload_to_db(cleaned_df, "dim_date_times", local_creds, method=load_method, registry=schema)
+    record["rows_out"] = len(cleaned_df)
 
 
+def run_sql_script(sql_path: str, local_creds: str) -> None:
+  """
+  Runs a SQL script from the sql_queries/ directory against the local PSQL database.
 
-if __name__ == "__main__":
+  Args:
+    sql_path (str): Path to the SQL file.
+    local_creds (str): Path to the YAML file containing the local database credentials.
+  """
+  connection = DatabaseConnector()
+  connection.run_sql_file(sql_path, local_creds)
 
-  local_creds = "./local_creds.yaml"
-  remote_creds = "./db_creds.yaml"
-  process_users(remote_creds, local_creds)
 
+def drop_foreign_keys(local_creds: str) -> None:
+  """
+  Drops the foreign keys set on the local database by the last run, so the dimension tables can be changed in any order.
 
-  path_to_pdf = "./pdf_link.yaml"
-  process_dim_card_details(path_to_pdf, local_creds)
+  Args:
+    local_creds (str): Path to the YAML file containing the local database credentials.
+  """
+  registry = SchemaRegistry()
+  engine = DatabaseConnector().init_db_engine(local_creds)
+  with engine.begin() as connection:
+    for table_name in registry.foreign_keys:
+      for statement in registry.drop_foreign_key_statements(table_name):
+        connection.exec_driver_sql(statement)
 
-  api_creds = "./api_creds.yaml"
-  process_store_data(api_creds, local_creds)
 
-  s3_path = "./s3_path.yaml"
-  process_products_data(s3_path, local_creds)
+def run_post_load_scripts(local_creds: str, skip_stages: Optional[List[str]] = None, max_workers: int = 4, deferred_foreign_keys: bool = True) -> None:
+  """
+  Runs the post-load SQL stages with a SQLScriptRunner, then prints the slowest statements.
 
-  process_orders_table(remote_creds, local_creds)
+  Args:
+    local_creds (str): Path to the YAML file containing the local database credentials.
+    skip_stages (Optional[List[str]]): Names of stages in POST_LOAD_STAGES not to run.
+    max_workers (int): Maximum number of tables worked on at the same time within a stage.
+    deferred_foreign_keys (bool): Whether to check orphan keys in one scan, then add the foreign keys NOT VALID and
+      validate them, instead of running set_foreign_keys.sql.
+  """
+  runner = SQLScriptRunner(local_creds, max_workers=max_workers)
+  for name, sql_paths in POST_LOAD_STAGES:
+    if name in (skip_stages or []):
+      continue
+    if name == "foreign_keys" and deferred_foreign_keys:
+      runner.add_foreign_key_stages(SchemaRegistry())
+    else:
+      runner.add_stage(name, sql_paths)
+  runner.run()
+  runner.report()
+
+
+def run_pipeline(remote_creds: str, local_creds: str, pdf_path: str, api_creds: str, products_s3_path: str, date_times_s3_path: str, max_workers: int = 6, executor: str = "thread", staging_dir: Optional[str] = None, resume_from: Optional[str] = None, metrics_path: Optional[str] = None, prometheus_path: Optional[str] = None, trace_memory: bool = False, low_copy: bool = False, optimise_dtypes: bool = True, direct_types: bool = True, clean_partitions: Optional[int] = None, detect_changes: bool = True) -> Dict[str, str]:
+  """
+  Runs the whole ETL pipeline as a DAG of jobs on a pool of workers.
+
+  The six process_* jobs are independent of each other and run concurrently. By default, each
+  table is created with its final column types and primary key before it is loaded, using the
+  schema registry. With direct_types off, each table is loaded with pandas' types instead.
+  Once every table is loaded, the post-load SQL scripts are run in stages by a
+  SQLScriptRunner: the column type casts from sql_queries/cast_column_types/ and the primary
+  keys, unless direct_types is on, then the foreign keys, which are checked for orphan rows in
+  a single scan of orders_table before being added NOT VALID and validated, the indexes in
+  sql_queries/set_indexes/, and the summary materialized views in
+  sql_queries/materialized_views/, with the statements for different tables in each stage run
+  in parallel. The materialized views, which the data_interrogation queries read from, and the
+  foreign keys on orders_table, are dropped before any table is replaced. With detect_changes
+  on, the dim_users, dim_card_details, dim_store_details and dim_products tables are
+  fingerprinted, and only rewritten where their contents changed since the last run. When all
+  jobs have finished, the connection pool statistics of the shared database engines are
+  printed and the engines are disposed of.
+
+  If a metrics_path is given, the wall time, row counts and memory use of every extract,
+  clean and load stage, and of each cleaning step, are appended to it as JSON lines. The
+  latest value of each can also be written to prometheus_path in the Prometheus text format.
 
+  Args:
+    remote_creds (str): Path to the YAML file containing the remote database credentials.
+    local_creds (str): Path to the YAML file containing the local database credentials.
+    pdf_path (str): Path to the YAML file containing the PDF link.
+    api_creds (str): Path to the YAML file containing the credentials for the API.
+    products_s3_path (str): Path to the YAML file containing the link to the products S3 bucket.
+    date_times_s3_path (str): Path to the YAML file containing the link to the date times S3 bucket.
+    max_workers (int): Maximum number of jobs running at the same time.
+    executor (str): Either "thread" or "process".
+    staging_dir (Optional[str]): Directory for staged raw and cleaned data, or None to disable staging.
+      Tables that are streamed in chunks are not staged.
+    resume_from (Optional[str]): None, or "raw" or "cleaned" to reuse staged data from that stage.
+    metrics_path (Optional[str]): Path of the JSON lines file for stage metrics, or None to disable instrumentation.
+    prometheus_path (Optional[str]): Path to write the stage metrics to in the Prometheus text format, or None.
+    trace_memory (bool): Whether to also record the peak Python allocation of each stage using tracemalloc.
+    low_copy (bool): Whether to clean the tables in DataCleaning's low-copy mode.
+    optimise_dtypes (bool): Whether to convert cleaned tables to compact dtypes, based on their cast scripts, before loading.
+    direct_types (bool): Whether to create the tables with their final column types and primary keys before loading,
+      instead of running the cast and primary key scripts afterwards.
+    clean_partitions (Optional[int]): Number of processes to clean dim_users with, or None to clean it in a single process.
+    detect_changes (bool): Whether to skip loading unchanged dimension tables, and upsert only the changed rows of the others.
+      Only applies with direct_types on.
+
+  Returns:
+    Dict[str, str]: Mapping of job name to "succeeded", "failed" or "skipped".
+  """
+  schema = SchemaRegistry() if optimise_dtypes or direct_types else None
+  metrics = PipelineMetrics(metrics_path, trace_memory=trace_memory) if metrics_path is not None else None
+  job_options = {"staging_dir": staging_dir, "resume_from": resume_from, "metrics": metrics, "low_copy": low_copy, "registry": schema if optimise_dtypes else None, "schema": schema if direct_types else None}
+
+  orchestrator = PipelineOrchestrator()
+
+  # The summary views depend on the tables, which are dropped when they are replaced
+  orchestrator.add_job("drop_materialized_views", run_sql_script, "./sql_queries/materialized_views/drop_materialized_views.sql", local_creds)
+  # Rows can only be deleted from a dimension table kept between runs once the old orders_table no longer references it
+  orchestrator.add_job("drop_foreign_keys", drop_foreign_keys, local_creds)
+  job_options["depends_on"] = ["drop_materialized_views", "drop_foreign_keys"]
+  dimension_options = {**job_options, "detect_changes": detect_changes}
+
+  orchestrator.add_job("dim_users", process_users, remote_creds, local_creds, load_method="copy", clean_partitions=clean_partitions, **dimension_options)
+  orchestrator.add_job("dim_card_details", process_dim_card_details, pdf_path, local_creds, cache_dir="./.extraction_cache", pdf_workers=4, **dimension_options)
+  orchestrator.add_job("dim_store_details", process_store_data, api_creds, local_creds, max_workers=10, http_cache_dir="./.http_cache", **dimension_options)
+  orchestrator.add_job("dim_products", process_products_data, products_s3_path, local_creds, **dimension_options)
+  orchestrator.add_job("orders_table", process_orders_table, remote_creds, local_creds, load_method="copy", stream_chunksize=100000, **job_options)
+  orchestrator.add_job("dim_date_times", process_date_times, date_times_s3_path, local_creds, **job_options)
+
+  tables = ["dim_users", "dim_card_details", "dim_store_details", "dim_products", "orders_table", "dim_date_times"]
+  skip_stages = ["casts", "primary_keys"] if direct_types else []
+  orchestrator.add_job("post_load_scripts", run_post_load_scripts, local_creds, skip_stages=skip_stages, depends_on=tables)
+
+  statuses = orchestrator.run(max_workers=max_workers, executor=executor)
+
+  connection = DatabaseConnector()
+  for credentials, statistics in connection.pool_statistics().items():
+    print(f"Connection pool for {credentials}:")
+    for name, value in statistics.items():
+      print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+  connection.dispose_engines()
+
+  if metrics is not None:
+    metrics.stop_tracing()
+  if metrics is not None and prometheus_path is not None:
+    metrics.load_records()
+    metrics.write_prometheus(prometheus_path)
+
+  return statuses
+
+
+
+if __name__ == "__main__":
+
+  local_creds = "./local_creds.yaml"
+  remote_creds = "./db_creds.yaml"
+  path_to_pdf = "./pdf_link.yaml"
+  api_creds = "./api_creds.yaml"
+  s3_path = "./s3_path.yaml"
   path_2 = "./s3_path2.yaml"
-  process_date_times(path_2, local_creds)
\ No newline at end of file
+
+  run_pipeline(remote_creds, local_creds, path_to_pdf, api_creds, s3_path, path_2, max_workers=6, metrics_path="./pipeline_metrics.jsonl", prometheus_path="./pipeline_metrics.prom")
\ No newline at end of file
@@ -0,0 +1,127 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class PipelineOrchestrator():
+
+  """
+  PipelineOrchestrator class runs a set of dependent jobs as a DAG on a pool of workers.
+
+  A job is started as soon as all of the jobs it depends on have succeeded. If a job fails,
+  every job that depends on it, directly or indirectly, is skipped.
+
+  Methods:
+    add_job(name, function, *args, depends_on, **kwargs) -> None
+      Registers a job and the jobs it depends on.
+
+
+    run(max_workers, executor) -> Dict[str, str]
+      Runs all registered jobs and returns the final status of each.
+  """
+
+  def __init__(self) -> None:
+    self.jobs: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...], Dict[str, Any], List[str]]] = {}
+
+  def add_job(self, name: str, function: Callable[..., Any], *args: Any, depends_on: Optional[List[str]] = None, **kwargs: Any) -> None:
+
+    """
+    Registers a job to be run by the orchestrator.
+
+    Args:
+      name (str): Unique name of the job.
+      function (Callable[..., Any]): Function to run. Must be picklable when using the process executor.
+      *args (Any): Positional arguments passed to the function.
+      depends_on (Optional[List[str]]): Names of jobs that must succeed before this job starts.
+      **kwargs (Any): Keyword arguments passed to the function.
+
+    Returns:
+      None
+    """
+
+    if name in self.jobs:
+      raise ValueError(f"Job {name} has already been added")
+    self.jobs[name] = (function, args, kwargs, list(depends_on or []))
+
+  def _check_dependencies(self) -> None:
+    """Raises a ValueError if a job depends on an unknown job, or if the jobs contain a cycle"""
+    for name, (_, _, _, depends_on) in self.jobs.items():
+      for dependency in depends_on:
+        if dependency not in self.jobs:
+          raise ValueError(f"Job {name} depends on unknown job {dependency}")
+
+    visited = set()
+    in_progress = set()
+
+    def visit(name: str) -> None:
+      if name in visited:
+        return
+      if name in in_progress:
+        raise ValueError(f"Dependency cycle detected at job {name}")
+      in_progress.add(name)
+      for dependency in self.jobs[name][3]:
+        visit(dependency)
+      in_progress.remove(name)
+      visited.add(name)
+
+    for name in self.jobs:
+      visit(name)
+
+  def run(self, max_workers: int = 4, executor: str = "thread") -> Dict[str, str]:
+
+    """
+    Runs all registered jobs, starting each one as soon as its dependencies have succeeded.
+
+    Args:
+      max_workers (int): Maximum number of jobs running at the same time.
+      executor (str): Either "thread" or "process".
+
+    Returns:
+      Dict[str, str]: Mapping of job name to "succeeded", "failed" or "skipped".
+    """
+
+    if executor == "thread":
+      pool_class = ThreadPoolExecutor
+    elif executor == "process":
+      pool_class = ProcessPoolExecutor
+    else:
+      raise ValueError(f"Invalid executor: {executor}")
+
+    self._check_dependencies()
+
+    statuses: Dict[str, str] = {}
+    pending = list(self.jobs)
+    running: Dict[Future, Tuple[str, float]] = {}
+    pipeline_start = time.time()
+
+    with pool_class(max_workers=max_workers) as pool:
+      while pending or running:
+        for name in list(pending):
+          depends_on = self.jobs[name][3]
+          if any(statuses.get(dependency) in ("failed", "skipped") for dependency in depends_on):
+            statuses[name] = "skipped"
+            pending.remove(name)
+            print(f"Skipping {name}: a dependency did not succeed")
+          elif all(statuses.get(dependency) == "succeeded" for dependency in depends_on):
+            function, args, kwargs, _ = self.jobs[name]
+            print(f"Starting {name}")
+            running[pool.submit(function, *args, **kwargs)] = (name, time.time())
+            pending.remove(name)
+
+        if not running:
+          continue
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+          name, start_time = running.pop(future)
+          elapsed_time = time.time() - start_time
+          try:
+            future.result()
+            statuses[name] = "succeeded"
+            print(f"Finished {name} in {elapsed_time:.2f} seconds")
+          except Exception as e:
+            statuses[name] = "failed"
+            print(f"Job {name} failed after {elapsed_time:.2f} seconds:\n{e}")
+
+    print(f"Pipeline finished in {time.time() - pipeline_start:.2f} seconds")
+    return statuses
@@ -0,0 +1,220 @@
+import random
+import threading
+import time
+import requests
+from email.utils import parsedate_to_datetime
+from http_cache import HTTPCache
+from typing import Any, List, Optional, Tuple
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+
+  """
+  Parses a Retry-After header, given either as a number of seconds or as an HTTP date.
+
+  Args:
+    value (Optional[str]): Value of the header, or None if it was not sent.
+
+  Returns:
+    Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+  """
+
+  if not value:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+    return None
+
+
+class TokenBucket():
+
+  """
+  TokenBucket class limits the rate of requests shared by a pool of threads, adapting the rate to the server.
+
+  Tokens are added at the current rate, up to the bucket's capacity, and each request takes one.
+  The rate is adjusted by additive increase and multiplicative decrease: every successful request
+  raises it by increase / rate, which adds about `increase` requests per second for each second
+  of success, and a throttled request multiplies it by `decrease`, at most once per cooldown. A
+  throttle with a Retry-After pauses the whole bucket until that time has passed.
+
+  Methods:
+    acquire() -> None
+      Blocks until a request may be sent.
+
+
+    on_success() -> None
+      Raises the rate after a successful request.
+
+
+    on_throttle(retry_after) -> None
+      Lowers the rate, and pauses the bucket, after a throttled request.
+  """
+
+  def __init__(self, rate: float = 10.0, capacity: float = 5.0, min_rate: float = 1.0, max_rate: float = 100.0, increase: float = 1.0, decrease: float = 0.5, cooldown: float = 1.0) -> None:
+    self.rate = rate
+    self.capacity = capacity
+    self.min_rate = min_rate
+    self.max_rate = max_rate
+    self.increase = increase
+    self.decrease = decrease
+    self.cooldown = cooldown
+    self.tokens = capacity
+    self.paused_until = 0.0
+    self._updated_at = time.monotonic()
+    self._next_decrease = 0.0
+    self._lock = threading.Lock()
+
+  def _refill(self, now: float) -> None:
+    self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+    self._updated_at = now
+
+  def acquire(self) -> None:
+
+    """
+    Blocks until the bucket is not paused and holds a token, then takes the token.
+
+    Returns:
+      None
+    """
+
+    while True:
+      with self._lock:
+        now = time.monotonic()
+        self._refill(now)
+        if now >= self.paused_until and self.tokens >= 1:
+          self.tokens -= 1
+          return
+        wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+      time.sleep(wait)
+
+  def on_success(self) -> None:
+    """Raises the rate additively after a successful request, up to max_rate"""
+    with self._lock:
+      self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+  def on_throttle(self, retry_after: Optional[float] = None) -> None:
+
+    """
+    Lowers the rate multiplicatively after a throttled request, and empties the bucket.
+
+    Throttles within the cooldown of the last decrease do not lower the rate again, as the
+    requests already in flight when the server started throttling are expected to fail too.
+
+    Args:
+      retry_after (Optional[float]): Seconds the server asked to wait, or None.
+
+    Returns:
+      None
+    """
+
+    with self._lock:
+      now = time.monotonic()
+      self._refill(now)
+      self.tokens = 0.0
+      if now >= self._next_decrease:
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._next_decrease = now + self.cooldown
+      if retry_after is not None:
+        self.paused_until = max(self.paused_until, now + retry_after)
+
+
+class RequestScheduler():
+
+  """
+  RequestScheduler class sends GET requests through a shared TokenBucket, retrying failures with jittered backoff.
+
+  Connection errors, timeouts, 429 Too Many Requests and 5xx responses are retried. A 429 also
+  lowers the bucket's rate, and its Retry-After is waited for when given; other failures wait for
+  a random delay of up to backoff * 2 ** attempt, capped at max_backoff, so that retries from many
+  threads do not arrive together. Other 4xx responses are not retried. Requests that still fail
+  are recorded in `dead_letters` as (key, error) tuples, instead of raising, so one failing
+  resource, or one that never answers, does not end a crawl.
+
+  Methods:
+    fetch(url, headers, session, key, timeout) -> Optional[requests.Response]
+      Sends a GET request with rate limiting and retries, returning None if it still fails.
+
+
+    dead_letter(key, error) -> None
+      Records a request that could not be completed.
+  """
+
+  def __init__(self, bucket: Optional[TokenBucket] = None, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0, http_cache: Optional[HTTPCache] = None) -> None:
+    self.bucket = bucket if bucket is not None else TokenBucket()
+    self.max_retries = max_retries
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.http_cache = http_cache
+    self.dead_letters: List[Tuple[Any, str]] = []
+    self.throttled = 0
+    self.retries = 0
+    self._lock = threading.Lock()
+
+  def _delay(self, attempt: int) -> float:
+    """Returns a random delay of up to backoff * 2 ** attempt seconds, capped at max_backoff"""
+    return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+  def dead_letter(self, key: Any, error: str) -> None:
+    """Records a request, identified by its key, that could not be completed"""
+    with self._lock:
+      self.dead_letters.append((key, error))
+
+  def fetch(self, url: str, headers: Optional[dict] = None, session: Optional[requests.Session] = None, key: Any = None, timeout: float = 30) -> Optional[requests.Response]:
+
+    """
+    Sends a GET request once the token bucket allows it, retrying failed attempts.
+
+    Args:
+      url (str): URL to request.
+      headers (Optional[dict]): Headers sent with the request.
+      session (Optional[requests.Session]): Session to send the request with, or None to use a new connection.
+      key (Any): Identifier recorded in dead_letters if the request fails, or None to use the URL.
+      timeout (float): Seconds to wait for the server to connect or send data before the attempt fails and is retried.
+
+    Returns:
+      Optional[requests.Response]: The successful response, or None if the request was dead-lettered.
+    """
+
+    key = url if key is None else key
+
+    for attempt in range(self.max_retries + 1):
+      self.bucket.acquire()
+      try:
+        if self.http_cache is not None:
+          r = self.http_cache.get(url, headers=headers, session=session, timeout=timeout)
+        else:
+          r = (session or requests).get(url, headers=headers, timeout=timeout)
+      except requests.RequestException as e:
+        error = str(e)
+        delay = self._delay(attempt)
+      else:
+        if r.ok:
+          self.bucket.on_success()
+          return r
+        try:
+          r.raise_for_status()
+        except requests.HTTPError as e:
+          error = str(e)
+        if r.status_code == 429:
+          retry_after = parse_retry_after(r.headers.get("Retry-After"))
+          self.bucket.on_throttle(retry_after)
+          with self._lock:
+            self.throttled += 1
+          delay = retry_after if retry_after is not None else self._delay(attempt)
+        elif r.status_code >= 500:
+          delay = self._delay(attempt)
+        else:
+          break
+
+      if attempt < self.max_retries:
+        with self._lock:
+          self.retries += 1
+        time.sleep(delay)
+
+    self.dead_letter(key, error)
+    return None
@@ -0,0 +1,456 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Dict, List, Optional, Tuple
+
+
+UUID_DTYPE = pd.ArrowDtype(pa.binary(16))
+
+INTEGER_DTYPES = {"SMALLINT": "Int16", "INT": "Int32", "INTEGER": "Int32", "BIGINT": "Int64"}
+
+UUID_PATTERN = r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+
+HEX_VALUES = np.full(128, 0, dtype=np.uint8)
+HEX_VALUES[[ord(character) for character in "0123456789"]] = np.arange(10)
+HEX_VALUES[[ord(character) for character in "abcdef"]] = np.arange(10, 16)
+HEX_VALUES[[ord(character) for character in "ABCDEF"]] = np.arange(10, 16)
+
+HEX_DIGITS = np.array(list("0123456789abcdef"))
+
+ALTER_TYPE_PATTERN = re.compile(r'^ALTER TABLE "?(\w+)"?\s+ALTER COLUMN "?(\w+)"? TYPE (.+?)(?:\s+USING .*)?$', re.IGNORECASE | re.DOTALL)
+
+ADD_COLUMN_PATTERN = re.compile(r'^ALTER TABLE "?(\w+)"?\s+ADD COLUMN "?(\w+)"? (.+)$', re.IGNORECASE | re.DOTALL)
+
+RENAME_COLUMN_PATTERN = re.compile(r'^ALTER TABLE "?(\w+)"?\s+RENAME COLUMN "?(\w+)"? TO "?(\w+)"?$', re.IGNORECASE | re.DOTALL)
+
+SET_NULL_PATTERN = re.compile(r'^UPDATE "?(\w+)"? SET "?(\w+)"? = NULL WHERE "?(\w+)"? = \'([^\']*)\'$', re.IGNORECASE | re.DOTALL)
+
+PRIMARY_KEY_PATTERN = re.compile(r'^ALTER TABLE "?(\w+)"? ADD PRIMARY KEY \(([^)]+)\)$', re.IGNORECASE | re.DOTALL)
+
+FOREIGN_KEY_PATTERN = re.compile(r'^ALTER TABLE "?(\w+)"? ADD CONSTRAINT "?(\w+)"? FOREIGN KEY \(([^)]+)\) REFERENCES "?(\w+)"? \(([^)]+)\)$', re.IGNORECASE | re.DOTALL)
+
+DTYPE_SQL_TYPES = {"Int16": "SMALLINT", "Int32": "INTEGER", "Int64": "BIGINT", "int64": "BIGINT", "float64": "DOUBLE PRECISION", "bool": "BOOLEAN", "datetime64[ns]": "TIMESTAMP"}
+
+
+def add_weight_class(dataframe: pd.DataFrame) -> pd.DataFrame:
+  """Adds the "weight_class" column, mirroring the CASE expression in cast_dim_products.sql"""
+  weights = dataframe["weight_kg"].to_numpy(dtype=float)
+  dataframe["weight_class"] = np.select(
+    [weights < 2, weights < 40, weights < 140, weights >= 140],
+    ["Light", "Mid-Sized", "Heavy", "Truck_Required"],
+    default=None
+  )
+  return dataframe
+
+
+def convert_still_available(dataframe: pd.DataFrame) -> pd.DataFrame:
+  """Converts the "removed" column to booleans, mirroring the CASE expression in cast_dim_products.sql"""
+  dataframe["removed"] = (dataframe["removed"] == "Still_avaliable").to_numpy()
+  return dataframe
+
+
+# Data changes made by the cast scripts that are too specific to parse, applied before any renames
+CONFORM_STEPS = {"dim_products": [add_weight_class, convert_still_available]}
+
+
+def sql_type_for_dtype(dtype: object) -> str:
+  """Returns the SQL type pandas would create for an undeclared column of the given dtype"""
+  if dtype == UUID_DTYPE:
+    return "UUID"
+  return DTYPE_SQL_TYPES.get(str(dtype), "TEXT")
+
+
+def uuids_to_binary(series: pd.Series) -> Optional[pd.Series]:
+
+  """
+  Parses a Series of UUID strings into 16-byte binary values, backed by a single Arrow buffer.
+
+  Args:
+    series (pd.Series): Series of UUID strings, which may contain nulls.
+
+  Returns:
+    Optional[pd.Series]: Series of the UUID dtype, or None if any value is not a valid UUID.
+  """
+
+  nulls = series.isna().to_numpy()
+  if not series[~nulls].str.match(UUID_PATTERN).all():
+    return None
+
+  digits = series.where(~nulls, "0" * 32).str.replace("-", "", regex=False).to_numpy(dtype="<U32")
+  nibbles = HEX_VALUES[digits.view(np.uint32).reshape(-1, 32)]
+  octets = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+  validity = pa.array(~nulls).buffers()[1] if nulls.any() else None
+  array = pa.Array.from_buffers(pa.binary(16), len(series), [validity, pa.py_buffer(octets.tobytes())], null_count=int(nulls.sum()))
+  return pd.Series(pd.arrays.ArrowExtensionArray(array), index=series.index, name=series.name)
+
+
+def binary_to_uuids(series: pd.Series) -> pd.Series:
+
+  """
+  Formats a Series of 16-byte binary UUIDs back into their canonical string form.
+
+  Args:
+    series (pd.Series): Series of the UUID dtype.
+
+  Returns:
+    pd.Series: Object Series of UUID strings, with None for nulls.
+  """
+
+  array = pa.array(series)
+  octets = np.frombuffer(array.buffers()[1], dtype=np.uint8)[16 * array.offset:16 * (array.offset + len(array))].reshape(-1, 16)
+  characters = np.empty((len(series), 32), dtype="<U1")
+  characters[:, 0::2] = HEX_DIGITS[octets >> 4]
+  characters[:, 1::2] = HEX_DIGITS[octets & 15]
+
+  dashes = np.full((len(series), 1), "-")
+  grouped = np.hstack([characters[:, :8], dashes, characters[:, 8:12], dashes, characters[:, 12:16], dashes, characters[:, 16:20], dashes, characters[:, 20:]])
+  uuids = grouped.view("<U36").ravel().astype(object)
+  uuids[series.isna().to_numpy()] = None
+  return pd.Series(uuids, index=series.index, name=series.name)
+
+
+def decode_uuid_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+
+  """
+  Returns the DataFrame with any binary UUID columns formatted back into strings, ready to be loaded.
+
+  The DataFrame is returned unchanged if it has no binary UUID columns, and is otherwise
+  shallow copied, so only the UUID columns are rebuilt.
+
+  Args:
+    dataframe (pd.DataFrame): DataFrame that may contain columns of the UUID dtype.
+
+  Returns:
+    pd.DataFrame: DataFrame whose UUID columns are strings.
+  """
+
+  uuid_columns = [column for column, dtype in dataframe.dtypes.items() if dtype == UUID_DTYPE]
+  if not uuid_columns:
+    return dataframe
+
+  decoded = dataframe.copy(deep=False)
+  for column in uuid_columns:
+    decoded[column] = binary_to_uuids(dataframe[column])
+  return decoded
+
+
+class SchemaRegistry():
+
+  """
+  SchemaRegistry class holds the final schema of each table, read from the cast, primary key and foreign key SQL scripts.
+
+  The ALTER COLUMN ... TYPE, ADD COLUMN, RENAME COLUMN and UPDATE ... SET ... = NULL statements
+  of every script in the cast directory are parsed, so the registry knows the type each column
+  is cast to, the name the column has when it is loaded, before any renames, and the values the
+  scripts null out. The primary and foreign keys are parsed from their scripts. From these, a
+  table can be created with its final types and keys up front, and loaded in one pass, instead
+  of being loaded as text and then rewritten by each ALTER COLUMN in the cast scripts.
+
+  Methods:
+    column_types(table_name) -> Dict[str, str]
+      Returns the declared SQL type of each column of a table, keyed by its name when loaded.
+
+
+    optimise_dtypes(dataframe, table_name, category_threshold, binary_uuids) -> pd.DataFrame
+      Converts a cleaned DataFrame's columns to compact dtypes based on their declared SQL types.
+
+
+    conform(dataframe, table_name) -> pd.DataFrame
+      Applies the cast scripts' data changes and renames to a cleaned DataFrame.
+
+
+    create_table_statement(table_name, dataframe, include_foreign_keys) -> str
+      Builds a CREATE TABLE statement with the final column types and keys of a table.
+
+
+    foreign_key_statements(table_name, not_valid) -> List[str]
+      Builds the ALTER TABLE statements that add a table's foreign keys.
+
+
+    validate_foreign_key_statements(table_name) -> List[str]
+      Builds the ALTER TABLE statements that validate a table's foreign keys.
+
+
+    drop_foreign_key_statements(table_name) -> List[str]
+      Builds the ALTER TABLE statements that drop a table's foreign keys, if it has them.
+
+
+    orphan_keys_query(table_name, sample_size) -> str
+      Builds a query counting the rows of a table whose foreign keys match no referenced row.
+  """
+
+  def __init__(self, cast_dir: str = "./sql_queries/cast_column_types", primary_keys_path: str = "./sql_queries/set_primary_keys/set_primary_keys.sql", foreign_keys_path: str = "./sql_queries/set_foreign_keys/set_foreign_keys.sql") -> None:
+    self.cast_dir = cast_dir
+    self.types: Dict[str, Dict[str, str]] = {}
+    self.renames: Dict[str, Dict[str, str]] = {}
+    self.added_columns: Dict[str, List[str]] = {}
+    self.null_rules: Dict[str, List[Tuple[str, str, str]]] = {}
+    self.primary_keys: Dict[str, List[str]] = {}
+    self.foreign_keys: Dict[str, List[Tuple[str, List[str], str, List[str]]]] = {}
+    self.memory_saved: Dict[str, int] = {}
+
+    paths = [os.path.join(cast_dir, name) for name in sorted(os.listdir(cast_dir)) if name.endswith(".sql")]
+    for path in paths + [primary_keys_path, foreign_keys_path]:
+      with open(path) as stream:
+        self._parse(stream.read())
+
+  def _parse(self, sql: str) -> None:
+    """Records the column types, added columns, renames, null rules and keys declared by the statements of a script"""
+    for statement in sql.split(";"):
+      statement = " ".join(statement.split())
+      if match := ALTER_TYPE_PATTERN.match(statement):
+        table_name, column, sql_type = match.groups()
+        self.types.setdefault(table_name, {})[column] = sql_type.upper()
+      elif match := ADD_COLUMN_PATTERN.match(statement):
+        table_name, column, sql_type = match.groups()
+        self.types.setdefault(table_name, {})[column] = sql_type.upper()
+        self.added_columns.setdefault(table_name, []).append(column)
+      elif match := RENAME_COLUMN_PATTERN.match(statement):
+        table_name, old_name, new_name = match.groups()
+        self.renames.setdefault(table_name, {})[old_name] = new_name
+      elif match := SET_NULL_PATTERN.match(statement):
+        table_name, column, condition_column, value = match.groups()
+        self.null_rules.setdefault(table_name, []).append((column, condition_column, value))
+      elif match := PRIMARY_KEY_PATTERN.match(statement):
+        table_name, columns = match.groups()
+        self.primary_keys[table_name] = [column.strip(' "') for column in columns.split(",")]
+      elif match := FOREIGN_KEY_PATTERN.match(statement):
+        table_name, constraint, columns, referenced_table, referenced_columns = match.groups()
+        self.foreign_keys.setdefault(table_name, []).append((
+          constraint,
+          [column.strip(' "') for column in columns.split(",")],
+          referenced_table,
+          [column.strip(' "') for column in referenced_columns.split(",")],
+        ))
+
+  def column_types(self, table_name: str) -> Dict[str, str]:
+
+    """
+    Returns the declared SQL type of each column of a table, keyed by the column's name when loaded.
+
+    Columns that are added by the cast script, rather than loaded, are not included.
+
+    Args:
+      table_name (str): Name of the table.
+
+    Returns:
+      Dict[str, str]: Mapping of loaded column name to SQL type, e.g. "VARCHAR(19)".
+    """
+
+    loaded_names = {new_name: old_name for old_name, new_name in self.renames.get(table_name, {}).items()}
+    return {
+      loaded_names.get(column, column): sql_type
+      for column, sql_type in self.types.get(table_name, {}).items()
+      if column not in self.added_columns.get(table_name, [])
+    }
+
+  def optimise_dtypes(self, dataframe: pd.DataFrame, table_name: str, category_threshold: float = 0.5, binary_uuids: bool = True) -> pd.DataFrame:
+
+    """
+    Converts a cleaned DataFrame's columns to compact dtypes, based on the SQL types they are cast to.
+
+    - SMALLINT, INT and BIGINT columns are downcast to nullable Int16, Int32 and Int64, if their values fit.
+    - DOUBLE PRECISION columns held as strings are parsed to floats, if every value parses.
+    - UUID columns are parsed into 16-byte binary values, if binary_uuids is set and every value is a UUID.
+    - Any other string column whose distinct values number at most category_threshold of its rows
+      becomes a categorical.
+
+    Columns that cannot be converted without changing their values are left as they are. The
+    memory saved is printed, and recorded in memory_saved under the table's name.
+
+    Args:
+      dataframe (pd.DataFrame): Cleaned DataFrame, which is converted in place.
+      table_name (str): Name of the table the DataFrame is loaded into.
+      category_threshold (float): Largest ratio of distinct values to rows for a categorical.
+      binary_uuids (bool): Whether to convert UUID columns to 16-byte binary values.
+
+    Returns:
+      pd.DataFrame: The converted DataFrame.
+    """
+
+    memory_before = dataframe.memory_usage(deep=True).sum()
+    declared_types = self.column_types(table_name)
+
+    for column in dataframe.columns:
+      series = dataframe[column]
+      base_type = declared_types.get(column, "").split("(")[0].strip()
+
+      if base_type in INTEGER_DTYPES and pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        dtype = INTEGER_DTYPES[base_type]
+        limits = np.iinfo(dtype.lower())
+        values = series.dropna()
+        if (values == values.round()).all() and (values.empty or (limits.min <= values.min() and values.max() <= limits.max)):
+          dataframe[column] = series.astype(dtype)
+
+      elif series.dtype != object:
+        continue
+
+      elif base_type == "UUID" and binary_uuids:
+        converted = uuids_to_binary(series)
+        if converted is not None:
+          dataframe[column] = converted
+
+      elif base_type == "DOUBLE PRECISION":
+        converted = pd.to_numeric(series, errors="coerce")
+        if converted.isna().sum() == series.isna().sum():
+          dataframe[column] = converted
+
+      elif series.nunique() <= category_threshold * len(series):
+        dataframe[column] = series.astype("category")
+
+    memory_after = dataframe.memory_usage(deep=True).sum()
+    self.memory_saved[table_name] = int(memory_before - memory_after)
+    print(f"Optimised {table_name} dtypes: {memory_before / 1024 ** 2:.1f} MB -> {memory_after / 1024 ** 2:.1f} MB ({1 - memory_after / max(memory_before, 1):.0%} saved)")
+    return dataframe
+
+  def conform(self, dataframe: pd.DataFrame, table_name: str) -> pd.DataFrame:
+
+    """
+    Applies the data changes and renames made by a table's cast script to a cleaned DataFrame.
+
+    Values nulled by the script's UPDATE statements are nulled, derived columns are added,
+    columns are renamed, and columns are converted to the integer, float and date types they
+    are cast to, so the DataFrame can be loaded straight into the table's final schema.
+
+    Args:
+      dataframe (pd.DataFrame): Cleaned DataFrame, which is not modified.
+      table_name (str): Name of the table the DataFrame is loaded into.
+
+    Returns:
+      pd.DataFrame: DataFrame in the shape of the final table.
+    """
+
+    conformed = dataframe.copy(deep=False)
+
+    for column, condition_column, value in self.null_rules.get(table_name, []):
+      if column in conformed.columns:
+        conformed[column] = conformed[column].where(conformed[condition_column] != value)
+
+    for step in CONFORM_STEPS.get(table_name, []):
+      conformed = step(conformed)
+
+    conformed = conformed.rename(columns=self.renames.get(table_name, {}))
+
+    for column, sql_type in self.types.get(table_name, {}).items():
+      if column not in conformed.columns or column in self.added_columns.get(table_name, []):
+        continue
+      base_type = sql_type.split("(")[0].strip()
+      if base_type in INTEGER_DTYPES:
+        conformed[column] = conformed[column].astype(INTEGER_DTYPES[base_type])
+      elif base_type == "DOUBLE PRECISION":
+        conformed[column] = conformed[column].astype(float)
+      elif base_type == "DATE" and not pd.api.types.is_datetime64_any_dtype(conformed[column]):
+        conformed[column] = pd.to_datetime(conformed[column].astype(object), format="ISO8601")
+
+    return conformed
+
+  def create_table_statement(self, table_name: str, dataframe: pd.DataFrame, include_foreign_keys: bool = False) -> str:
+
+    """
+    Builds a CREATE TABLE statement for a conformed DataFrame, with the table's final column types and keys.
+
+    Columns declared in the cast scripts take their declared types, and any other column the
+    type pandas would create for its dtype. Foreign keys are left out by default, so tables can
+    be loaded in any order and the keys added once every table is loaded.
+
+    Args:
+      table_name (str): Name of the table.
+      dataframe (pd.DataFrame): DataFrame returned by conform.
+      include_foreign_keys (bool): Whether to declare the table's foreign keys.
+
+    Returns:
+      str: The CREATE TABLE statement.
+    """
+
+    declared_types = self.types.get(table_name, {})
+    definitions = [f'"{column}" {declared_types.get(column) or sql_type_for_dtype(dtype)}' for column, dtype in dataframe.dtypes.items()]
+
+    if table_name in self.primary_keys:
+      definitions.append(f"PRIMARY KEY ({', '.join(self.primary_keys[table_name])})")
+    if include_foreign_keys:
+      for constraint, columns, referenced_table, referenced_columns in self.foreign_keys.get(table_name, []):
+        definitions.append(f'CONSTRAINT "{constraint}" FOREIGN KEY ({", ".join(columns)}) REFERENCES "{referenced_table}" ({", ".join(referenced_columns)})')
+
+    return f'CREATE TABLE "{table_name}" (\n  ' + ",\n  ".join(definitions) + "\n)"
+
+  def foreign_key_statements(self, table_name: str, not_valid: bool = False) -> List[str]:
+
+    """
+    Builds the ALTER TABLE statements that add a table's foreign keys.
+
+    Args:
+      table_name (str): Name of the table.
+      not_valid (bool): Whether to add the keys NOT VALID, so existing rows are not checked until they are validated.
+
+    Returns:
+      List[str]: One ALTER TABLE ... ADD CONSTRAINT statement per foreign key.
+    """
+
+    suffix = " NOT VALID" if not_valid else ""
+    return [
+      f'ALTER TABLE "{table_name}" ADD CONSTRAINT "{constraint}" FOREIGN KEY ({", ".join(columns)}) REFERENCES "{referenced_table}" ({", ".join(referenced_columns)}){suffix}'
+      for constraint, columns, referenced_table, referenced_columns in self.foreign_keys.get(table_name, [])
+    ]
+
+  def validate_foreign_key_statements(self, table_name: str) -> List[str]:
+
+    """
+    Builds the ALTER TABLE statements that validate a table's foreign keys, once they have been added NOT VALID.
+
+    Args:
+      table_name (str): Name of the table.
+
+    Returns:
+      List[str]: One ALTER TABLE ... VALIDATE CONSTRAINT statement per foreign key.
+    """
+
+    return [f'ALTER TABLE "{table_name}" VALIDATE CONSTRAINT "{constraint}"' for constraint, _, _, _ in self.foreign_keys.get(table_name, [])]
+
+  def drop_foreign_key_statements(self, table_name: str) -> List[str]:
+
+    """
+    Builds the ALTER TABLE statements that drop a table's foreign keys, doing nothing if the table or a key does not exist.
+
+    Args:
+      table_name (str): Name of the table.
+
+    Returns:
+      List[str]: One ALTER TABLE ... DROP CONSTRAINT statement per foreign key.
+    """
+
+    return [f'ALTER TABLE IF EXISTS "{table_name}" DROP CONSTRAINT IF EXISTS "{constraint}"' for constraint, _, _, _ in self.foreign_keys.get(table_name, [])]
+
+  def orphan_keys_query(self, table_name: str, sample_size: int = 5) -> str:
+
+    """
+    Builds a query that finds the rows of a table whose foreign keys match no row of the referenced tables.
+
+    The table is scanned once, left joined to every referenced table, instead of once per
+    foreign key as validating each key does. Like the keys themselves, rows with a null in
+    any of a key's columns are not checked. The referenced columns are the referenced tables'
+    primary keys, so the joins do not repeat rows.
+
+    Args:
+      table_name (str): Name of the table.
+      sample_size (int): Number of distinct orphan values returned for each foreign key.
+
+    Returns:
+      str: A query returning one row with an orphan count column and an orphan sample column for each
+        foreign key, named after the constraint with "_orphans" and "_sample" appended.
+    """
+
+    selections = []
+    joins = []
+    for number, (constraint, columns, referenced_table, referenced_columns) in enumerate(self.foreign_keys.get(table_name, [])):
+      alias = f"r{number}"
+      conditions = " AND ".join(f't."{column}" = {alias}."{referenced}"' for column, referenced in zip(columns, referenced_columns))
+      orphan = " AND ".join([f't."{column}" IS NOT NULL' for column in columns] + [f'{alias}."{referenced_columns[0]}" IS NULL'])
+      values = ", ".join(f't."{column}"::text' for column in columns)
+      selections.append(f'COUNT(*) FILTER (WHERE {orphan}) AS "{constraint}_orphans"')
+      selections.append(f'(ARRAY_AGG(DISTINCT CONCAT_WS(\', \', {values})) FILTER (WHERE {orphan}))[1:{sample_size}] AS "{constraint}_sample"')
+      joins.append(f'LEFT JOIN "{referenced_table}" AS {alias} ON {conditions}')
+
+    return "SELECT\n  " + ",\n  ".join(selections) + f'\nFROM "{table_name}" AS t\n' + "\n".join(joins)
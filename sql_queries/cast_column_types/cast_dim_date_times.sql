@@ -12,4 +12,7 @@ ALTER COLUMN "time_period" TYPE VARCHAR(10);
 
 ALTER TABLE dim_date_times
 ALTER COLUMN "date_uuid" TYPE UUID
-USING "date_uuid"::uuid;
\ No newline at end of file
+USING "date_uuid"::uuid;
+
+ALTER TABLE dim_date_times
+ALTER COLUMN purchase_ts TYPE TIMESTAMP;
\ No newline at end of file
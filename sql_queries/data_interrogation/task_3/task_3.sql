@@ -1,7 +1,5 @@
-SELECT ROUND(CAST(SUM(pr.product_price * o.product_quantity) AS NUMERIC), 2) AS total_sales, dt.month
-FROM dim_date_times AS dt
-LEFT JOIN orders_table AS o ON dt.date_uuid = o.date_uuid
-LEFT JOIN dim_products AS pr ON pr.product_code = o.product_code
-GROUP BY dt.month
+SELECT ROUND(CAST(SUM(total_sales) AS NUMERIC), 2) AS total_sales, month
+FROM sales_by_month
+GROUP BY month
 ORDER BY total_sales DESC
 LIMIT 6;
\ No newline at end of file
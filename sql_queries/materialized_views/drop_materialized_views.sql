@@ -0,0 +1,5 @@
+DROP MATERIALIZED VIEW IF EXISTS sales_by_store;
+
+DROP MATERIALIZED VIEW IF EXISTS sales_by_month;
+
+DROP MATERIALIZED VIEW IF EXISTS time_between_purchases;
@@ -0,0 +1,5 @@
+REFRESH MATERIALIZED VIEW sales_by_store;
+
+REFRESH MATERIALIZED VIEW sales_by_month;
+
+REFRESH MATERIALIZED VIEW time_between_purchases;
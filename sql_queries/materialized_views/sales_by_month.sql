@@ -0,0 +1,19 @@
+DROP MATERIALIZED VIEW IF EXISTS sales_by_month;
+
+CREATE MATERIALIZED VIEW sales_by_month AS
+SELECT
+	sd.store_type,
+	sd.country_code,
+	dt.year,
+	dt.month,
+	COUNT(*) AS number_of_sales,
+	SUM(o.product_quantity) AS product_quantity_count,
+	SUM(p.product_price * o.product_quantity) AS total_sales
+FROM orders_table AS o
+JOIN dim_date_times AS dt ON dt.date_uuid = o.date_uuid
+JOIN dim_store_details AS sd ON sd.store_code = o.store_code
+JOIN dim_products AS p ON p.product_code = o.product_code
+GROUP BY sd.store_type, sd.country_code, dt.year, dt.month;
+
+CREATE INDEX sales_by_month_year_month
+ON sales_by_month (year, month);
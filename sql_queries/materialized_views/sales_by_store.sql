@@ -0,0 +1,17 @@
+DROP MATERIALIZED VIEW IF EXISTS sales_by_store;
+
+CREATE MATERIALIZED VIEW sales_by_store AS
+SELECT
+	sd.store_code,
+	sd.store_type,
+	sd.country_code,
+	COUNT(o.store_code) AS number_of_sales,
+	SUM(o.product_quantity) AS product_quantity_count,
+	SUM(p.product_price * o.product_quantity) AS total_sales
+FROM dim_store_details AS sd
+LEFT JOIN orders_table AS o ON o.store_code = sd.store_code
+LEFT JOIN dim_products AS p ON p.product_code = o.product_code
+GROUP BY sd.store_code, sd.store_type, sd.country_code;
+
+CREATE UNIQUE INDEX sales_by_store_store_code
+ON sales_by_store (store_code);
@@ -0,0 +1,19 @@
+DROP MATERIALIZED VIEW IF EXISTS time_between_purchases;
+
+CREATE MATERIALIZED VIEW time_between_purchases AS
+WITH gaps AS (
+SELECT
+	year,
+	purchase_ts - LEAD(purchase_ts, 1) OVER (ORDER BY purchase_ts DESC) AS time_to_next_purchase
+FROM dim_date_times
+)
+
+SELECT
+	year,
+	COUNT(*) AS number_of_purchases,
+	AVG(time_to_next_purchase) AS average_time_between_purchases
+FROM gaps
+GROUP BY year;
+
+CREATE UNIQUE INDEX time_between_purchases_year
+ON time_between_purchases (year);
@@ -0,0 +1,19 @@
+CREATE INDEX IF NOT EXISTS idx_dim_date_times_purchase_ts
+ON dim_date_times (purchase_ts);
+
+-- Rewrites the table in purchase_ts order, so that the BRIN index's block ranges each cover a
+-- short span of time and the index-ordered scan reads the table sequentially. Every load replaces
+-- the table in the source's order, so this is repeated after each one.
+CLUSTER dim_date_times USING idx_dim_date_times_purchase_ts;
+
+CREATE INDEX IF NOT EXISTS idx_dim_date_times_purchase_ts_brin
+ON dim_date_times USING BRIN (purchase_ts);
+
+CREATE INDEX IF NOT EXISTS idx_orders_table_date_uuid
+ON orders_table (date_uuid);
+
+CREATE INDEX IF NOT EXISTS idx_orders_table_store_code
+ON orders_table (store_code);
+
+CREATE INDEX IF NOT EXISTS idx_orders_table_product_code
+ON orders_table (product_code);
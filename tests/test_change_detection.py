@@ -0,0 +1,68 @@
+from typing import List
+
+import pandas as pd
+import pytest
+
+from benchmarks.benchmark_change_detection import DIMENSIONS, fingerprint_table
+from benchmarks.benchmark_cleaning import GENERATORS
+from data_cleaning import DataCleaning
+from database_utils import diff_row_fingerprints, normalise_keys
+from schema_registry import SchemaRegistry
+
+
+@pytest.fixture(scope="module")
+def registry() -> SchemaRegistry:
+  """Returns a registry read from the repository's SQL scripts"""
+  return SchemaRegistry()
+
+
+def cleaned_table(registry: SchemaRegistry, table_name: str) -> pd.DataFrame:
+  """Returns a cleaned generated dimension table, with unique keys"""
+  method_name = DIMENSIONS[table_name]
+  dataframe = getattr(DataCleaning(), method_name)(GENERATORS[method_name](2_000, 0))
+  return dataframe.drop_duplicates(registry.primary_keys[table_name]).reset_index(drop=True)
+
+
+def uuid_columns(registry: SchemaRegistry, table_name: str) -> List[str]:
+  """Returns the columns of a table declared as UUID"""
+  return [column for column, sql_type in registry.column_types(table_name).items() if sql_type == "UUID"]
+
+
+@pytest.mark.parametrize("table_name", list(DIMENSIONS))
+def test_fingerprints_do_not_depend_on_dtype_optimisation(registry: SchemaRegistry, table_name: str) -> None:
+  """Checks that a table fingerprints the same with and without optimised dtypes"""
+  plain = cleaned_table(registry, table_name)
+  optimised = registry.optimise_dtypes(plain.copy(), table_name)
+  plain_fingerprints, plain_fingerprint = fingerprint_table(registry, table_name, plain)
+  optimised_fingerprints, optimised_fingerprint = fingerprint_table(registry, table_name, optimised)
+  pd.testing.assert_frame_equal(optimised_fingerprints, plain_fingerprints)
+  assert optimised_fingerprint == plain_fingerprint
+
+
+@pytest.mark.parametrize("table_name", ["dim_users", "dim_products"])
+def test_uuid_keys_and_values_are_compared_in_lowercase(registry: SchemaRegistry, table_name: str) -> None:
+  """Checks that UUID columns fingerprint the same whatever the case of their values"""
+  plain = cleaned_table(registry, table_name)
+  upper = plain.copy()
+  for column in uuid_columns(registry, table_name):
+    upper[column] = upper[column].str.upper()
+  fingerprints, fingerprint = fingerprint_table(registry, table_name, plain)
+  upper_fingerprints, upper_fingerprint = fingerprint_table(registry, table_name, upper)
+  pd.testing.assert_frame_equal(upper_fingerprints, fingerprints)
+  assert upper_fingerprint == fingerprint
+
+
+def test_stored_uuid_keys_are_normalised_before_diffing(registry: SchemaRegistry) -> None:
+  """Checks that keys recorded in uppercase match the current rows once normalised, so none are deleted as removed"""
+  fingerprints, _ = fingerprint_table(registry, "dim_users", cleaned_table(registry, "dim_users"))
+  stored = fingerprints.assign(key=fingerprints["key"].str.upper())
+  stored["key"] = normalise_keys(stored["key"], ["user_uuid"], registry.column_types("dim_users"))
+  changed, removed = diff_row_fingerprints(fingerprints, stored)
+  assert not changed.any()
+  assert removed == []
+
+
+def test_only_uuid_parts_of_composite_keys_are_lowercased() -> None:
+  """Checks that only the parts of a composite key that belong to UUID columns are lowercased"""
+  keys = pd.Series(["AB-1|0A1B", "Cd-2|FFFF"])
+  assert normalise_keys(keys, ["code", "uuid"], {"code": "VARCHAR(5)", "uuid": "UUID"}).tolist() == ["AB-1|0a1b", "Cd-2|ffff"]
@@ -0,0 +1,15 @@
+import pandas as pd
+import pytest
+
+from benchmarks.benchmark_cleaning import GENERATORS
+from data_cleaning import DataCleaning
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("method_name", list(GENERATORS))
+def test_low_copy_output_is_identical(method_name: str, seed: int) -> None:
+  """Checks that each cleaning method gives the same DataFrame in low-copy mode as in the default mode"""
+  dataframe = GENERATORS[method_name](500, seed)
+  expected = getattr(DataCleaning(), method_name)(dataframe.copy())
+  result = getattr(DataCleaning(low_copy=True), method_name)(dataframe.copy())
+  pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,64 @@
+import struct
+import zlib
+
+import pytest
+
+from data_extraction import DataExtractor
+
+
+def write_pdf_with_object_streams(path: str, page_count: int) -> None:
+
+  """
+  Writes a PDF whose catalog, page tree and pages are all stored in a compressed object stream.
+
+  Args:
+    path (str): Filepath to write the PDF to.
+    page_count (int): Number of pages in the document.
+  """
+
+  page_numbers = list(range(3, 3 + page_count))
+  objects = [
+    b"<< /Type /Catalog /Pages 2 0 R >>",
+    b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % number for number in page_numbers) + b"] /Count %d >>" % page_count,
+  ] + [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>" for _ in page_numbers]
+
+  offsets, body = [], b""
+  for obj in objects:
+    offsets.append(len(body))
+    body += obj + b"\n"
+  header = b" ".join(b"%d %d" % (number, offset) for number, offset in zip(range(1, len(objects) + 1), offsets)) + b"\n"
+  object_stream_number = len(objects) + 1
+  xref_number = object_stream_number + 1
+  object_stream = zlib.compress(header + body)
+
+  pdf = b"%PDF-1.5\n"
+  object_stream_offset = len(pdf)
+  pdf += b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n" % (object_stream_number, len(objects), len(header), len(object_stream))
+  pdf += object_stream + b"\nendstream\nendobj\n"
+
+  xref_offset = len(pdf)
+  rows = [struct.pack(">BHH", 0, 0, 65535)]
+  rows += [struct.pack(">BHH", 2, object_stream_number, index) for index in range(len(objects))]
+  rows += [struct.pack(">BHH", 1, object_stream_offset, 0), struct.pack(">BHH", 1, xref_offset, 0)]
+  xref_stream = zlib.compress(b"".join(rows))
+  pdf += b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 2 2] /Root 1 0 R /Filter /FlateDecode /Length %d >>\nstream\n" % (xref_number, xref_number + 1, len(xref_stream))
+  pdf += xref_stream + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_offset
+
+  with open(path, "wb") as file:
+    file.write(pdf)
+
+
+@pytest.mark.parametrize("page_count", [1, 2, 279])
+def test_pages_in_object_streams_are_counted(tmp_path, page_count: int) -> None:
+  """Checks that pages stored in compressed object streams are counted"""
+  path = str(tmp_path / "card_details.pdf")
+  write_pdf_with_object_streams(path, page_count)
+  assert DataExtractor()._count_pdf_pages(path) == page_count
+
+
+def test_unreadable_pdf_is_reported(tmp_path, capsys) -> None:
+  """Checks that a PDF whose pages cannot be counted gives 0, and that the failure is reported"""
+  path = tmp_path / "card_details.pdf"
+  path.write_bytes(b"not a pdf")
+  assert DataExtractor()._count_pdf_pages(str(path)) == 0
+  assert "Couldn't count the pages" in capsys.readouterr().out
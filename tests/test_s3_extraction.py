@@ -0,0 +1,60 @@
+import boto3
+import pandas as pd
+import pytest
+import yaml
+from moto import mock_aws
+
+from benchmarks.data_generators import generate_orders_table
+from data_extraction import DataExtractor
+
+
+BUCKET = "data-handling-public"
+KEY = "orders.csv"
+
+
+@pytest.fixture
+def s3_path(tmp_path, monkeypatch) -> str:
+  """Uploads a generated CSV to a mocked S3 bucket, and returns the path of a YAML file pointing to it"""
+  monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+  monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+  monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+  with mock_aws():
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket=BUCKET)
+    s3.put_object(Bucket=BUCKET, Key=KEY, Body=generate_orders_table(20_000).to_csv(index=False).encode("utf-8"))
+    path = tmp_path / "s3_path.yaml"
+    path.write_text(yaml.safe_dump({"PATH": f"s3://{BUCKET}/{KEY}"}))
+    yield str(path)
+
+
+def test_multipart_download_matches_direct_read(s3_path: str) -> None:
+  """Checks that an object downloaded in parallel parts gives the same DataFrame as one read from the response body"""
+  extractor = DataExtractor()
+  expected = extractor.extract_from_s3(s3_path)
+  result = extractor.extract_from_s3(s3_path, multipart_threshold=1)
+  pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize("multipart_threshold", [64 * 1024 ** 2, 1])
+def test_streamed_chunks_match_direct_read(s3_path: str, multipart_threshold: int) -> None:
+  """Checks that the chunks streamed from an object, joined together, give the same DataFrame as reading it at once"""
+  extractor = DataExtractor()
+  expected = extractor.extract_from_s3(s3_path)
+  chunks = list(extractor.stream_from_s3(s3_path, chunksize=3_000, multipart_threshold=multipart_threshold))
+  assert len(chunks) == 7
+  pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+def test_object_is_downloaded_in_several_parts(s3_path: str) -> None:
+  """Checks that an object over the threshold is downloaded in ranged parts of the given size, and read back whole"""
+  expected = boto3.client("s3").get_object(Bucket=BUCKET, Key=KEY)["Body"].read()
+  ranges = []
+  boto3.setup_default_session()
+  boto3.DEFAULT_SESSION.events.register("before-call.s3.GetObject", lambda params, **kwargs: ranges.append(params["headers"].get("Range")))
+
+  with DataExtractor()._open_s3_object(f"s3://{BUCKET}/{KEY}", multipart_threshold=1, max_concurrency=4, multipart_chunksize=256 * 1024) as file:
+    result = file.read()
+
+  assert result == expected
+  assert len(ranges) == -(-len(expected) // (256 * 1024))
+  assert all(ranges)